@@ -0,0 +1,459 @@
+# -*- coding: utf-8 -*-
+"""GCC 소스/prerequisite 준비 - 로컬 미러, SHA-512 검증, 병렬 다운로드 (오프라인 지원)
+
+사용법:
+    python gcc_source.py 11.5.0 --source-dir source [--mirror /srv/mirror/gnu] [--offline]
+
+미러는 디렉토리 경로, file:// 또는 http(s):// URL 모두 가능하며 아래 배치 중 하나를 따르면 됨
+    <mirror>/gcc-11.5.0/gcc-11.5.0.tar.xz    (ftp.gnu.org/gnu/gcc 와 동일)
+    <mirror>/gcc-11.5.0.tar.xz               (평평한 배치)
+    <mirror>/infrastructure/gmp-6.2.1.tar.bz2 (gcc.gnu.org/pub/gcc/infrastructure 와 동일)
+    <mirror>/gmp-6.2.1.tar.bz2
+
+체크섬이 없는 아카이브는 풀지 않음 - GCC_SOURCE_SHA512, GCC_SOURCE_CHECKSUMS, <source-dir>/sha512.sum
+(미러에서 검증한 값이 자동으로 기록됨) 또는 미러의 sha512.sum / SHA512SUMS 순서로 찾음.
+"""
+import os
+import sys
+import re
+import glob
+import time
+import shutil
+import hashlib
+import inspect
+import json
+import tempfile
+import subprocess
+import urllib.request
+import urllib.error
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+GCC_UPSTREAM = 'https://ftp.gnu.org/gnu/gcc'
+INFRASTRUCTURE_UPSTREAM = 'https://gcc.gnu.org/pub/gcc/infrastructure'
+
+# GCC_SOURCE_MIRROR 는 os.pathsep 로 여러 개 지정 가능 - 앞에서부터 시도
+SOURCE_MIRRORS = [m for m in os.environ.get('GCC_SOURCE_MIRROR', '').split(os.pathsep) if m]
+SOURCE_OFFLINE = os.environ.get('GCC_SOURCE_OFFLINE', '0') == '1'
+FETCH_WORKERS = int(os.environ.get('GCC_SOURCE_FETCH_WORKERS', '4'))
+FETCH_TIMEOUT = int(os.environ.get('GCC_SOURCE_FETCH_TIMEOUT', '120'))
+# 고정 체크섬 표 (sha512sum 형식, os.pathsep 로 여러 개) - 소스 디렉토리의 sha512.sum 도 함께 읽음
+PINNED_CHECKSUM_FILES = [f for f in os.environ.get('GCC_SOURCE_CHECKSUMS', '').split(os.pathsep) if f]
+PINNED_CHECKSUM_NAME = 'sha512.sum'
+
+# 패치까지 적용한 원본 소스 스냅샷 (GCC_SOURCE_SNAPSHOT=0 으로 비활성화)
+SNAPSHOT_DIR = os.environ.get('GCC_SOURCE_SNAPSHOT_DIR', os.path.expanduser('~/.cache/rez-gcc/source'))
+SNAPSHOT_MARKER = '.rez_snapshot_key'
+
+# contrib/download_prerequisites 가 받는 패키지 (압축 해제 후 소스 트리에 링크되는 이름)
+PREREQUISITES = ('gmp', 'mpfr', 'mpc', 'isl')
+
+class SourceError(Exception):
+    """소스 준비 실패 (미러에 없음, 체크섬 불일치, 오프라인에서 원격 접근 등)"""
+
+def _is_remote(location):
+    return urlparse(location).scheme in ('http', 'https', 'ftp')
+
+def _join(location, *parts):
+    if _is_remote(location) or location.startswith('file://'):
+        return '/'.join([location.rstrip('/'), *parts])
+    return os.path.join(location, *parts)
+
+def _local_path(location):
+    """로컬 경로 또는 file:// URL 이면 파일 경로 반환"""
+    if location.startswith('file://'):
+        return urllib.request.url2pathname(urlparse(location).path)
+    if not _is_remote(location):
+        return location
+    return None
+
+def get_mirrors(mirrors=None, offline=None, upstream=None):
+    """시도할 위치 목록 - 미러 다음에 (오프라인이 아니면) 원본 서버"""
+    mirrors = list(mirrors if mirrors is not None else SOURCE_MIRRORS)
+    offline = SOURCE_OFFLINE if offline is None else offline
+    if upstream and not offline:
+        mirrors.append(upstream)
+    if offline:
+        remote = [m for m in mirrors if _is_remote(m)]
+        if remote:
+            raise SourceError(f"Offline mode does not allow remote mirrors: {remote}")
+    return mirrors
+
+def _exists(location):
+    path = _local_path(location)
+    if path is not None:
+        return os.path.isfile(path)
+    request = urllib.request.Request(location, method='HEAD')
+    try:
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT):
+            return True
+    except (urllib.error.URLError, OSError):
+        return False
+
+def resolve(filename, mirrors, subdirs=('',)):
+    """미러들에서 파일 위치 탐색 - 처음 발견된 경로/URL 반환"""
+    for mirror in mirrors:
+        for subdir in subdirs:
+            location = _join(mirror, subdir, filename) if subdir else _join(mirror, filename)
+            if _exists(location):
+                return location
+    raise SourceError(f"{filename} not found in mirrors: {', '.join(mirrors) or '(none)'}")
+
+def fetch(location, dest):
+    """파일을 dest 로 복사/다운로드 (임시 파일에 쓴 뒤 rename)"""
+    os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(dest)}-", dir=os.path.dirname(os.path.abspath(dest)))
+    try:
+        path = _local_path(location)
+        with os.fdopen(fd, 'wb') as out:
+            if path is not None:
+                with open(path, 'rb') as src:
+                    shutil.copyfileobj(src, out, 4 * 1024 * 1024)
+            else:
+                with urllib.request.urlopen(location, timeout=FETCH_TIMEOUT) as response:
+                    shutil.copyfileobj(response, out, 4 * 1024 * 1024)
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return dest
+
+def file_sha512(path, chunk_size=4 * 1024 * 1024):
+    digest = hashlib.sha512()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def parse_checksums(text):
+    """sha512sum 형식 ('<hex>  <파일명>') 을 {파일명: hex} 로"""
+    checksums = {}
+    for line in text.splitlines():
+        match = re.match(r'^([0-9a-fA-F]{128})\s+\*?(\S+)\s*$', line.strip())
+        if match:
+            checksums[os.path.basename(match.group(2))] = match.group(1).lower()
+    return checksums
+
+def _read_location(location):
+    path = _local_path(location)
+    if path is not None:
+        with open(path) as f:
+            return f.read()
+    with urllib.request.urlopen(location, timeout=FETCH_TIMEOUT) as response:
+        return response.read().decode('utf-8', 'replace')
+
+def load_mirror_checksums(mirrors, subdirs=('',)):
+    """미러에 있는 sha512.sum / SHA512SUMS 파일들을 읽어 합친 체크섬 표"""
+    checksums = {}
+    for mirror in mirrors:
+        for subdir in subdirs:
+            for name in ('sha512.sum', 'SHA512SUMS'):
+                location = _join(mirror, subdir, name) if subdir else _join(mirror, name)
+                if not _exists(location):
+                    continue
+                for filename, digest in parse_checksums(_read_location(location)).items():
+                    checksums.setdefault(filename, digest)
+    return checksums
+
+def load_pinned_checksums(source_dir=None):
+    """GCC_SOURCE_CHECKSUMS 파일들과 <source_dir>/sha512.sum 의 체크섬 표 - 미러 접근 없이 읽음"""
+    paths = list(PINNED_CHECKSUM_FILES)
+    if source_dir:
+        paths.append(os.path.join(source_dir, PINNED_CHECKSUM_NAME))
+    checksums = {}
+    for path in paths:
+        try:
+            with open(path) as f:
+                for filename, digest in parse_checksums(f.read()).items():
+                    checksums.setdefault(filename, digest)
+        except OSError:
+            continue
+    return checksums
+
+def pin_checksum(source_dir, filename, digest):
+    """검증에 쓴 체크섬을 <source_dir>/sha512.sum 에 기록 - 이후 오프라인에서도 기존 아카이브를 검증 가능"""
+    path = os.path.join(source_dir, PINNED_CHECKSUM_NAME)
+    pinned = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            pinned = parse_checksums(f.read())
+    if pinned.get(filename) == digest.lower():
+        return
+    pinned[filename] = digest.lower()
+    content = ''.join(f"{value}  {name}\n" for name, value in sorted(pinned.items()))
+    if os.path.exists(path):
+        write_file_atomic(path, content)
+    else:
+        with open(path, 'w') as f:
+            f.write(content)
+
+def require_checksum(filename, expected):
+    """체크섬 없이 압축 해제하지 않음"""
+    if not expected:
+        raise SourceError(f"No SHA-512 checksum known for {filename} - pin it in "
+                          f"{PINNED_CHECKSUM_NAME} / GCC_SOURCE_CHECKSUMS or add sha512.sum to the mirror")
+
+def verify_sha512(path, expected):
+    actual = file_sha512(path)
+    if actual != expected.lower():
+        raise SourceError(f"SHA-512 mismatch for {path}\n  expected {expected}\n  actual   {actual}")
+    print(f"✅ SHA-512 verified: {os.path.basename(path)}")
+
+def fetch_verified(filename, dest_dir, mirrors, expected=None, subdirs=('',)):
+    """파일을 받아 검증 - 이미 있고 체크섬이 맞으면 재사용
+
+    체크섬을 모르면 기존 파일을 다시 받지 않고 그대로 반환 (압축 해제 전에 require_checksum 으로 막음).
+    """
+    dest = os.path.join(dest_dir, filename)
+    if os.path.exists(dest):
+        if not expected:
+            print(f"⚠️  Archive already exists: {filename} (no SHA-512 checksum known, not verified)")
+            return dest
+        if file_sha512(dest) == expected.lower():
+            print(f"✅ Archive already exists: {filename}")
+            return dest
+        print(f"⚠️  SHA-512 mismatch for existing {filename}, fetching again")
+    location = resolve(filename, mirrors, subdirs)
+    print(f"📦 Fetching {filename} from {location}")
+    started = time.time()
+    fetch(location, dest)
+    print(f"📦 Fetched {filename} ({os.path.getsize(dest) / 1024 ** 2:.1f} MB) in {time.time() - started:.1f}s")
+    if expected:
+        try:
+            verify_sha512(dest, expected)
+        except SourceError:
+            os.unlink(dest)
+            raise
+    else:
+        print(f"⚠️  No SHA-512 checksum known for {filename}, not verified")
+    return dest
+
+def remove_source_dir(path):
+    """기존 소스 디렉토리 제거 - 다른 곳(스크래치 공간 등)을 가리키는 심볼릭 링크면 링크만 지움"""
+    print(f"⚠️ Removing existing source directory: {path}")
+    if os.path.islink(path) or not os.path.isdir(path):
+        os.unlink(path)
+    else:
+        shutil.rmtree(path)
+
+def extract(archive, dest_dir):
+    """tar 아카이브 압축 해제 - 최상위 디렉토리 경로 반환"""
+    listing = subprocess.run(['tar', '-tf', archive], capture_output=True, text=True, check=True)
+    top = listing.stdout.split('\n', 1)[0].split('/', 1)[0]
+    target = os.path.join(dest_dir, top)
+    if os.path.lexists(target):
+        remove_source_dir(target)
+    print(f"📂 Extracting {os.path.basename(archive)}")
+    cmd = ['tar', '-xf', archive, '-C', dest_dir]
+    if archive.endswith('.xz') and shutil.which('xz'):
+        # 멀티스레드 xz 해제 (여러 블록으로 압축된 아카이브에서 효과)
+        cmd[1:1] = ['--use-compress-program=xz -T0']
+    subprocess.run(cmd, check=True)
+    return target
+
+def write_file_atomic(path, content):
+    """임시 파일에 쓴 뒤 교체 - 스냅샷과 하드링크로 공유된 파일을 원본에서 분리"""
+    st = os.stat(path) if os.path.exists(path) else None
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}-", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        if st:
+            os.chmod(tmp, st.st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+def read_prerequisites(gcc_src_dir):
+    """contrib/download_prerequisites 에서 prerequisite 아카이브 이름 읽기"""
+    script = os.path.join(gcc_src_dir, 'contrib', 'download_prerequisites')
+    with open(script) as f:
+        content = f.read()
+    archives = {}
+    for name in PREREQUISITES:
+        match = re.search(rf"^{name}='([^']+)'", content, re.MULTILINE)
+        if match:
+            archives[name] = match.group(1)
+    return archives
+
+def read_prerequisite_checksums(gcc_src_dir):
+    path = os.path.join(gcc_src_dir, 'contrib', 'prerequisites.sha512')
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return parse_checksums(f.read())
+
+def _prepare_prerequisite(name, archive, gcc_src_dir, mirrors, expected):
+    """prerequisite 1개 받기/검증/압축 해제 후 소스 트리에 링크"""
+    require_checksum(archive, expected)
+    fetch_verified(archive, gcc_src_dir, mirrors, expected, subdirs=('infrastructure', ''))
+    extracted = extract(os.path.join(gcc_src_dir, archive), gcc_src_dir)
+    link = os.path.join(gcc_src_dir, name)
+    if os.path.islink(link) or os.path.exists(link):
+        if os.path.isdir(link) and not os.path.islink(link):
+            shutil.rmtree(link)
+        else:
+            os.unlink(link)
+    os.symlink(os.path.basename(extracted), link)
+    os.unlink(os.path.join(gcc_src_dir, archive))
+    return name
+
+def prepare_prerequisites(gcc_src_dir, mirrors=None, offline=None, workers=None):
+    """gmp/mpfr/mpc/isl 을 병렬로 받아 검증하고 소스 트리에 링크 (download_prerequisites 대체)"""
+    mirrors = get_mirrors(mirrors, offline, INFRASTRUCTURE_UPSTREAM)
+    archives = read_prerequisites(gcc_src_dir)
+    checksums = read_prerequisite_checksums(gcc_src_dir)
+    if any(archive not in checksums for archive in archives.values()):
+        # GCC 트리에 없는 체크섬은 미러의 sha512.sum 에서
+        for filename, digest in load_mirror_checksums(mirrors, ('infrastructure', '')).items():
+            checksums.setdefault(filename, digest)
+    print(f"🔧 Preparing prerequisites: {', '.join(archives.values())}")
+    with ThreadPoolExecutor(max_workers=workers or FETCH_WORKERS) as pool:
+        futures = [pool.submit(_prepare_prerequisite, name, archive, gcc_src_dir, mirrors, checksums.get(archive))
+                   for name, archive in archives.items()]
+        for future in futures:
+            future.result()
+
+def fetch_gcc_archive(version, source_dir, mirrors=None, offline=None):
+    """gcc-<version>.tar.xz 를 source_dir 로 받아 검증하고 경로 반환"""
+    offline = SOURCE_OFFLINE if offline is None else offline
+    mirrors = get_mirrors(mirrors, offline, GCC_UPSTREAM)
+    archive = f"gcc-{version}.tar.xz"
+    subdirs = (f"gcc-{version}", '')
+    expected = os.environ.get('GCC_SOURCE_SHA512') or load_pinned_checksums(source_dir).get(archive)
+    pinned = bool(expected)
+    if not expected:
+        expected = load_mirror_checksums(mirrors, subdirs).get(archive)
+    require_checksum(archive, expected)
+    path = fetch_verified(archive, source_dir, mirrors, expected, subdirs)
+    if not pinned:
+        pin_checksum(source_dir, archive, expected)
+    return path
+
+def snapshot_enabled():
+    return os.environ.get('GCC_SOURCE_SNAPSHOT', '1') != '0'
+
+def get_snapshot_key(archive, patches=()):
+    """아카이브 SHA-512 + 패치 함수 소스로 스냅샷 키 계산 (prerequisite 목록/체크섬은 아카이브에 포함)"""
+    digest = hashlib.sha256(file_sha512(archive).encode())
+    for patch in patches:
+        digest.update(patch.__qualname__.encode())
+        digest.update(inspect.getsource(patch).encode())
+    return digest.hexdigest()
+
+def _read_marker(gcc_src_dir):
+    try:
+        with open(os.path.join(gcc_src_dir, SNAPSHOT_MARKER)) as f:
+            return json.load(f).get('key')
+    except (OSError, ValueError):
+        return None
+
+def materialize_tree(snapshot, target):
+    """스냅샷에서 작업 트리 생성 - reflink, 안되면 하드링크, 그래도 안되면 복사"""
+    for mode, cp_args in (('reflink', ['-a', '--reflink=always']), ('hardlink', ['-al']), ('copy', ['-a'])):
+        result = subprocess.run(['cp', *cp_args, snapshot, target], capture_output=True, text=True)
+        if result.returncode == 0:
+            return mode
+        shutil.rmtree(target, ignore_errors=True)
+    raise SourceError(f"Could not materialize {snapshot} → {target}: {result.stderr.strip()}")
+
+def _build_snapshot(archive, key, mirrors, offline, patches):
+    """아카이브 해제 + prerequisite + 패치를 적용한 스냅샷을 만들어 경로 반환"""
+    entry_dir = os.path.join(SNAPSHOT_DIR, key)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{key[:16]}-", dir=SNAPSHOT_DIR)
+    try:
+        gcc_src_dir = extract(archive, tmp_dir)
+        prepare_prerequisites(gcc_src_dir, mirrors, offline)
+        for patch in patches:
+            patch(gcc_src_dir)
+        with open(os.path.join(gcc_src_dir, SNAPSHOT_MARKER), 'w') as f:
+            json.dump({'key': key, 'archive': os.path.basename(archive), 'created': time.time()}, f)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # 다른 빌드가 같은 스냅샷을 먼저 만듦
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return os.path.join(entry_dir, os.path.basename(gcc_src_dir))
+
+def prepare_source(version, source_dir, mirrors=None, offline=None, patches=()):
+    """GCC 소스와 prerequisite 를 준비하고 소스 디렉토리 경로 반환 (get_source.sh 대체)
+
+    patches 는 gcc_src_dir 을 받는 함수 목록으로, 스냅샷에 한 번만 적용됨.
+    하드링크로 공유된 트리를 수정하는 패치는 write_file_atomic 으로 써야 함.
+    """
+    os.makedirs(source_dir, exist_ok=True)
+    gcc_src_dir = os.path.join(source_dir, f"gcc-{version}")
+    archive = os.path.join(source_dir, f"gcc-{version}.tar.xz")
+    offline = SOURCE_OFFLINE if offline is None else offline
+    # 이미 검증된 아카이브로 만든 트리면 미러에 접근하지 않고 바로 사용
+    if os.path.exists(archive) and _read_marker(gcc_src_dir):
+        key = get_snapshot_key(archive, patches)
+        if _read_marker(gcc_src_dir) == key:
+            print(f"✅ GCC {version} source already matches snapshot {key[:16]}")
+            return gcc_src_dir
+    if offline and os.path.exists(archive) and os.path.isdir(gcc_src_dir) and not _read_marker(gcc_src_dir):
+        # 오프라인에서 (스냅샷 이전 방식으로) 풀어 둔 트리는 다시 풀지 않고 사용 - 체크섬이 있으면 아카이브만 확인
+        expected = os.environ.get('GCC_SOURCE_SHA512') or load_pinned_checksums(source_dir).get(os.path.basename(archive))
+        if expected:
+            verify_sha512(archive, expected)
+        else:
+            print(f"⚠️  Offline without a SHA-512 checksum for {os.path.basename(archive)}, not verified")
+        print(f"✅ Using existing GCC {version} source: {gcc_src_dir}")
+        return gcc_src_dir
+
+    archive = fetch_gcc_archive(version, source_dir, mirrors, offline)
+    key = get_snapshot_key(archive, patches)
+    if not snapshot_enabled():
+        gcc_src_dir = extract(archive, source_dir)
+        prepare_prerequisites(gcc_src_dir, mirrors, offline)
+        for patch in patches:
+            patch(gcc_src_dir)
+        with open(os.path.join(gcc_src_dir, SNAPSHOT_MARKER), 'w') as f:
+            json.dump({'key': key, 'archive': os.path.basename(archive), 'created': time.time()}, f)
+        print(f"✅ GCC {version} source ready.")
+        return gcc_src_dir
+
+    entry_dir = os.path.join(SNAPSHOT_DIR, key)
+    snapshots = glob.glob(os.path.join(entry_dir, 'gcc-*'))
+    if snapshots and _read_marker(snapshots[0]) == key:
+        print(f"[SNAPSHOT] Source snapshot hit: {key[:16]}")
+        snapshot = snapshots[0]
+    else:
+        print(f"[SNAPSHOT] Source snapshot miss: {key[:16]}, building")
+        snapshot = _build_snapshot(archive, key, mirrors, offline, patches)
+
+    if os.path.lexists(gcc_src_dir):
+        remove_source_dir(gcc_src_dir)
+    started = time.time()
+    mode = materialize_tree(snapshot, gcc_src_dir)
+    print(f"[SNAPSHOT] Materialized {gcc_src_dir} ({mode}) in {time.time() - started:.1f}s")
+    print(f"✅ GCC {version} source ready.")
+    return gcc_src_dir
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description=prepare_source.__doc__)
+    parser.add_argument('version', help="GCC version, e.g. 11.5.0")
+    parser.add_argument('--source-dir', default='source')
+    parser.add_argument('--mirror', action='append', default=None,
+                        help="mirror directory or URL (repeatable, default $GCC_SOURCE_MIRROR)")
+    parser.add_argument('--offline', action='store_true', default=None, help="never contact upstream servers")
+    args = parser.parse_args(argv)
+    # 빌드 스크립트와 같은 패치 세트를 적용해야 같은 스냅샷 키가 나옴
+    from rezbuild import SOURCE_PATCHES
+    try:
+        prepare_source(args.version, args.source_dir, args.mirror, args.offline, SOURCE_PATCHES)
+    except (SourceError, OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,32 +3,8 @@ set -e
 
 # 현재 디렉토리에서 gcc 버전 파싱 (ex: gcc-11.5.0 → 11.5.0)
 VER=$(basename "$(pwd)" | sed 's/gcc-//')
-cd source
-
-ARCHIVE="gcc-${VER}.tar.xz"
-DIR="gcc-${VER}"
-
-# 아카이브 다운로드
-if [ ! -f "$ARCHIVE" ]; then
-    echo "📦 Downloading $ARCHIVE"
-    wget "https://ftp.gnu.org/gnu/gcc/gcc-${VER}/${ARCHIVE}"
-else
-    echo "✅ Archive already exists: $ARCHIVE"
-fi
-
-# 디렉토리 존재 시 삭제 후 재추출
-if [ -d "$DIR" ]; then
-    echo "⚠️ Removing existing source directory: $DIR"
-    rm -rf "$DIR"
-fi
-
-echo "📂 Extracting $ARCHIVE"
-tar -xf "$ARCHIVE"
-
-# prerequisites 다운로드
-echo "🔧 Downloading prerequisites (gmp, mpfr, mpc...)"
-cd "$DIR"
-./contrib/download_prerequisites
-
-echo "✅ GCC ${VER} source ready."
 
+# 소스/prerequisite 준비는 gcc_source.py 가 담당
+#   GCC_SOURCE_MIRROR=/srv/mirror/gnu  로컬 미러 (디렉토리 또는 file:// URL)
+#   GCC_SOURCE_OFFLINE=1               ftp.gnu.org / gcc.gnu.org 에 접속하지 않음
+python3 "$(dirname "$0")/gcc_source.py" "$VER" --source-dir source "$@"
@@ -22,7 +22,18 @@ tools = [
     'gcov-tool'
 ]
 
-variants = [['platform_linux']]
+# 두 번째 variant 는 gold 를 기본 링커로 빌드 (rezbuild.py 가 REZ_BUILD_VARIANT_REQUIRES 로 구분)
+# 사용: rez env gcc .gcc_linker-gold  /  빌드: rez build -i --variants 1
+variants = [
+    ['platform_linux'],
+    ['.gcc_linker-gold', 'platform_linux'],
+]
+
+# variant 별 빌드 모드 (full / minimal / optimized) - 설치 시 rezbuild.py 가 variant 하위 경로를 키로 기록
+build_flavor = {}
+
+# variant 별 $ORIGIN RUNPATH 설치 여부 (GCC_INSTALL_RUNPATH=1) - 설치 시 rezbuild.py 가 기록
+runpath = {}
 
 build_command = 'python {root}/rezbuild.py {install}'
 
@@ -33,9 +44,11 @@ def commands():
     # PATH 설정 (prepend로 우선순위 높이기)
     env.PATH.prepend(gcc_root + "/bin")
     
-    # 라이브러리 경로 설정
-    env.LD_LIBRARY_PATH.prepend(gcc_root + "/lib64")
-    env.LD_LIBRARY_PATH.prepend(gcc_root + "/lib")
+    # 라이브러리 경로 설정 - RUNPATH 설치는 바이너리와 specs 의 -rpath 로 찾으므로 필요 없음
+    variant = this.root[len(this.base):].strip('/')
+    if not this.runpath.get(variant, False):
+        env.LD_LIBRARY_PATH.prepend(gcc_root + "/lib64")
+        env.LD_LIBRARY_PATH.prepend(gcc_root + "/lib")
     
     # 컴파일러 환경 변수 설정
     if building:
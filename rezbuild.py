@@ -4,154 +4,942 @@ import sys
 import subprocess
 import glob
 import shutil
+import stat
 import re
 import time
 import tempfile
+import hashlib
+import json
+import threading
+import queue
+import contextlib
+import contextvars
+import mmap
+import shlex
+import errno
+import signal
+import ast
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+from gcc_source import write_file_atomic
+
 class BuildError(Exception):
     """커스텀 빌드 에러 클래스"""
-    def __init__(self, message, error_type=None, log_file=None):
+    def __init__(self, message, error_type=None, log_file=None, error_report=None, failed_make=None):
         super().__init__(message)
         self.error_type = error_type
         self.log_file = log_file
+        self.error_report = error_report
+        self.failed_make = failed_make
+
+def _parse_size(value):
+    """'512M', '5G' 같은 크기 문자열을 바이트로 변환"""
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    value = str(value).strip().upper().rstrip('B')
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+DEFAULT_PACKAGE_ROOT = "/core/Linux/APPZ/packages/gcc"
+
+# 기본 링커 변형 - package.py 의 variants 에서 '.gcc_linker-<이름>' 임시(ephemeral) 패키지로 선택
+# bfd 는 variant 요구 사항 없이 platform_linux 에 설치 (기존 경로 유지), 나머지는
+# <버전>/.gcc_linker-<이름>/platform_linux - platform_linux 아래에 두면 bfd 게시(링크 교체) 때 사라짐
+LINKER_VARIANT_PREFIX = '.gcc_linker-'
+LINKERS = {
+    'bfd': {'program': 'ld.bfd'},
+    'gold': {'program': 'ld.gold'},
+}
+
+def linker_variant_subpath(linker):
+    return 'platform_linux' if linker == 'bfd' else f"{LINKER_VARIANT_PREFIX}{linker}/platform_linux"
+
+def default_install_path(version, linker='bfd'):
+    return f"{DEFAULT_PACKAGE_ROOT}/{version}/{linker_variant_subpath(linker)}"
+
+def split_install_path(install_path):
+    """설치 경로를 (패키지 루트, 버전 디렉토리, variant 하위 경로)로 분리"""
+    parts = install_path.rstrip('/').split('/')
+    index = len(parts) - 1
+    if 'platform_linux' in parts:
+        index = len(parts) - 1 - parts[::-1].index('platform_linux')
+        if parts[index - 1].startswith(LINKER_VARIANT_PREFIX):
+            index -= 1
+    return '/'.join(parts[:index - 1]), '/'.join(parts[:index]), '/'.join(parts[index:])
+
+def _makeflags_jobs(makeflags):
+    """MAKEFLAGS 의 -jN 값 (없으면 CPU 수)"""
+    match = re.search(r'-j\s*(\d+)', makeflags or '')
+    return int(match.group(1)) if match else os.cpu_count() or 1
+
+class BuildConfig:
+    """GCC 빌드 한 건의 설정 - 전역 os.environ 대신 이 객체를 바꾸므로 한 프로세스에서 여러 빌드를 동시에 실행 가능"""
+    def __init__(self, source_path=None, build_path=None, install_path=None, version=None, mode=None,
+                 jobs=None, memory_budget=None, package_file='package.py', env=None, linker=None):
+        self.source_path = source_path
+        self.build_path = build_path
+        self.install_path = install_path
+        # os.environ 위에 덮어쓸 값 (REZ_GLIBC_ROOT, REZ_BINUTILS_ROOT 등)
+        self.env = dict(env or {})
+        self.version = version or self.getenv('REZ_BUILD_PROJECT_VERSION', '11.5.0')
+        if mode is None:
+            mode = 'minimal' if self.getenv('GCC_MINIMAL_BUILD', '0') == '1' else self.getenv('GCC_BUILD_MODE', 'full')
+        self.mode = mode.lower()
+        if linker is None:
+            # rez-build 는 빌드 중인 variant 의 요구 사항을 REZ_BUILD_VARIANT_REQUIRES 로 전달
+            variant = [req[len(LINKER_VARIANT_PREFIX):] for req in self.getenv('REZ_BUILD_VARIANT_REQUIRES', '').split()
+                       if req.startswith(LINKER_VARIANT_PREFIX)]
+            linker = self.getenv('GCC_LINKER') or (variant[0] if variant else 'bfd')
+        self.linker = linker.lower()
+        self.jobs = jobs or _makeflags_jobs(self.getenv('MAKEFLAGS'))
+        self.memory_budget = memory_budget  # 이 빌드의 make 가 쓸 수 있는 메모리 상한 (bytes, None 이면 시스템 전체)
+        self.package_file = package_file
+        self.trace = None
+        self.jobserver = None  # 빌드 중 make 병렬도를 조정하는 MakeJobserver
+
+    def getenv(self, name, default=None):
+        return self.env.get(name, os.environ.get(name, default))
+
+    def environ(self):
+        env = os.environ.copy()
+        env.update(self.env)
+        return env
+
+    @property
+    def name(self):
+        return f"{self.version}-{self.mode}" + (f"-{self.linker}" if self.linker != 'bfd' else '')
+
+# 스레드 풀 작업에는 submit_in_context 로 컨텍스트째 넘겨야 같은 설정/타임라인을 봄
+_BUILD_CONFIG = contextvars.ContextVar('rez_build_config', default=None)
+
+def current_build_config():
+    """현재 컨텍스트의 빌드 설정 (지정되지 않았으면 환경 변수 기준 기본 설정)"""
+    config = _BUILD_CONFIG.get()
+    if config is None:
+        config = BuildConfig()
+        _BUILD_CONFIG.set(config)
+    return config
+
+@contextlib.contextmanager
+def use_build_config(config):
+    """with 블록 동안 현재 컨텍스트의 빌드 설정을 config 로 바꿈"""
+    token = _BUILD_CONFIG.set(config)
+    try:
+        yield config
+    finally:
+        _BUILD_CONFIG.reset(token)
+
+def submit_in_context(pool, fn, *args, **kwargs):
+    """현재 빌드 설정(및 빌드 타임라인)을 유지한 채 스레드 풀에 작업 제출"""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+# 여러 빌드가 함께 쓰는 기록 파일(디스크 사용량, configure 캐시 시드) 갱신 보호
+_SHARED_STATE_LOCK = threading.Lock()
+
+# 빌드 로그 기록 설정 (환경 변수로 조정 가능)
+LOG_COMPRESS = os.environ.get('GCC_BUILD_LOG_COMPRESS', '').lower()     # '', 'gzip', 'zstd'
+LOG_ROTATE_BYTES = int(float(os.environ.get('GCC_BUILD_LOG_ROTATE_MB', '0')) * 1024 * 1024)
+LOG_ROTATE_KEEP = int(os.environ.get('GCC_BUILD_LOG_KEEP', '5'))
+LOG_BATCH_BYTES = 1024 * 1024
+LOG_QUEUE_LINES = int(os.environ.get('GCC_BUILD_LOG_QUEUE_LINES', '65536'))  # 쓰기가 느리면 여기서 make 출력을 늦춤
+LOG_FLUSH_INTERVAL = 0.5
+ECHO_LINES_PER_SEC = int(os.environ.get('GCC_BUILD_ECHO_RATE', '500'))  # 0이면 터미널 출력 안 함
+
+class BuildLogWriteError(BuildError):
+    """빌드 로그 기록 스레드의 실패 (디스크 부족 등) - 명령 실행 자체의 OSError 와 구분"""
+    def __init__(self, error, log_file=None):
+        super().__init__(f"Build log write failed: {error}",
+                         error_type='disk_space' if getattr(error, 'errno', None) == errno.ENOSPC else None,
+                         log_file=log_file)
+        self.error = error
+
+class BuildLogWriter:
+    """전용 스레드에서 로그를 모아서 기록 (압축/크기 기준 로테이션 지원)
+
+    큐 크기에 상한이 있어 기록이 밀리면 write() 가 기다림 (파이프를 통해 make 에 역압력).
+    기록 스레드의 예외(ENOSPC 등)는 보관했다가 write()/close() 에서 다시 발생.
+    """
+    def __init__(self, log_file, compress=None, rotate_bytes=None, keep=None, max_lines=None):
+        self.compress = LOG_COMPRESS if compress is None else compress
+        self.rotate_bytes = LOG_ROTATE_BYTES if rotate_bytes is None else rotate_bytes
+        self.keep = LOG_ROTATE_KEEP if keep is None else keep
+        self.suffix = ''
+        if self.compress == 'zstd':
+            try:
+                import zstandard  # noqa: F401
+                self.suffix = '.zst'
+            except ImportError:
+                print("[WARNING] zstandard module not available, falling back to gzip log compression")
+                self.compress = 'gzip'
+        if self.compress == 'gzip':
+            self.suffix = '.gz'
+        elif self.compress not in ('', 'zstd'):
+            print(f"[WARNING] Unknown log compression '{self.compress}', writing plain log")
+            self.compress = ''
+
+        self.base_path = str(log_file)
+        self.path = self.base_path + self.suffix
+        self._queue = queue.Queue(maxsize=LOG_QUEUE_LINES if max_lines is None else max_lines)
+        self._error = None
+        self._error_raised = False
+        self._file = None
+        self._raw = None
+        self._written = 0
+        self._open()
+        self._thread = threading.Thread(target=self._run, name='build-log-writer', daemon=True)
+        self._thread.start()
+
+    def _open(self):
+        if self.compress == 'zstd':
+            import zstandard
+            self._raw = open(self.path, 'ab')
+            self._file = zstandard.ZstdCompressor(level=3, threads=-1).stream_writer(self._raw)
+        elif self.compress == 'gzip':
+            import gzip
+            self._file = gzip.open(self.path, 'ab', compresslevel=3)
+        else:
+            self._file = open(self.path, 'ab')
+        self._written = 0 if self.compress else os.path.getsize(self.path)
+
+    def _close_file(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._raw:
+            self._raw.close()
+            self._raw = None
+
+    def _rotate(self):
+        """build.log → build.log.1 … build.log.N 순으로 밀어내기"""
+        self._close_file()
+        for index in range(self.keep - 1, 0, -1):
+            src = f"{self.base_path}.{index}{self.suffix}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.base_path}.{index + 1}{self.suffix}")
+        if self.keep > 0:
+            os.replace(self.path, f"{self.base_path}.1{self.suffix}")
+        else:
+            os.remove(self.path)
+        self._open()
+
+    def _run(self):
+        try:
+            self._write_loop()
+        except BaseException as e:
+            self._error = e
+            self._close_file_quietly()
+
+    def _close_file_quietly(self):
+        try:
+            self._close_file()
+        except OSError:
+            pass
+
+    def _write_loop(self):
+        batch = []
+        batch_bytes = 0
+        done = False
+        while not done:
+            try:
+                item = self._queue.get(timeout=LOG_FLUSH_INTERVAL)
+            except queue.Empty:
+                item = ''
+            if item is None:
+                done = True
+            elif item:
+                batch.append(item)
+                batch_bytes += len(item)
+                if batch_bytes < LOG_BATCH_BYTES:
+                    continue
+            if batch:
+                data = ''.join(batch).encode('utf-8', 'replace')
+                self._file.write(data)
+                self._file.flush()
+                self._written += len(data)
+                batch = []
+                batch_bytes = 0
+                if self.rotate_bytes and self._written >= self.rotate_bytes:
+                    self._rotate()
+        self._close_file()
+
+    def _raise_error(self):
+        self._error_raised = True
+        raise BuildLogWriteError(self._error, self.path) from self._error
+
+    def write(self, line):
+        while True:
+            if self._error:
+                self._raise_error()
+            try:
+                self._queue.put(line, timeout=LOG_FLUSH_INTERVAL)
+                return
+            except queue.Full:
+                continue
+
+    def close(self, raise_error=True):
+        # 기록 스레드가 이미 멈췄으면 큐가 가득 차 있을 수 있으므로 기다리지 않음
+        while self._thread.is_alive():
+            try:
+                self._queue.put(None, timeout=LOG_FLUSH_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        if self._error and raise_error and not self._error_raised:
+            self._raise_error()
+
+class TerminalEcho:
+    """터미널 출력을 빌드 파이프와 분리하고 초당 라인 수를 제한"""
+    TICK = 0.1
+
+    def __init__(self, lines_per_sec=None, stream=None):
+        self.lines_per_sec = ECHO_LINES_PER_SEC if lines_per_sec is None else lines_per_sec
+        self.stream = stream or sys.stdout
+        self._lines = deque(maxlen=max(1, self.lines_per_sec * 5))
+        self._dropped = 0
+        self._stop = threading.Event()
+        self._thread = None
+        if self.lines_per_sec > 0:
+            self._thread = threading.Thread(target=self._run, name='build-echo', daemon=True)
+            self._thread.start()
+
+    def put(self, line):
+        if not self._thread:
+            return
+        if len(self._lines) == self._lines.maxlen:
+            self._dropped += 1
+        self._lines.append(line)
+
+    def _drain(self, limit):
+        out = []
+        if self._dropped:
+            out.append(f"[... {self._dropped} lines not echoed, see build log ...]\n")
+            self._dropped = 0
+        while self._lines and len(out) < limit:
+            out.append(self._lines.popleft())
+        if out:
+            try:
+                self.stream.write(''.join(out))
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass
+
+    def _run(self):
+        per_tick = max(1, int(self.lines_per_sec * self.TICK))
+        while not self._stop.wait(self.TICK):
+            self._drain(per_tick)
+        # 종료 시에는 가장 최근 출력만 보여줌
+        while len(self._lines) > per_tick:
+            self._lines.popleft()
+            self._dropped += 1
+        self._drain(per_tick)
+
+    def close(self):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+# 빌드 타임라인 (Chrome trace JSON - Perfetto / chrome://tracing 에서 열기)
+class BuildTrace:
+    """단계/명령/make 디렉토리 구간을 Chrome trace 'X' 이벤트로 기록"""
+    def __init__(self, path=None):
+        self.path = path
+        self.events = []
+        self._lanes = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._started_at = time.time()
+        self.lane('build')
+
+    def now(self):
+        return int((time.perf_counter() - self._origin) * 1e6)
+
+    def lane(self, name):
+        """구간을 그릴 줄 (tid) - 이름별로 하나씩"""
+        with self._lock:
+            if name not in self._lanes:
+                self._lanes[name] = len(self._lanes)
+                self.events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': self._lanes[name],
+                                    'args': {'name': name}})
+            return self._lanes[name]
+
+    def complete(self, name, start, end=None, lane='build', cat='phase', args=None):
+        event = {'name': name, 'cat': cat, 'ph': 'X', 'pid': 1, 'tid': self.lane(lane),
+                 'ts': start, 'dur': max(0, (self.now() if end is None else end) - start)}
+        if args:
+            event['args'] = args
+        with self._lock:
+            self.events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name, lane='build', cat='phase', **args):
+        start = self.now()
+        try:
+            yield
+        except BaseException as e:
+            args['error'] = type(e).__name__
+            raise
+        finally:
+            self.complete(name, start, lane=lane, cat=cat, args=args or None)
+
+    def save(self, path=None):
+        path = path or self.path
+        if not path:
+            return
+        with self._lock:
+            data = {
+                'traceEvents': list(self.events),
+                'displayTimeUnit': 'ms',
+                'otherData': {'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._started_at)),
+                              'build_mode': get_build_mode(), 'host': os.uname().nodename},
+            }
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}"
+        with open(tmp, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+def start_build_trace(path):
+    current_build_config().trace = BuildTrace(path)
+    return current_build_config().trace
+
+def get_build_trace():
+    return current_build_config().trace
+
+def trace_span(name, lane='build', cat='phase', **args):
+    """빌드 타임라인이 켜져 있으면 구간 기록, 아니면 아무것도 안 함"""
+    trace = get_build_trace()
+    if trace is None:
+        return contextlib.nullcontext()
+    return trace.span(name, lane=lane, cat=cat, **args)
+
+class MakeDirectoryTracker:
+    """make 의 Entering/Leaving directory 출력에서 하위 디렉토리(모듈)별 구간 추출"""
+    DIRECTORY_RE = re.compile(r"^make(?:\[\d+\])?: (Entering|Leaving) directory [`'](.*)'")
+
+    def __init__(self, trace, top_dir, label=None):
+        self.trace = trace
+        self.top_dir = os.path.realpath(top_dir)
+        self.label = label
+        self._open = {}  # 모듈 -> [중첩 깊이, 시작 시각]
+
+    def module_for(self, directory):
+        """gcc-build/<모듈> 또는 gcc-build/<target>/<라이브러리> 단위로 묶음"""
+        rel = os.path.relpath(os.path.realpath(directory), self.top_dir)
+        if rel == '.' or rel.startswith('..'):
+            return None
+        parts = rel.split(os.sep)
+        if len(parts) > 1 and '-linux' in parts[0]:
+            return '/'.join(parts[:2])
+        return parts[0]
+
+    def feed(self, line):
+        if 'directory' not in line:
+            return
+        match = self.DIRECTORY_RE.match(line)
+        if not match:
+            return
+        module = self.module_for(match.group(2))
+        if module is None:
+            return
+        state = self._open.get(module)
+        if match.group(1) == 'Entering':
+            if state:
+                state[0] += 1
+            else:
+                self._open[module] = [1, self.trace.now()]
+        elif state:
+            state[0] -= 1
+            if state[0] <= 0:
+                self._end(module, self._open.pop(module)[1])
+
+    def _end(self, module, start):
+        self.trace.complete(module, start, lane=module, cat='make',
+                            args={'phase': self.label} if self.label else None)
+
+    def close(self):
+        for module, (_, start) in self._open.items():
+            self._end(module, start)
+        self._open.clear()
+
+class MakeFailureTracker:
+    """스트리밍 출력에서 가장 먼저 실패한 하위 make 의 디렉토리와 타겟 기록"""
+    FAILURE_RE = re.compile(r"^make(?:\[(\d+)\])?: \*\*\* \[(?:[^\]]*?:\d+: )?([^\]]+)\] Error \d+")
+
+    def __init__(self, top_dir):
+        self.top_dir = top_dir
+        self._dirs = {}  # make 레벨 -> 열려 있는 디렉토리 목록 (병렬 실행 시 여러 개)
+        self._failure = None
+        self._pending = None  # 디렉토리를 아직 모르는 실패 - 같은 레벨의 다음 Leaving 으로 확정
+
+    @property
+    def failure(self):
+        return self._failure or self._pending
 
-def run_cmd_with_logging(cmd, cwd=None, env=None, log_file=None, timeout=None):
+    def feed(self, line):
+        if self._failure or not line.startswith('make'):
+            return
+        if 'directory' in line:
+            match = MakeDirectoryTracker.DIRECTORY_RE.match(line)
+            if not match:
+                return
+            level = int(re.match(r'make(?:\[(\d+)\])?', line).group(1) or 0)
+            dirs = self._dirs.setdefault(level, [])
+            if match.group(1) == 'Entering':
+                dirs.append(match.group(2))
+                return
+            if match.group(2) in dirs:
+                del dirs[len(dirs) - 1 - dirs[::-1].index(match.group(2))]
+            if self._pending and self._pending['level'] == level:
+                # 실패한 make 는 에러를 출력한 뒤 자기 디렉토리를 떠나며 끝남
+                self._failure = dict(self._pending, directory=match.group(2))
+                self._pending = None
+        elif '***' in line and not self._pending:
+            match = self.FAILURE_RE.match(line)
+            if match:
+                level = int(match.group(1) or 0)
+                dirs = self._dirs.get(level) or []
+                # 가장 안쪽 make 가 먼저 실패를 출력하므로 첫 실패가 원인 위치
+                failure = {'level': level, 'target': match.group(2),
+                           'directory': dirs[-1] if dirs else self.top_dir}
+                if len(dirs) > 1:
+                    # 같은 레벨에서 여러 make 가 병렬로 돌면 어느 디렉토리인지 아직 모름 (마지막 것은 추정값)
+                    self._pending = failure
+                else:
+                    self._failure = failure
+
+def run_cmd_with_logging(cmd, cwd=None, env=None, log_file=None, timeout=None, pass_fds=(), trace_label=None):
     """로깅 및 에러 처리가 강화된 명령 실행"""
     print(f"[RUN] {cmd}")
     
+    telemetry_file = None
     if log_file:
         log_path = Path(log_file).parent
         log_path.mkdir(parents=True, exist_ok=True)
+        telemetry_file = os.path.join(log_path, TELEMETRY_FILE_NAME)
+    else:
+        with tempfile.NamedTemporaryFile(prefix='rezbuild-', suffix='.log', delete=False) as tmp:
+            log_file = tmp.name
+
+    # 로그 기록과 터미널 출력은 별도 스레드에서 처리 - 파이프 읽기를 막지 않음
+    writer = BuildLogWriter(log_file)
+    echo = TerminalEcho()
+    indexer = LogIndexBuilder(writer.path) if not (writer.compress or writer.rotate_bytes) else None
+    trace = get_build_trace()
+    tracker = MakeDirectoryTracker(trace, cwd or os.getcwd(), trace_label) if trace else None
+    command_start = trace.now() if trace else None
+    failures = MakeFailureTracker(cwd or os.getcwd())
+    jobserver = current_build_config().jobserver
+    telemetry = None
+    process = None
     
     try:
-        with open(log_file, 'a') if log_file else tempfile.NamedTemporaryFile(mode='w+', delete=False) as f:
-            process = subprocess.Popen(
-                cmd, 
-                cwd=cwd, 
-                env=env or os.environ, 
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                universal_newlines=True,
-                bufsize=1
+        process = subprocess.Popen(
+            cmd, 
+            cwd=cwd, 
+            env=env or os.environ, 
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            universal_newlines=True,
+            errors='replace',
+            bufsize=LOG_BATCH_BYTES,
+            pass_fds=pass_fds
+        )
+        if jobserver and pass_fds:
+            jobserver.attach(process.pid)
+        if telemetry_file and telemetry_enabled():
+            telemetry = ProcessTelemetry(process.pid, telemetry_file, trace_label)
+        
+        # 출력 전체를 보관하지 않고 스트리밍으로 분류
+        classifier = BuildLogClassifier()
+        for line in iter(process.stdout.readline, ''):
+            echo.put(line)
+            writer.write(line)
+            classifier.feed(line)
+            failures.feed(line)
+            if indexer:
+                indexer.feed(line)
+            if tracker:
+                tracker.feed(line)
+        
+        process.wait(timeout=timeout)
+        echo.close()
+        
+        if process.returncode != 0:
+            # 에러 발생 시 로그 분석
+            error_type = classifier.error_type() if classifier.line_count else "unknown"
+            raise BuildError(
+                f"Command failed with return code {process.returncode}",
+                error_type=error_type,
+                log_file=writer.path,
+                error_report=classifier.report(),
+                failed_make=failures.failure
             )
-            
-            output_lines = []
-            for line in iter(process.stdout.readline, ''):
-                print(line.rstrip())  # 실시간 출력
-                f.write(line)
-                f.flush()
-                output_lines.append(line.rstrip())
-            
-            process.wait(timeout=timeout)
-            
-            if process.returncode != 0:
-                # 에러 발생 시 로그 분석
-                error_type = analyze_build_error(output_lines)
-                raise BuildError(
-                    f"Command failed with return code {process.returncode}",
-                    error_type=error_type,
-                    log_file=f.name if not log_file else log_file
-                )
                 
     except subprocess.TimeoutExpired:
         process.kill()
-        raise BuildError("Command timed out", error_type="timeout")
+        raise BuildError("Command timed out", error_type="timeout", log_file=writer.path)
+    except BuildLogWriteError:
+        # 로그 기록 실패 (디스크 부족 등) - 명령을 계속 돌리지 않음
+        if process and process.poll() is None:
+            process.kill()
+        raise
+    finally:
+        # 이미 다른 예외가 전파 중이면 기록 스레드 예외로 덮어쓰지 않음
+        writer.close(raise_error=sys.exc_info()[0] is None)
+        echo.close()
+        if indexer:
+            indexer.close()
+        if telemetry:
+            telemetry.close()
+        if jobserver and process:
+            jobserver.detach(process.pid)
+        if tracker:
+            tracker.close()
+            trace.complete(cmd if len(cmd) < 80 else cmd[:77] + '...', command_start, lane='commands', cat='command',
+                           args={'cwd': cwd, 'returncode': process.returncode if process else None})
 
 def run_cmd(cmd, cwd=None, env=None):
     """기존 호환성을 위한 래퍼 함수"""
     run_cmd_with_logging(cmd, cwd, env)
 
 def clean_path(path):
-    if os.path.exists(path):
+    if os.path.islink(path):
+        print(f"🧹 Removing link: {path}")
+        os.unlink(path)
+    elif os.path.exists(path):
         print(f"🧹 Removing: {path}")
         shutil.rmtree(path)
 
+# 에러 유형별 패턴
+ERROR_PATTERNS = {
+    'gmp_strnlen': [
+        r'undefined reference to.*strnlen',
+        r'multiple definition of.*strnlen',
+        r'redefinition of.*strnlen'
+    ],
+    'missing_deps': [
+        r'cannot find -l\w+',
+        r'No such file or directory.*\.so',
+        r'library not found'
+    ],
+    'header_missing': [
+        r'fatal error.*No such file',
+        r'stdlib\.h.*not found',
+        r'stdio\.h.*not found',
+        r'#include.*No such file'
+    ],
+    'disk_space': [
+        r'No space left on device',
+        r'cannot create temp file',
+        r'write error.*No space'
+    ],
+    'memory_limit': [
+        r'virtual memory exhausted',
+        r'Cannot allocate memory',
+        r'cc1.*killed.*signal 9'
+    ],
+    'permission_denied': [
+        r'Permission denied',
+        r'cannot create directory.*Permission',
+        r'Operation not permitted'
+    ],
+    'configure_failed': [
+        r'configure: error:',
+        # 컴파일 명령의 -fchecking ... -fno-* 에 걸리지 않도록 configure 출력 형식으로 한정
+        r'^checking .*\.\.\. no\b',
+        r'configure.*failed',
+        r'Makefile:.*all.*오류',
+        r'make:.*\*\*\*.*오류'
+    ],
+    'compile_error': [
+        r'error:.*undeclared',
+        r'error:.*not declared',
+        r'fatal error:.*compilation terminated'
+    ],
+    'link_error': [
+        r'undefined reference to',
+        r'ld:.*cannot find',
+        r'collect2:.*error:'
+    ],
+    'gcc_bootstrap_error': [
+        r'stage1.*failed',
+        r'stage2.*failed',
+        r'stage3.*failed',
+        r'bootstrap.*failed',
+        r'fixincludes.*failed'
+    ],
+    'makefile_error': [
+        # Entering/Leaving directory는 정상 출력이므로 실제 실패 라인만 매칭
+        r'recipe for target.*failed',
+        r'make(\[\d+\])?: \*\*\* .*Error \d+'
+    ]
+}
+
+# 에러 유형별 심각도 (높을수록 우선, 같은 심각도는 먼저 나온 쪽 우선)
+ERROR_SEVERITY = {
+    'disk_space': 100,
+    'memory_limit': 95,
+    'gmp_strnlen': 90,
+    'permission_denied': 85,
+    'header_missing': 80,
+    'missing_deps': 75,
+    'compile_error': 70,
+    'link_error': 65,
+    'configure_failed': 60,
+    'gcc_bootstrap_error': 50,
+    'makefile_error': 20
+}
+
+def _required_literal(pattern):
+    """정규식에서 반드시 나타나야 하는 가장 긴 리터럴 조각 추출 (소문자)"""
+    runs = []
+    current = ''
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == '\\' and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            if depth == 0 and not nxt.isalnum():
+                current += nxt
+            else:
+                runs.append(current)
+                current = ''
+            i += 2
+            continue
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            raise ValueError(f"top-level alternation not supported in error pattern: {pattern}")
+        elif c == '[':
+            # 문자 클래스는 통째로 건너뛰기
+            i = pattern.index(']', i + 1)
+        elif c in '*?{' and depth == 0:
+            # 앞 글자가 선택적이 되므로 리터럴에서 제외
+            current = current[:-1]
+            if c == '{':
+                i = pattern.index('}', i)
+        elif depth == 0 and c not in '.^$+':
+            current += c
+            i += 1
+            continue
+        runs.append(current)
+        current = ''
+        i += 1
+    runs.append(current)
+    literal = max(runs, key=len).lower()
+    if not literal:
+        raise ValueError(f"error pattern has no required literal: {pattern}")
+    return literal
+
+def _keyword_trie_regex(keywords):
+    """키워드 목록을 트라이 구조 정규식으로 변환 (키워드 끝마다 named group 표시)"""
+    trie = {}
+    for index, keyword in enumerate(keywords):
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = index
+
+    def emit(node):
+        branches = [re.escape(ch) + emit(child)
+                    for ch, child in sorted(node.items()) if ch != '']
+        if not branches:
+            return f"(?P<k{node['']}>)"
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            # 더 긴 키워드가 있으면 우선 시도하고 없으면 여기서 종료
+            body = f"(?:{body}|(?P<k{node['']}>))"
+        return body
+
+    return re.compile(emit(trie))
+
+def _compile_error_rules(error_patterns):
+    """모든 패턴을 import 시 1회 컴파일하여 키워드 오토마톤 + 규칙 테이블 생성"""
+    rules = []
+    keywords = []
+    for error_type, patterns in error_patterns.items():
+        for pattern in patterns:
+            keyword = _required_literal(pattern)
+            if keyword not in keywords:
+                keywords.append(keyword)
+            rules.append((error_type, pattern, re.compile(pattern, re.IGNORECASE), keyword))
+    return _keyword_trie_regex(keywords), keywords, rules
+
+_ERROR_KEYWORD_MATCHER, _ERROR_KEYWORDS, _ERROR_RULES = _compile_error_rules(ERROR_PATTERNS)
+
+def _match_candidate_line(line, lowered):
+    """키워드가 걸린 라인에 대해 카테고리별 첫 매치 패턴 반환"""
+    matches = []
+    seen_types = set()
+    for error_type, pattern, regex, keyword in _ERROR_RULES:
+        if error_type in seen_types or keyword not in lowered:
+            continue
+        if regex.search(line):
+            seen_types.add(error_type)
+            matches.append((error_type, pattern))
+    return matches
+
+def match_error_line(line):
+    """한 줄에서 매치되는 모든 (error_type, pattern) 반환"""
+    lowered = line.lower()
+    # 키워드 오토마톤으로 1차 판정 - 대부분의 라인은 여기서 끝남
+    if not _ERROR_KEYWORD_MATCHER.search(lowered):
+        return []
+    return _match_candidate_line(line, lowered)
+
+def match_error_text(text, first_line_no=1):
+    """여러 줄 텍스트를 한 번만 스캔하며 매치 목록 생성 (line_no, error_type, pattern, line)"""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # 소문자 변환으로 길이가 바뀌는 드문 경우에는 라인 단위로 처리
+        for offset, line in enumerate(text.split('\n')):
+            for error_type, pattern in match_error_line(line):
+                yield first_line_no + offset, error_type, pattern, line
+        return
+
+    pos = 0
+    line_no = first_line_no
+    end = len(text)
+    search = _ERROR_KEYWORD_MATCHER.search
+    while pos < end:
+        m = search(lowered, pos)
+        if not m:
+            break
+        line_start = lowered.rfind('\n', 0, m.start()) + 1
+        line_end = lowered.find('\n', m.end())
+        if line_end < 0:
+            line_end = end
+        line_no += lowered.count('\n', pos, line_start)
+        line = text[line_start:line_end]
+        for error_type, pattern in _match_candidate_line(line, lowered[line_start:line_end]):
+            yield line_no, error_type, pattern, line
+        pos = line_end + 1
+        line_no += 1
+
+def rank_error_matches(matches):
+    """매치 목록을 심각도 → 위치 순으로 정렬"""
+    return sorted(matches, key=lambda m: (-ERROR_SEVERITY.get(m['error_type'], 0), m['line_no']))
+
+# 스트리밍 분류기 기본값 (환경 변수로 조정 가능)
+CLASSIFIER_TAIL_LINES = int(os.environ.get('GCC_LOG_TAIL_LINES', '200'))
+CLASSIFIER_MAX_HITS = int(os.environ.get('GCC_LOG_MAX_HITS', '20'))
+CLASSIFIER_CONTEXT_LINES = int(os.environ.get('GCC_LOG_CONTEXT_LINES', '5'))
+
+class BuildLogClassifier:
+    """빌드 출력을 한 줄씩 분류하는 스트리밍 분류기 (메모리 사용량 고정)"""
+    def __init__(self, tail_lines=None, max_hits=None, context_lines=None):
+        self.tail = deque(maxlen=tail_lines or CLASSIFIER_TAIL_LINES)
+        self.max_hits = max_hits if max_hits is not None else CLASSIFIER_MAX_HITS
+        self.context_lines = context_lines if context_lines is not None else CLASSIFIER_CONTEXT_LINES
+        self.hits = []
+        self.line_count = 0
+        self.generic_error = False
+        # 카테고리별 최초 매치 (category -> match dict)
+        self._first_match = {}
+        # 아직 after-context를 채우는 중인 hit 목록
+        self._pending = []
+
+    def feed(self, line):
+        """출력 한 줄 처리"""
+        line = line.rstrip('\n')
+        self.line_count += 1
+
+        # 이전 hit들의 뒤쪽 컨텍스트 채우기
+        if self._pending:
+            for hit in self._pending:
+                hit['after'].append(line)
+            self._pending = [h for h in self._pending
+                             if len(h['after']) < self.context_lines]
+
+        for error_type, pattern in match_error_line(line):
+            self._record(error_type, pattern, line, self.line_count)
+
+        if not self.generic_error:
+            lowered = line.lower()
+            if 'error:' in lowered or 'failed' in lowered:
+                self.generic_error = True
+
+        self.tail.append(line)
+
+    def feed_text(self, text):
+        """여러 줄 텍스트 일괄 처리 (컨텍스트 없이 매치만 기록)"""
+        base = self.line_count + 1
+        for line_no, error_type, pattern, line in match_error_text(text, base):
+            self._record(error_type, pattern, line, line_no, with_context=False)
+        if not self.generic_error:
+            lowered = text.lower()
+            if 'error:' in lowered or 'failed' in lowered:
+                self.generic_error = True
+        self.line_count += text.count('\n')
+
+    def _record(self, error_type, pattern, line, line_no, with_context=True):
+        hit = {
+            'error_type': error_type,
+            'severity': ERROR_SEVERITY.get(error_type, 0),
+            'pattern': pattern,
+            'line_no': line_no,
+            'line': line,
+            'before': list(self.tail)[-self.context_lines:] if with_context and self.context_lines else [],
+            'after': []
+        }
+        if error_type not in self._first_match:
+            self._first_match[error_type] = hit
+        if len(self.hits) >= self.max_hits:
+            return
+        self.hits.append(hit)
+        if with_context and self.context_lines:
+            self._pending.append(hit)
+
+    def matches(self):
+        """카테고리별 최초 매치를 심각도/위치 순으로 정렬해 반환"""
+        return rank_error_matches(self._first_match.values())
+
+    def error_type(self):
+        """가장 심각하고 가장 먼저 나온 에러 유형"""
+        ranked = self.matches()
+        if ranked:
+            top = ranked[0]
+            print(f"[ERROR DETECTED] {top['error_type']}: {top['pattern']} (line {top['line_no']})")
+            for other in ranked[1:]:
+                print(f"[ERROR DETECTED]   also: {other['error_type']} (line {other['line_no']})")
+            return top['error_type']
+
+        # 특정 패턴을 찾지 못한 경우
+        if self.generic_error:
+            return "generic_error"
+
+        return "unknown"
+
+    def report(self):
+        """에러 hit과 마지막 출력 요약"""
+        lines = []
+        for hit in self.hits:
+            lines.append(f"--- {hit['error_type']} (line {hit['line_no']}) ---")
+            lines.extend(hit['before'])
+            lines.append(f">>> {hit['line']}")
+            lines.extend(hit['after'])
+        if self.tail:
+            lines.append(f"--- last {len(self.tail)} lines ---")
+            lines.extend(self.tail)
+        return '\n'.join(lines)
+
 def analyze_build_error(output_lines):
     """빌드 로그를 분석하여 에러 유형 분류"""
     if not output_lines:
         return "unknown"
-    
-    # 로그를 하나의 문자열로 합치기
-    log_text = '\n'.join(output_lines)
-    
-    error_patterns = {
-        'gmp_strnlen': [
-            r'undefined reference to.*strnlen',
-            r'multiple definition of.*strnlen',
-            r'redefinition of.*strnlen'
-        ],
-        'missing_deps': [
-            r'cannot find -l\w+',
-            r'No such file or directory.*\.so',
-            r'library not found'
-        ],
-        'header_missing': [
-            r'fatal error.*No such file',
-            r'stdlib\.h.*not found',
-            r'stdio\.h.*not found',
-            r'#include.*No such file'
-        ],
-        'disk_space': [
-            r'No space left on device',
-            r'cannot create temp file',
-            r'write error.*No space'
-        ],
-        'memory_limit': [
-            r'virtual memory exhausted',
-            r'Cannot allocate memory',
-            r'cc1.*killed.*signal 9'
-        ],
-        'permission_denied': [
-            r'Permission denied',
-            r'cannot create directory.*Permission',
-            r'Operation not permitted'
-        ],
-        'configure_failed': [
-            r'configure: error:',
-            r'checking.*no',
-            r'configure.*failed',
-            r'Makefile:.*all.*오류',
-            r'make:.*\*\*\*.*오류'
-        ],
-        'compile_error': [
-            r'error:.*undeclared',
-            r'error:.*not declared',
-            r'fatal error:.*compilation terminated'
-        ],
-        'link_error': [
-            r'undefined reference to',
-            r'ld:.*cannot find',
-            r'collect2:.*error:'
-        ],
-        'gcc_bootstrap_error': [
-            r'stage1.*failed',
-            r'stage2.*failed',
-            r'stage3.*failed',
-            r'bootstrap.*failed',
-            r'fixincludes.*failed'
-        ],
-        'makefile_error': [
-            r'make.*Leaving directory',
-            r'make.*Entering directory',
-            r'recipe for target.*failed',
-            r'Error.*\[.*\]'
-        ]
-    }
-    
-    # 에러 패턴 매칭
-    for error_type, patterns in error_patterns.items():
-        for pattern in patterns:
-            if re.search(pattern, log_text, re.IGNORECASE):
-                print(f"[ERROR DETECTED] {error_type}: {pattern}")
-                return error_type
-    
-    # 특정 패턴을 찾지 못한 경우
-    if 'error:' in log_text.lower() or 'failed' in log_text.lower():
-        return "generic_error"
-    
-    return "unknown"
+
+    classifier = BuildLogClassifier()
+    for line in output_lines:
+        classifier.feed(line)
+    return classifier.error_type()
 
 def auto_fix_error(error_type, build_dir, gcc_src_dir, install_path):
     """에러 유형에 따른 자동 수정"""
@@ -172,7 +960,7 @@ def auto_fix_error(error_type, build_dir, gcc_src_dir, install_path):
             fixes_applied.append("Header paths")
     
     elif error_type == 'disk_space':
-        if cleanup_build_artifacts(build_dir):
+        if reclaim_build_space(build_dir):
             fixes_applied.append("Disk space cleanup")
     
     elif error_type == 'memory_limit':
@@ -224,8 +1012,7 @@ def fix_gmp_strnlen_conflict(gcc_src_dir):
                     flags=re.DOTALL
                 )
                 
-                with open(patch_file, 'w') as f:
-                    f.write(content)
+                write_file_atomic(patch_file, content)
                     
                 print("[AUTO FIX] Applied enhanced GMP strnlen patch")
                 return True
@@ -267,43 +1054,654 @@ def fix_header_paths(gcc_src_dir):
         print(f"[AUTO FIX] Failed to fix header paths: {e}")
         return False
 
-def cleanup_build_artifacts(build_dir):
-    """빌드 아티팩트 정리"""
-    try:
-        if os.path.exists(build_dir):
-            # 임시 파일들 정리
-            temp_patterns = ['*.tmp', '*.temp', 'core.*', '*.o']
-            cleaned = 0
-            
-            for pattern in temp_patterns:
-                for file_path in glob.glob(os.path.join(build_dir, '**', pattern), recursive=True):
+# 디스크 회수 설정
+RECLAIM_TARGET_FREE = _parse_size(os.environ.get('GCC_RECLAIM_TARGET_FREE', '20G'))
+RECLAIM_TEMP_FILE = re.compile(r'(\.tmp|\.temp)$')
+RECLAIM_CORE_FILE = re.compile(r'^core\.\d+$')
+
+def _scan_tree(path, on_file=None):
+    """os.scandir 로 트리를 한 번 순회하며 전체 크기 합산 (on_file(entry, size) 콜백)"""
+    total = 0
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
                     try:
-                        os.remove(file_path)
-                        cleaned += 1
-                    except:
-                        pass
-            
-            print(f"[AUTO FIX] Cleaned {cleaned} temporary files")
-            return cleaned > 0
-        return False
-    except Exception as e:
-        print(f"[AUTO FIX] Failed to cleanup: {e}")
-        return False
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        size = entry.stat(follow_symlinks=False).st_blocks * 512
+                    except OSError:
+                        continue
+                    total += size
+                    if on_file:
+                        on_file(entry, size)
+        except OSError:
+            continue
+    return total
+
+def find_reclaimable(build_dir, running=False):
+    """회수 가능한 항목 목록 [(bytes, path, kind)] - 빌드 트리를 한 번만 순회
+
+    - stage1-* / prev-* 트리: compare 스탬프가 있을 때만 (이후 make 는 stageN-lean 으로 재빌드를 건너뜀)
+    - *.gch: install 이 끝난 뒤에만 (설치본이 이미 있음)
+    - core.N: 항상
+    - *.tmp, *.temp: make 가 돌고 있지 않을 때만 (running=True 면 제외 - 실행 중인 레시피가
+      'mv $@.tmp $@' 로 곧 옮길 파일일 수 있음)
+    현재 단계의 *.o 는 절대 건드리지 않음
+    """
+    compared = os.path.exists(os.path.join(build_dir, 'compare'))
+    installed = 'install' in load_build_manifest(build_dir)['phases']
+    candidates = []
+
+    def on_file(entry, size):
+        if (RECLAIM_CORE_FILE.search(entry.name) or (not running and RECLAIM_TEMP_FILE.search(entry.name))
+                or (installed and entry.name.endswith('.gch'))):
+            candidates.append((size, entry.path, 'file'))
+
+    stage_trees = {}
+    with os.scandir(build_dir) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                match = re.match(r'^(stage1|prev)-', entry.name)
+                if match and compared:
+                    stage_trees[entry.path] = 'stage1' if match.group(1) == 'stage1' else 'stage2'
+                    candidates.append((_scan_tree(entry.path), entry.path, stage_trees[entry.path]))
+                else:
+                    _scan_tree(entry.path, on_file)
+            elif entry.is_file(follow_symlinks=False):
+                on_file(entry, entry.stat(follow_symlinks=False).st_blocks * 512)
+    return candidates
+
+def reclaim_build_space(build_dir, target_free=None, running=False):
+    """큰 항목부터 지워 target_free 바이트가 빌 때까지 회수 - 회수한 바이트 수 반환
+
+    running=True 는 make 실행 중 (DiskWatchdog) - 진행 중인 타깃의 임시 파일은 지우지 않음.
+    """
+    if os.path.isdir(os.path.join(build_dir, 'gcc-build')):
+        build_dir = os.path.join(build_dir, 'gcc-build')
+    if not os.path.isdir(build_dir):
+        return 0
+    target_free = RECLAIM_TARGET_FREE if target_free is None else target_free
+
+    freed = 0
+    lean_markers = set()
+    for size, path, kind in sorted(find_reclaimable(build_dir, running), reverse=True):
+        if shutil.disk_usage(build_dir).free >= target_free:
+            break
+        try:
+            if kind == 'file':
+                os.remove(path)
+            else:
+                shutil.rmtree(path)
+                lean_markers.add(kind)
+        except OSError as e:
+            print(f"[RECLAIM] Could not remove {path}: {e}")
+            continue
+        freed += size
+        print(f"[RECLAIM] Removed {os.path.relpath(path, build_dir)} ({size / 1024 ** 2:.1f} MB)")
+
+    # bootstrap-lean 과 같은 표시 - 지운 단계를 make 가 다시 빌드하지 않음
+    for stage in lean_markers:
+        Path(os.path.join(build_dir, f'{stage}-lean')).touch()
+    print(f"[RECLAIM] Freed {freed / 1024 ** 3:.2f} GB, "
+          f"{shutil.disk_usage(build_dir).free / 1024 ** 3:.2f} GB now free")
+    return freed
+
+# 디스크 사용량 예측 (이전 빌드에서 기록한 단계별 증가량) 과 빌드 중 감시
+DISK_FOOTPRINT_FILE = os.environ.get('GCC_DISK_FOOTPRINT_FILE',
+                                     os.path.expanduser('~/.cache/rez-gcc/disk_footprints.json'))
+DISK_MARGIN = float(os.environ.get('GCC_DISK_MARGIN', '0.2'))
+DISK_LOW_FREE = _parse_size(os.environ.get('GCC_DISK_LOW_FREE', '10G'))
+DISK_CRITICAL_FREE = _parse_size(os.environ.get('GCC_DISK_CRITICAL_FREE', '3G'))
+DISK_WATCH_INTERVAL = float(os.environ.get('GCC_DISK_WATCH_INTERVAL', '5'))
+
+# 기록이 없을 때 쓰는 대략적인 단계별 증가량
+DEFAULT_DISK_FOOTPRINTS = {
+    'configure': 50 * 1024 ** 2,
+    'stage1': 3 * 1024 ** 3,
+    'stageprofile': 4 * 1024 ** 3,
+    'stagefeedback': 3 * 1024 ** 3,
+    'stage2': 3 * 1024 ** 3,
+    'stage3': 3 * 1024 ** 3,
+    'target_libs': 2 * 1024 ** 3,
+    'install': 2 * 1024 ** 3,
+}
+
+def disk_free(path):
+    """path 가 속한 파일시스템의 사용 가능 바이트 (없는 경로면 가장 가까운 상위 디렉토리 기준)"""
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    st = os.statvfs(path)
+    return st.f_bavail * st.f_frsize
+
+def load_disk_footprints():
+    try:
+        with open(DISK_FOOTPRINT_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def record_disk_footprint(phase, size):
+    """현재 빌드 모드의 단계별 디스크 증가량 기록"""
+    with _SHARED_STATE_LOCK:
+        footprints = load_disk_footprints()
+        footprints.setdefault(get_build_mode(), {})[phase] = int(max(0, size))
+        os.makedirs(os.path.dirname(DISK_FOOTPRINT_FILE), exist_ok=True)
+        tmp = f"{DISK_FOOTPRINT_FILE}.{os.getpid()}"
+        with open(tmp, 'w') as f:
+            json.dump(footprints, f, indent=2)
+        os.replace(tmp, DISK_FOOTPRINT_FILE)
+
+def estimate_disk_need(phases):
+    """남은 단계들에 필요한 바이트 추정 - (bytes, 기록 기반 여부)"""
+    recorded = load_disk_footprints().get(get_build_mode(), {})
+    need = sum(recorded.get(phase, DEFAULT_DISK_FOOTPRINTS.get(phase, 0)) for phase in phases)
+    return int(need * (1 + DISK_MARGIN)), all(phase in recorded for phase in phases)
+
+def check_disk_space(path, phases, reclaim_dir=None):
+    """남은 단계에 필요한 공간이 있는지 사전 확인 - 부족하면 회수 시도 후 실패 처리"""
+    if not phases or current_build_config().getenv('GCC_DISK_PREFLIGHT', '1') == '0':
+        return
+    need, measured = estimate_disk_need(phases)
+    free = disk_free(path)
+    print(f"[DISK] {', '.join(phases)}: need ~{need / 1024 ** 3:.1f} GB "
+          f"({'recorded' if measured else 'estimated'}), {free / 1024 ** 3:.1f} GB free on {path}")
+    if free >= need:
+        return
+    if reclaim_dir:
+        reclaim_build_space(reclaim_dir, target_free=need)
+        free = disk_free(path)
+        if free >= need:
+            return
+    message = (f"Not enough disk space on {path}: ~{need / 1024 ** 3:.1f} GB needed, "
+               f"{free / 1024 ** 3:.1f} GB free")
+    if not measured:
+        # 기본 추정치만으로는 빌드를 막지 않음
+        print(f"⚠️  {message}")
+        return
+    raise BuildError(message, error_type='disk_space')
+
+class DiskWatchdog:
+    """빌드 중 statvfs 를 주기적으로 확인해 공간을 회수하거나 새 작업 배분을 멈춤
+
+    jobserver 토큰만 회수하면 make 마다 남는 암묵적 슬롯으로 계속 작업이 나가므로,
+    위험 수준에서는 이 빌드의 make 프로세스들을 SIGSTOP 으로 멈춤 (이미 실행 중인 컴파일은 끝까지 진행).
+    """
+    def __init__(self, paths, build_dir, jobserver=None, low=None, critical=None, interval=None):
+        self.paths = list(paths)
+        self.build_dir = build_dir
+        self.jobserver = jobserver
+        self.low = DISK_LOW_FREE if low is None else low
+        self.critical = DISK_CRITICAL_FREE if critical is None else critical
+        self.interval = DISK_WATCH_INTERVAL if interval is None else interval
+        self.paused = False
+        self._stopped = set()  # SIGSTOP 으로 멈춘 make pid
+        self.reclaims = 0  # 회수 횟수 - 회수가 있었던 단계는 디스크 증가량을 기록하지 않음
+        self._reclaimed = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch_loop, name='disk-watchdog', daemon=True)
+        self._thread.start()
+
+    def _watch_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                free = min(disk_free(path) for path in self.paths)
+            except OSError:
+                continue
+            if free < self.low and not self._reclaimed:
+                print(f"[DISK] Free space {free / 1024 ** 3:.1f} GB below {self.low / 1024 ** 3:.1f} GB, reclaiming")
+                reclaim_build_space(self.build_dir, target_free=self.low * 2, running=True)
+                self.reclaims += 1
+                self._reclaimed = True
+                free = min(disk_free(path) for path in self.paths)
+            elif free >= self.low * 2:
+                self._reclaimed = False
+
+            if free < self.critical and not self.paused and self.jobserver:
+                print(f"[DISK] Free space {free / 1024 ** 3:.1f} GB critical, pausing make (running compiles finish)")
+                self.jobserver.hold('disk', 0)
+                self.paused = True
+            elif free >= self.low and self.paused:
+                print(f"[DISK] Free space recovered ({free / 1024 ** 3:.1f} GB), resuming make")
+                self._resume()
+            if self.paused:
+                # 멈춘 뒤 새로 시작된 make (다음 단계 등) 도 멈춤
+                self._stop_makes()
+
+    def _stop_makes(self):
+        with self.jobserver._lock:
+            make_pids = set(self.jobserver.make_pids)
+        for pid in build_make_processes(make_pids):
+            if pid in self._stopped:
+                continue
+            try:
+                os.kill(pid, signal.SIGSTOP)
+                self._stopped.add(pid)
+            except OSError:
+                continue
+
+    def _resume(self):
+        for pid in self._stopped:
+            try:
+                os.kill(pid, signal.SIGCONT)
+            except OSError:
+                continue
+        self._stopped.clear()
+        self.jobserver.hold('disk', None)
+        self.paused = False
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        if self.paused:
+            self._resume()
 
 def reduce_parallel_jobs():
     """병렬 작업 수 감소"""
     try:
-        # 환경 변수 MAKEFLAGS 설정
-        current_jobs = os.cpu_count()
+        # 현재 빌드 설정의 병렬도만 줄임 (다른 빌드에는 영향 없음)
+        config = current_build_config()
+        current_jobs = config.jobs
         reduced_jobs = max(1, current_jobs // 2)
         
-        os.environ['MAKEFLAGS'] = f'-j{reduced_jobs}'
+        config.jobs = reduced_jobs
         print(f"[AUTO FIX] Reduced parallel jobs from {current_jobs} to {reduced_jobs}")
         return True
     except Exception as e:
         print(f"[AUTO FIX] Failed to reduce parallel jobs: {e}")
         return False
 
+# 메모리 상황에 따른 make 병렬도 조정 (GCC_ADAPTIVE_JOBS=0 으로 비활성화)
+JOBSERVER_INTERVAL = float(os.environ.get('GCC_JOBSERVER_INTERVAL', '2'))
+JOB_MEMORY_ESTIMATE = int(os.environ.get('GCC_JOB_MEM_ESTIMATE_MB', '1024')) * 1024 * 1024
+HEAVY_COMPILER_PROCS = ('cc1', 'cc1plus', 'lto1', 'f951', 'ld', 'ld.gold', 'ld.bfd')
+MAKE_PROCS = ('make', 'gmake')
+
+def _make_version():
+    try:
+        out = subprocess.run(['make', '--version'], capture_output=True, text=True, timeout=30).stdout
+        m = re.search(r'GNU Make (\d+)\.(\d+)', out)
+        return (int(m.group(1)), int(m.group(2))) if m else None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def adaptive_jobs_enabled():
+    return (current_build_config().getenv('GCC_ADAPTIVE_JOBS', '1') != '0'
+            and os.path.exists('/proc/meminfo')
+            and _make_version() is not None)
+
+def read_meminfo():
+    """/proc/meminfo → {key: bytes}"""
+    info = {}
+    with open('/proc/meminfo') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            parts = rest.split()
+            if parts:
+                info[key] = int(parts[0]) * (1024 if len(parts) > 1 else 1)
+    return info
+
+def read_pressure(resource):
+    """PSI(/proc/pressure/<resource>) avg10 값 {'some': x, 'full': y}, 미지원 시 빈 dict"""
+    result = {}
+    try:
+        with open(f'/proc/pressure/{resource}') as f:
+            for line in f:
+                kind, *fields = line.split()
+                values = dict(field.split('=') for field in fields)
+                result[kind] = float(values.get('avg10', 0))
+    except (OSError, ValueError):
+        pass
+    return result
+
+def _process_table():
+    """/proc 의 pid → (comm, ppid)"""
+    table = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            comm, ppid, _, _ = _read_proc_stat(name)
+        except (OSError, ValueError, IndexError):
+            continue
+        table[int(name)] = (comm, ppid)
+    return table
+
+def _descends_from(pid, table, root_pids):
+    """부모를 따라 올라가 root_pids 중 하나의 아래(또는 자신)인지 확인"""
+    while pid and pid not in root_pids:
+        pid = table.get(pid, (None, None))[1]
+    return pid in root_pids
+
+def heavy_process_rss(root_pids=None):
+    """실행 중인 컴파일러/링커 프로세스들의 RSS 목록 (bytes)
+
+    root_pids 를 주면 그 프로세스들(이 빌드의 make) 아래의 컴파일러만 셈 - 같은 호스트의 다른 빌드 제외.
+    """
+    page = os.sysconf('SC_PAGE_SIZE')
+    table = _process_table()
+    sizes = []
+    for pid, (comm, _) in table.items():
+        if comm not in HEAVY_COMPILER_PROCS:
+            continue
+        if root_pids is not None and not _descends_from(pid, table, root_pids):
+            continue
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                sizes.append(int(f.read().split()[1]) * page)
+        except (OSError, ValueError, IndexError):
+            continue
+    return sizes
+
+def build_make_processes(root_pids):
+    """root_pids 아래에서 실행 중인 make 프로세스 (하위 make 포함)"""
+    table = _process_table()
+    return [pid for pid, (comm, _) in table.items()
+            if comm in MAKE_PROCS and _descends_from(pid, table, root_pids)]
+
+# 컴파일러 하위 프로세스별 자원 사용량 기록 (GCC_TELEMETRY=0 으로 비활성화)
+TELEMETRY_INTERVAL = float(os.environ.get('GCC_TELEMETRY_INTERVAL', '0.5'))
+TELEMETRY_FILE_NAME = 'compiler_telemetry.tsv'
+TELEMETRY_COLUMNS = ('phase', 'program', 'source', 'peak_rss_kb', 'cpu_s', 'wall_s')
+SOURCE_EXTENSIONS = ('.c', '.cc', '.cpp', '.cxx', '.C', '.c++', '.i', '.ii',
+                     '.f', '.F', '.f90', '.F90', '.f95', '.f03', '.f08', '.m', '.mm')
+
+def telemetry_enabled():
+    return current_build_config().getenv('GCC_TELEMETRY', '1') != '0' and os.path.isdir('/proc/self')
+
+def _read_proc_stat(pid):
+    """/proc/<pid>/stat → (comm, ppid, cpu ticks, starttime ticks)"""
+    with open(f'/proc/{pid}/stat') as f:
+        data = f.read()
+    comm = data[data.index('(') + 1:data.rindex(')')]
+    fields = data[data.rindex(')') + 2:].split()
+    return comm, int(fields[1]), int(fields[11]) + int(fields[12]), int(fields[19])
+
+def _telemetry_source(program, argv):
+    """컴파일러/링커 명령행에서 처리 중인 소스(또는 출력) 파일 추출"""
+    if program in ('cc1', 'cc1plus', 'f951'):
+        for arg in argv[1:]:
+            if not arg.startswith('-') and arg.endswith(SOURCE_EXTENSIONS):
+                return arg
+    for flag in ('-dumpbase', '-o'):
+        if flag in argv[:-1]:
+            return argv[argv.index(flag) + 1]
+    return ''
+
+class ProcessTelemetry:
+    """root_pid 아래 프로세스 트리를 /proc 에서 주기적으로 살펴 컴파일러 호출별 자원 사용량 기록"""
+    def __init__(self, root_pid, table_path, phase=None, interval=None):
+        self.root_pid = root_pid
+        self.table_path = table_path
+        self.phase = phase or ''
+        self.interval = TELEMETRY_INTERVAL if interval is None else interval
+        self.rows = []
+        self._live = {}  # (pid, starttime) -> 기록 중인 항목
+        self._tick = os.sysconf('SC_CLK_TCK')
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample_loop, name='process-telemetry', daemon=True)
+        self._thread.start()
+
+    def _sample(self):
+        now = time.time()
+        # starttime 은 부팅 후 경과 tick - btime 은 초 단위라 부정확하므로 uptime 기준으로 환산
+        with open('/proc/uptime') as f:
+            boot_time = now - float(f.read().split()[0])
+        parents = {}
+        stats = {}
+        for name in os.listdir('/proc'):
+            if not name.isdigit():
+                continue
+            try:
+                stats[int(name)] = stat_info = _read_proc_stat(name)
+            except (OSError, ValueError, IndexError):
+                continue
+            parents[int(name)] = stat_info[1]
+
+        seen = set()
+        for pid, (comm, _, ticks, start) in stats.items():
+            if comm not in HEAVY_COMPILER_PROCS:
+                continue
+            # make 프로세스 아래에 있는지 부모를 따라 올라가 확인
+            ancestor = parents.get(pid)
+            while ancestor and ancestor != self.root_pid:
+                ancestor = parents.get(ancestor)
+            if ancestor != self.root_pid:
+                continue
+            key = (pid, start)
+            seen.add(key)
+            entry = self._live.get(key)
+            if entry is None:
+                try:
+                    with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                        argv = [arg.decode(errors='replace') for arg in f.read().split(b'\0') if arg]
+                except OSError:
+                    argv = []
+                entry = self._live[key] = {'program': comm, 'source': _telemetry_source(comm, argv),
+                                           'start': boot_time + start / self._tick, 'peak_rss_kb': 0}
+            try:
+                with open(f'/proc/{pid}/status') as f:
+                    for line in f:
+                        if line.startswith('VmHWM:'):
+                            entry['peak_rss_kb'] = max(entry['peak_rss_kb'], int(line.split()[1]))
+                            break
+            except (OSError, ValueError):
+                pass
+            entry['cpu_s'] = ticks / self._tick
+            entry['last_seen'] = now
+
+        for key in [key for key in self._live if key not in seen]:
+            self._finish(self._live.pop(key))
+
+    def _finish(self, entry):
+        if 'last_seen' not in entry:
+            return
+        self.rows.append((self.phase, entry['program'], entry['source'], entry['peak_rss_kb'],
+                          round(entry['cpu_s'], 2), round(max(0.0, entry['last_seen'] - entry['start']), 2)))
+
+    def _sample_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self._sample()
+            except OSError:
+                continue
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        for entry in self._live.values():
+            self._finish(entry)
+        self._live.clear()
+        if not self.rows:
+            return
+        new_file = not os.path.exists(self.table_path)
+        with open(self.table_path, 'a') as f:
+            if new_file:
+                f.write('\t'.join(TELEMETRY_COLUMNS) + '\n')
+            for row in self.rows:
+                f.write('\t'.join(str(value).replace('\t', ' ') for value in row) + '\n')
+
+def load_telemetry(path):
+    rows = []
+    with open(path) as f:
+        header = f.readline().rstrip('\n').split('\t')
+        for line in f:
+            row = dict(zip(header, line.rstrip('\n').split('\t')))
+            row['peak_rss_kb'] = int(row['peak_rss_kb'])
+            row['cpu_s'] = float(row['cpu_s'])
+            row['wall_s'] = float(row['wall_s'])
+            rows.append(row)
+    return rows
+
+def telemetry_job_memory(path, percentile=0.9):
+    """기록된 컴파일러 최대 RSS 의 백분위 값 (bytes) - 작업 1개당 메모리 추정에 사용"""
+    try:
+        sizes = sorted(row['peak_rss_kb'] for row in load_telemetry(path) if row['program'] != 'ld')
+    except (OSError, KeyError, ValueError):
+        return None
+    if not sizes:
+        return None
+    return sizes[min(len(sizes) - 1, int(len(sizes) * percentile))] * 1024
+
+def print_telemetry_report(rows, top=20, sort_key='peak_rss_kb'):
+    """가장 무거운 번역 단위 상위 N개 출력"""
+    print(f"{'phase':<12} {'program':<9} {'peak RSS':>10} {'cpu':>8} {'wall':>8}  source")
+    for row in sorted(rows, key=lambda row: row[sort_key], reverse=True)[:top]:
+        print(f"{row['phase']:<12} {row['program']:<9} {row['peak_rss_kb'] / 1024:>8.0f}MB "
+              f"{row['cpu_s']:>7.1f}s {row['wall_s']:>7.1f}s  {row['source']}")
+
+class MakeJobserver:
+    """make jobserver 파이프를 직접 소유하고 메모리 압력에 따라 토큰을 회수/반환"""
+    def __init__(self, max_jobs, min_jobs=1, interval=None, job_memory=None, memory_budget=None):
+        self.max_jobs = max(1, int(max_jobs))
+        self.job_memory = job_memory or JOB_MEMORY_ESTIMATE
+        self.memory_budget = memory_budget
+        self.min_jobs = max(1, min(min_jobs, self.max_jobs))
+        self.interval = JOBSERVER_INTERVAL if interval is None else interval
+        self.limit = self.max_jobs
+        # 외부에서 강제로 거는 상한 (예: 디스크 부족 시 0 → 새 작업 중지)
+        self.holds = {}
+        # 이 jobserver 를 쓰는 make 프로세스 - 메모리 계산은 이 아래의 컴파일러만 대상
+        self.make_pids = set()
+        self._read_fd, self._write_fd = os.pipe()
+        # make 자신이 갖는 암묵적 토큰 1개를 제외한 나머지를 파이프에 채움
+        os.write(self._write_fd, b'+' * (self.max_jobs - 1))
+        self._held = 0
+        self._want_held = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._reader = threading.Thread(target=self._withhold_loop, name='jobserver-withhold', daemon=True)
+        self._monitor = threading.Thread(target=self._monitor_loop, name='jobserver-monitor', daemon=True)
+        self._reader.start()
+        self._monitor.start()
+        print(f"[JOBSERVER] Owning make jobserver with {self.max_jobs} slots")
+
+    @property
+    def pass_fds(self):
+        return (self._read_fd, self._write_fd)
+
+    def make_env(self, env):
+        """jobserver 정보를 담은 MAKEFLAGS를 설정한 env 복사본"""
+        env = dict(env)
+        version = _make_version() or (4, 2)
+        fds = f"{self._read_fd},{self._write_fd}"
+        if version >= (4, 2):
+            env['MAKEFLAGS'] = f" -j{self.max_jobs} --jobserver-auth={fds}"
+        else:
+            env['MAKEFLAGS'] = f" -j --jobserver-fds={fds}"
+        return env
+
+    def attach(self, pid):
+        with self._lock:
+            self.make_pids.add(pid)
+
+    def detach(self, pid):
+        with self._lock:
+            self.make_pids.discard(pid)
+
+    def hold(self, reason, jobs):
+        """reason 별로 병렬 상한을 강제 (None이면 해제)"""
+        with self._lock:
+            if jobs is None:
+                self.holds.pop(reason, None)
+            else:
+                self.holds[reason] = max(0, int(jobs))
+        self._apply()
+
+    def _effective_limit(self):
+        limit = self.limit
+        for jobs in self.holds.values():
+            limit = min(limit, jobs)
+        return limit
+
+    def _apply(self):
+        with self._lock:
+            # 토큰을 회수하더라도 make의 암묵적 토큰 1개는 남음
+            self._want_held = self.max_jobs - max(1, self._effective_limit())
+            excess = self._held - self._want_held
+            if excess > 0:
+                os.write(self._write_fd, b'+' * excess)
+                self._held -= excess
+        self._wake.set()
+
+    def _withhold_loop(self):
+        while not self._stop.is_set():
+            with self._lock:
+                need = self._want_held > self._held
+            if not need:
+                self._wake.wait(self.interval)
+                self._wake.clear()
+                continue
+            # make와 경쟁하며 작업이 끝나 반환된 토큰을 가져옴
+            try:
+                token = os.read(self._read_fd, 1)
+            except OSError:
+                return
+            with self._lock:
+                if token and self._want_held > self._held:
+                    self._held += 1
+                    token = b''
+            if token:
+                os.write(self._write_fd, token)
+
+    def _decide_limit(self):
+        mem = read_meminfo()
+        available = mem.get('MemAvailable', mem.get('MemFree', 0))
+        reserve = max(1024 ** 3, mem.get('MemTotal', 0) // 20)
+        with self._lock:
+            make_pids = set(self.make_pids)
+        rss = heavy_process_rss(make_pids)
+        per_job = max(self.job_memory, max(rss) if rss else 0)
+        mem_psi = read_pressure('memory')
+        cpu_psi = read_pressure('cpu')
+
+        # 현재 실행 중인 작업 + 남은 메모리로 추가 수용 가능한 작업 수
+        fit = len(rss) + max(0, (available - reserve) // per_job)
+        if self.memory_budget:
+            # 여러 빌드가 동시에 돌 때는 이 빌드에 나눠 준 메모리 안에서만 작업 수용
+            fit = min(fit, self.memory_budget // per_job)
+        limit = min(self.max_jobs, fit)
+        if mem_psi.get('full', 0) > 5:
+            limit = min(limit, self.limit // 2)
+        elif mem_psi.get('some', 0) > 10:
+            limit = min(limit, self.limit * 3 // 4)
+        elif cpu_psi.get('some', 0) < 50 and limit > self.limit:
+            # 압력이 낮을 때는 천천히 늘림
+            limit = min(limit, self.limit + max(1, self.max_jobs // 8))
+        limit = max(self.min_jobs, limit)
+        detail = (f"MemAvailable {available / 1024 ** 3:.1f} GB, "
+                  f"{len(rss)} compilers ~{per_job / 1024 ** 3:.1f} GB, "
+                  f"psi mem {mem_psi.get('some', 0):.1f}/{mem_psi.get('full', 0):.1f} cpu {cpu_psi.get('some', 0):.1f}")
+        return int(limit), detail
+
+    def _monitor_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                limit, detail = self._decide_limit()
+            except OSError:
+                continue
+            if limit != self.limit:
+                print(f"[JOBSERVER] Parallel limit {self.limit} → {limit} ({detail})")
+                self.limit = limit
+                self._apply()
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        # 읽기 대기 중인 withhold 스레드를 깨움
+        try:
+            os.write(self._write_fd, b'+')
+        except OSError:
+            pass
+        self._monitor.join()
+        self._reader.join(timeout=5)
+        os.close(self._read_fd)
+        os.close(self._write_fd)
+
 def fix_permissions(build_dir, install_path):
     """권한 문제 수정"""
     try:
@@ -321,70 +1719,231 @@ def fix_permissions(build_dir, install_path):
         print(f"[AUTO FIX] Failed to fix permissions: {e}")
         return False
 
-def smart_rebuild(source_path, build_path, install_path, error_count=0, max_retries=3):
-    """지능적 재빌드 시스템"""
-    if error_count >= max_retries:
-        raise BuildError(f"Build failed after {max_retries} attempts")
-    
+def fix_gcc_bootstrap_error(build_dir):
+    """부트스트랩 단계 실패 시 실패한 단계부터 다시 수행하도록 체크포인트 정리"""
+    failed_phase = load_build_manifest(build_dir).get('last_failed')
+    if failed_phase in (None, 'configure', 'install'):
+        return False
+    if failed_phase in ('stage3', 'compare'):
+        # stage3-bubble 이 compare 까지 수행하므로 비교 실패도 stage3 에서 다시 확인 ('compare' 는 이전 manifest)
+        stamp = os.path.join(build_dir, 'compare')
+        if os.path.exists(stamp):
+            os.unlink(stamp)
+        failed_phase = 'stage3'
+    invalidate_phases(build_dir, failed_phase)
+    return True
+
+def _config_dirs(build_dir, name, depth=3):
+    """빌드 트리에서 name 파일이 있는 하위 디렉토리 (<모듈>, <target>/<라이브러리>, 멀티립까지)"""
+    for level in range(1, depth + 1):
+        pattern = os.path.join(build_dir, *(['*'] * level), name)
+        for path in glob.glob(pattern):
+            yield os.path.dirname(path)
+
+def fix_makefile_error(build_dir):
+    """config.status 는 있는데 Makefile 이 없는 디렉토리의 Makefile 재생성"""
+    regenerated = []
+    for directory in [build_dir] + list(_config_dirs(build_dir, 'config.status')):
+        if not os.path.exists(os.path.join(directory, 'config.status')) or os.path.exists(os.path.join(directory, 'Makefile')):
+            continue
+        result = subprocess.run(['sh', 'config.status'], cwd=directory, capture_output=True, text=True)
+        if result.returncode == 0:
+            regenerated.append(os.path.relpath(directory, build_dir))
+        else:
+            print(f"[AUTO FIX] config.status failed in {directory}: {result.stderr.strip()[-200:]}")
+    if regenerated:
+        print(f"[AUTO FIX] Regenerated Makefiles: {', '.join(regenerated)}")
+    return bool(regenerated)
+
+def fix_configure_error(build_dir, gcc_src_dir):
+    """실패한 하위 configure 의 config.cache 를 지워 다음 시도에서 새로 검사 (Makefile 이 없으면 make 가 재실행)"""
+    cleared = []
+    for directory in _config_dirs(build_dir, 'config.log'):
+        if os.path.exists(os.path.join(directory, 'Makefile')):
+            continue
+        with open(os.path.join(directory, 'config.log'), 'rb') as f:
+            f.seek(max(0, os.fstat(f.fileno()).st_size - 4096))
+            if b'configure: exit 0' in f.read():
+                continue
+        for name in ('config.cache', 'config.cache.rezkey'):
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                os.unlink(path)
+        cleared.append(os.path.relpath(directory, build_dir))
+    if cleared:
+        print(f"[AUTO FIX] Cleared configure caches for: {', '.join(cleared)}")
+    return bool(cleared)
+
+# 실패한 하위 make 재시도 설정 - 전체 재빌드 전에 해당 타겟만 낮은 병렬도로 다시 실행
+SUBMAKE_RETRY_TIMEOUT = int(os.environ.get('GCC_SUBMAKE_RETRY_TIMEOUT', '1800'))
+MULTILIB_DIRS = ('32', '64', 'x32')
+
+def _makefile_targets(build_dir):
+    """최상위 Makefile 에 정의된 all-* 타겟 목록"""
+    try:
+        with open(os.path.join(build_dir, 'Makefile'), errors='replace') as f:
+            return set(re.findall(r'^(all-[\w.+-]+):', f.read(), re.MULTILINE))
+    except OSError:
+        return set()
+
+def submake_retry_target(build_dir, directory):
+    """실패한 make 디렉토리를 최상위 타겟으로 변환 (all-stageN-<모듈>, all-target-<라이브러리>, all-<모듈>)"""
+    rel = os.path.relpath(os.path.realpath(directory), os.path.realpath(build_dir))
+    if rel == '.' or rel.startswith('..'):
+        return None
+    parts = rel.split(os.sep)
+    targets = _makefile_targets(build_dir)
+    if parts[0].startswith('build-') and len(parts) > 1:
+        candidates = [f"all-build-{parts[1]}"]
+    elif '-linux' in parts[0] and len(parts) > 1:
+        # 멀티립 디렉토리(<target>/32/libgcc)도 all-target-<라이브러리> 가 함께 빌드
+        lib = parts[2] if parts[1] in MULTILIB_DIRS and len(parts) > 2 else parts[1]
+        candidates = [f"all-target-{lib}"]
+    else:
+        # 부트스트랩 도중이면 stage_current 에 현재 단계가 남아 있음
+        candidates = [f"all-{parts[0]}"]
+        try:
+            with open(os.path.join(build_dir, 'stage_current')) as f:
+                candidates.insert(0, f"all-{f.read().strip()}-{parts[0]}")
+        except OSError:
+            pass
+    return next((target for target in candidates if target in targets), None)
+
+def retry_failed_submake(build_dir, error, env=None):
+    """실패한 하위 make 타겟만 병렬도를 낮춰 다시 실행 - 성공하면 최상위 빌드를 이어서 진행 가능"""
+    failure = getattr(error, 'failed_make', None)
+    if not failure:
+        return False
+    target = submake_retry_target(build_dir, failure['directory'])
+    if not target:
+        print(f"[RETRY] No top-level target for {failure['directory']}, falling back to rebuild strategies")
+        return False
+
+    jobs = current_build_config().jobs
+    log_file = error.log_file if error.log_file and os.path.dirname(error.log_file) else None
+    for retry_jobs in sorted({max(1, jobs // 4), 1}, reverse=True):
+        print(f"\n[RETRY] Re-running {target} with -j{retry_jobs} (failed in {failure['directory']}: {failure['target']})")
+        try:
+            with trace_span(f"retry {target}"):
+                run_cmd_with_logging(f"make -j{retry_jobs} {target}", cwd=build_dir, env=env or setup_build_env(),
+                                     log_file=log_file, timeout=SUBMAKE_RETRY_TIMEOUT, trace_label=f"retry-{target}")
+            print(f"[RETRY] {target} succeeded, resuming top-level build")
+            return True
+        except BuildError as e:
+            print(f"[RETRY] {target} failed with -j{retry_jobs}: {e}")
+            # 다른 위치에서 실패했다면 그 위치는 다음 재시도에서 다룸
+            if e.failed_make and submake_retry_target(build_dir, e.failed_make['directory']) != target:
+                break
+    return False
+
+def smart_rebuild(source_path, build_path, install_path, error=None, max_retries=3):
+    """지능적 재빌드 시스템 - 실패한 하위 make 를 먼저 재실행하고, 안 되면 단계별 전략 적용"""
     strategies = [
         ('continue_build', 'Continue from current state'),
-        ('clean_rebuild', 'Full clean rebuild'),
+        ('clean_rebuild', 'Clean rebuild from failed phase'),
         ('single_thread', 'Single thread rebuild'),
         ('minimal_config', 'Minimal configuration rebuild')
     ]
+    gcc_src_dir = find_gcc_src_dir(source_path)
+    build_dir = os.path.join(build_path, "gcc-build")
+    fallback = 0
     
-    strategy_name, strategy_desc = strategies[min(error_count, len(strategies) - 1)]
-    
-    print(f"\n[REBUILD STRATEGY {error_count + 1}/{max_retries}] {strategy_desc}")
-    
-    try:
+    for attempt in range(max_retries):
+        if error is not None and retry_failed_submake(build_dir, error):
+            strategy_name, strategy_desc = 'continue_build', 'Resume after targeted sub-make retry'
+        else:
+            strategy_name, strategy_desc = strategies[min(fallback, len(strategies) - 1)]
+            fallback += 1
+        
+        print(f"\n[REBUILD STRATEGY {attempt + 1}/{max_retries}] {strategy_desc}")
+        
         if strategy_name == 'clean_rebuild':
-            clean_path(build_path)
+            # 실패한 단계부터만 다시 수행 - configure 단계 실패 시에만 전체 정리
+            failed_phase = load_build_manifest(build_dir).get('last_failed')
+            if failed_phase and failed_phase != 'configure':
+                print(f"[REBUILD] Rebuilding from failed phase '{failed_phase}'")
+                invalidate_phases(build_dir, failed_phase)
+            else:
+                clean_path(build_path)
         elif strategy_name == 'single_thread':
-            os.environ['MAKEFLAGS'] = '-j1'
+            current_build_config().jobs = 1
         elif strategy_name == 'minimal_config':
             # 최소 설정으로 변경 (기본 옵션만 사용)
-            os.environ['GCC_MINIMAL_BUILD'] = '1'
-            # configure 마커도 삭제하여 재구성 강제
-            configure_done = os.path.join(build_path, "gcc-build", ".configure_done")
-            if os.path.exists(configure_done):
-                os.remove(configure_done)
-        
-        # 빌드 재시도
-        _build(source_path, build_path, install_path)
-        
-        print(f"[REBUILD SUCCESS] Strategy '{strategy_desc}' successful!")
-        return True
-        
-    except BuildError as e:
-        print(f"[REBUILD FAILED] Strategy '{strategy_desc}' failed: {e}")
+            # configure fingerprint가 바뀌므로 재구성이 자동으로 이뤄짐
+            current_build_config().mode = 'minimal'
         
-        # 자동 수정 시도
-        if e.error_type and auto_fix_error(e.error_type, build_path, 
-                                         os.path.join(source_path, "source/gcc-11.5.0"), 
-                                         install_path):
-            # 수정 후 재시도
-            return smart_rebuild(source_path, build_path, install_path, error_count + 1, max_retries)
-        else:
-            # 다음 전략으로 넘어가기
-            return smart_rebuild(source_path, build_path, install_path, error_count + 1, max_retries)
+        try:
+            # 빌드 재시도 - 실패는 여기서 처리하므로 _build 안에서 다시 재빌드하지 않음
+            _build(source_path, build_path, install_path, recover=False)
+            print(f"[REBUILD SUCCESS] Strategy '{strategy_desc}' successful!")
+            return True
+        except BuildError as e:
+            print(f"[REBUILD FAILED] Strategy '{strategy_desc}' failed: {e}")
+            error = e
+            # 자동 수정 시도 후 다음 시도로
+            if e.error_type:
+                auto_fix_error(e.error_type, build_dir, gcc_src_dir, install_path)
+    
+    raise BuildError(f"Build failed after {max_retries} attempts",
+                     error_type=error.error_type if error else None,
+                     log_file=error.log_file if error else None)
 
 def copy_package_py(source_path, install_path):
-    src = os.path.join(source_path, "package.py")
-    # package.py는 platform_linux의 상위 디렉토리에 있어야 함
+    config = current_build_config()
+    src = os.path.join(source_path, config.package_file)
+    # package.py는 platform_linux(variant 하위 경로)의 상위 디렉토리에 있어야 함
     if "platform_linux" in install_path:
-        dst_dir = os.path.dirname(install_path)
+        dst_dir = split_install_path(install_path)[1]
     else:
         dst_dir = install_path
     dst = os.path.join(dst_dir, "package.py")
+    # 모든 variant 가 같은 package.py 를 쓰므로 variant 별 값은 variant 하위 경로를 키로 기록
+    variant = split_install_path(install_path)[2] if "platform_linux" in install_path else ''
+    variant_values = {
+        'build_flavor': get_build_mode(),
+        'runpath': os.path.exists(os.path.join(install_path, RUNPATH_MARKER)),
+    }
     if os.path.exists(src):
-        print(f"📄 Copying package.py → {dst}")
+        # 다른 variant 가 기록한 값은 복사 전에 읽어 두었다가 유지
+        recorded = {name: read_package_attribute(dst, name) for name in variant_values}
+        print(f"📄 Copying {config.package_file} → {dst}")
         os.makedirs(dst_dir, exist_ok=True)
         shutil.copy(src, dst)
+        record_package_attribute(dst, 'version', config.version)
+        for name, value in variant_values.items():
+            # 예전 형식(단일 값)은 어느 variant 것인지 알 수 없으므로 버림
+            values = recorded[name] if isinstance(recorded[name], dict) else {}
+            values[variant] = value
+            record_package_attribute(dst, name, dict(sorted(values.items())))
 
-def patch_gmp(gcc_src_dir):
-    """GMP strnlen 충돌 방지 패치 (build.sh와 동일한 강력한 패치)"""
-    patch_file = os.path.join(gcc_src_dir, "gmp/printf/repl-vsnprintf.c")
+def read_package_attribute(package_file, name):
+    """설치된 package.py 의 최상위 속성 값 (없거나 리터럴이 아니면 None)"""
+    if not os.path.exists(package_file):
+        return None
+    with open(package_file) as f:
+        match = re.search(rf'^{re.escape(name)}\s*=(.*)$', f.read(), re.MULTILINE)
+    try:
+        return ast.literal_eval(match.group(1).strip()) if match else None
+    except (ValueError, SyntaxError):
+        return None
+
+def record_package_attribute(package_file, name, value):
+    """설치된 package.py 의 최상위 속성 값을 기록 (없으면 추가)"""
+    with open(package_file) as f:
+        content = f.read()
+    line = f"{name} = {value!r}"
+    pattern = re.compile(rf'^{re.escape(name)}\s*=.*$', re.MULTILINE)
+    if pattern.search(content):
+        content = pattern.sub(line, content, count=1)
+    else:
+        content = content.rstrip('\n') + f"\n\n{line}\n"
+    with open(package_file, 'w') as f:
+        f.write(content)
+    print(f"📄 Recorded {line} in {package_file}")
+
+def patch_gmp(gcc_src_dir):
+    """GMP strnlen 충돌 방지 패치 (build.sh와 동일한 강력한 패치)"""
+    patch_file = os.path.join(gcc_src_dir, "gmp/printf/repl-vsnprintf.c")
     if os.path.exists(patch_file):
         print("[INFO] Applying GMP strnlen patch...")
         with open(patch_file, 'r') as f:
@@ -409,8 +1968,7 @@ def patch_gmp(gcc_src_dir):
                 guarded_func = f'#ifndef HAVE_STRNLEN\n{strnlen_func}\n#endif /* HAVE_STRNLEN */'
                 content = content.replace(strnlen_func, guarded_func)
                 
-                with open(patch_file, 'w') as f:
-                    f.write(content)
+                write_file_atomic(patch_file, content)
                 print("✅ GMP strnlen patch applied successfully")
             else:
                 # 패턴이 매치되지 않으면 라인 기반으로 패치
@@ -436,15 +1994,14 @@ def patch_gmp(gcc_src_dir):
                 
                 if strnlen_start >= 0:
                     content = '\n'.join(patched_lines)
-                    with open(patch_file, 'w') as f:
-                        f.write(content)
+                    write_file_atomic(patch_file, content)
                     print("✅ GMP strnlen patch applied successfully (line-based)")
                 else:
                     print("⚠️  Could not find strnlen function to patch")
 
 def setup_build_env():
     """빌드 환경 설정"""
-    env = os.environ.copy()
+    env = current_build_config().environ()
     
     # binutils가 있으면 PATH에 추가
     if "REZ_BINUTILS_ROOT" in env:
@@ -467,8 +2024,8 @@ def get_sysroot_options():
     options = []
     
     # REZ_GLIBC_ROOT가 있으면 사용, 없으면 시스템 기본값 사용
-    if "REZ_GLIBC_ROOT" in os.environ:
-        sysroot = os.environ["REZ_GLIBC_ROOT"]
+    sysroot = current_build_config().getenv("REZ_GLIBC_ROOT")
+    if sysroot:
         options.extend([
             f"--with-sysroot={sysroot}",
             "--with-native-system-header-dir=include"
@@ -554,37 +2111,1017 @@ def verify_build(install_path):
         else:
             print(f"⚠️  Missing library: {lib}")
     
-    # 간단한 컴파일 테스트
-    gcc_path = os.path.join(install_path, 'bin', 'gcc')
-    if os.path.exists(gcc_path):
+    # 컴파일/링크/실행 스모크 테스트 (병렬, 테스트별 임시 디렉토리)
+    report = None
+    if os.path.exists(os.path.join(install_path, 'bin', 'gcc')):
         print("\n[INFO] Testing GCC functionality...")
+        report = run_smoke_tests(install_path)
+        linker = current_build_config().linker
+        if linker != 'bfd':
+            verify_default_linker(install_path, linker)
+    print("\n[INFO] Build verification complete")
+    return report
+
+# verify_build 스모크 테스트 매트릭스
+SMOKE_C_SOURCE = """#include <stdio.h>
+int main(void) { printf("ok\\n"); return 0; }
+"""
+
+SMOKE_CXX17_SOURCE = """#include <iostream>
+#include <optional>
+#include <string_view>
+#include <variant>
+int main() {
+    std::optional<std::string_view> s = "ok";
+    std::variant<int, std::string_view> v = *s;
+    if (auto [a, b] = std::pair{1, 2}; a + b != 3) return 1;
+    std::cout << std::get<std::string_view>(v) << std::endl;
+    return std::get<std::string_view>(v) == "ok" ? 0 : 1;
+}
+"""
+
+SMOKE_CXX20_SOURCE = """#include <concepts>
+#include <iostream>
+#include <span>
+template <std::integral T> constexpr T twice(T v) { return v * 2; }
+int main() {
+    int data[] = {1, 2, 3};
+    std::span<int> view(data);
+    if (twice(view.size()) != 6) return 1;
+    std::cout << "ok" << std::endl;
+    return 0;
+}
+"""
+
+SMOKE_FORTRAN_SOURCE = """program smoke
+  implicit none
+  real(8) :: a(3) = [1d0, 2d0, 3d0]
+  if (sum(a) /= 6d0) stop 1
+  print '(a)', 'ok'
+end program smoke
+"""
+
+SMOKE_OPENMP_SOURCE = """#include <omp.h>
+#include <stdio.h>
+int main(void) {
+    int total = 0;
+    #pragma omp parallel for reduction(+:total) num_threads(4)
+    for (int i = 0; i < 100; ++i) total += i;
+    if (total != 4950 || omp_get_max_threads() <= 0) return 1;
+    printf("ok\\n");
+    return 0;
+}
+"""
+
+SMOKE_LTO_SOURCES = {
+    'lib.c': "int scale(int v) { return v * 3; }\n",
+    'main.c': '#include <stdio.h>\nint scale(int);\nint main(void) { if (scale(2) != 6) return 1; printf("ok\\n"); return 0; }\n',
+}
+
+SMOKE_PLUGIN_SOURCE = """#include "gcc-plugin.h"
+#include "plugin-version.h"
+int plugin_is_GPL_compatible;
+int plugin_init(struct plugin_name_args *info, struct plugin_gcc_version *version) {
+    return plugin_default_version_check(version, &gcc_version) ? 0 : 1;
+}
+"""
+
+# 테스트 이름 -> (파일 내용, 실행할 명령 목록). 명령의 {bin}/{dir} 은 실행 시 치환
+# 명령이 모두 성공(종료 코드 0)하면 통과 - 테스트 프로그램은 확인이 틀리면 0 이 아닌 값으로 종료
+SMOKE_TESTS = {
+    'c': ({'t.c': SMOKE_C_SOURCE},
+          [['{bin}/gcc', 't.c', '-o', 't'], ['./t']]),
+    'c++17': ({'t.cc': SMOKE_CXX17_SOURCE},
+              [['{bin}/g++', '-std=c++17', 't.cc', '-o', 't'], ['./t']]),
+    'c++20': ({'t.cc': SMOKE_CXX20_SOURCE},
+              [['{bin}/g++', '-std=c++20', 't.cc', '-o', 't'], ['./t']]),
+    'fortran': ({'t.f90': SMOKE_FORTRAN_SOURCE},
+                [['{bin}/gfortran', 't.f90', '-o', 't'], ['./t']]),
+    'openmp': ({'t.c': SMOKE_OPENMP_SOURCE},
+               [['{bin}/gcc', '-fopenmp', 't.c', '-o', 't'], ['./t']]),
+    'lto': (SMOKE_LTO_SOURCES,
+            [['{bin}/gcc', '-O2', '-flto', '-c', 'lib.c'],
+             ['{bin}/gcc-ar', 'rcs', 'libscale.a', 'lib.o'],
+             ['{bin}/gcc', '-O2', '-flto', 'main.c', 'libscale.a', '-o', 't'], ['./t']]),
+    'static-libstdc++': ({'t.cc': SMOKE_CXX17_SOURCE},
+                         [['{bin}/g++', '-std=c++17', '-static-libstdc++', '-static-libgcc', 't.cc', '-o', 't'],
+                          ['sh', '-c', "! ldd ./t | grep -q 'libstdc++' && ./t"]]),
+    'gcov': ({'t.c': SMOKE_C_SOURCE},
+             [['{bin}/gcc', '--coverage', 't.c', '-o', 't'], ['./t'],
+              ['{bin}/gcov', 't.c'], ['grep', '-q', 'printf', 't.c.gcov']]),
+    'plugin': ({'plugin.cc': SMOKE_PLUGIN_SOURCE},
+               [['sh', '-c', '{bin}/g++ -fPIC -shared -fno-rtti -I"$({bin}/gcc -print-file-name=plugin)/include" '
+                             'plugin.cc -o plugin.so'],
+                ['{bin}/gcc', '-fplugin=./plugin.so', '-x', 'c', '-c', '/dev/null', '-o', 'null.o']]),
+}
+
+# 해당 언어가 빌드 모드의 --enable-languages 에 있을 때만 실행하는 테스트
+SMOKE_TEST_LANGUAGES = {'fortran': 'fortran'}
+
+def enabled_languages():
+    """현재 빌드 모드가 configure 하는 언어 목록"""
+    return BUILD_MODES[get_build_mode()]['languages'].split(',')
+
+def select_smoke_tests(names=None):
+    """names(없으면 전체) 중 현재 빌드 모드에서 빌드되는 언어의 스모크 테스트만 선택"""
+    languages = enabled_languages()
+    return {name: SMOKE_TESTS[name] for name in (names or SMOKE_TESTS)
+            if SMOKE_TEST_LANGUAGES.get(name, 'c') in languages}
+
+# 기본 링커 변형 확인 - 링커가 출력에 남기는 식별 섹션 (bfd 는 없음)
+LINKER_NOTE_SECTIONS = {'gold': '.note.gnu.gold-version'}
+
+SMOKE_LTO_UNIT_SOURCE = """#include <string>
+std::string greet(int n) { return std::string(n, 'o'); }
+"""
+
+SMOKE_LTO_MAIN_SOURCE = """#include <iostream>
+#include <string>
+std::string greet(int n);
+int main() { std::cout << "g" << greet(2) << "d" << std::endl; return greet(2) == "oo" ? 0 : 1; }
+"""
+
+def verify_default_linker(install_path, linker):
+    """옵션 없이 링크해도 지정한 링커가 쓰이는지, LTO 플러그인으로 링크되는지 확인"""
+    print(f"\n[INFO] Testing default linker ({linker}) with LTO...")
+    tests = {f'lto-link-{linker}': (
+        {'unit.cc': SMOKE_LTO_UNIT_SOURCE, 'main.cc': SMOKE_LTO_MAIN_SOURCE},
+        [['{bin}/g++', '-O2', '-flto', '-c', 'unit.cc', 'main.cc'],
+         ['{bin}/g++', '-O2', '-flto', 'unit.o', 'main.o', '-o', 't'],
+         ['./t'],
+         ['sh', '-c', f"readelf -S t | grep -qF '{LINKER_NOTE_SECTIONS[linker]}'"]])}
+    report = run_smoke_tests(install_path, tests=tests)
+    if not report['passed']:
+        raise BuildError(f"Installed compiler at {install_path} does not link with {linker} by default",
+                         error_type='verify_failed')
+    return report
+
+def _run_smoke_test(name, files, commands, install_path, env, timeout=120):
+    """스모크 테스트 1개를 전용 임시 디렉토리에서 실행"""
+    started = time.perf_counter()
+    bin_dir = os.path.join(install_path, 'bin')
+    with tempfile.TemporaryDirectory(prefix=f'gcc-verify-{name}-') as tmp:
+        for filename, content in files.items():
+            with open(os.path.join(tmp, filename), 'w') as f:
+                f.write(content)
+        for cmd in commands:
+            cmd = [arg.format(bin=bin_dir, dir=tmp) for arg in cmd]
+            try:
+                result = subprocess.run(cmd, cwd=tmp, env=env, capture_output=True, text=True, timeout=timeout)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                return {'name': name, 'passed': False, 'seconds': round(time.perf_counter() - started, 2),
+                        'command': ' '.join(cmd), 'detail': str(e)}
+            if result.returncode != 0:
+                return {'name': name, 'passed': False, 'seconds': round(time.perf_counter() - started, 2),
+                        'command': ' '.join(cmd), 'detail': (result.stderr or result.stdout).strip()[-1000:]}
+    return {'name': name, 'passed': True, 'seconds': round(time.perf_counter() - started, 2)}
+
+def run_smoke_tests(install_path, tests=None, max_workers=None, library_path=True):
+    """스모크 테스트 매트릭스를 스레드 풀에서 병렬 실행하고 통과/실패 보고서 반환
+
+    library_path=False 면 LD_LIBRARY_PATH 없이 실행 (RUNPATH 설치 확인용).
+    """
+    tests = tests or select_smoke_tests()
+    env = current_build_config().environ()
+    env['PATH'] = os.pathsep.join([os.path.join(install_path, 'bin'), env.get('PATH', '')])
+    if library_path:
+        env['LD_LIBRARY_PATH'] = os.pathsep.join(
+            [os.path.join(install_path, 'lib64'), os.path.join(install_path, 'lib'), env.get('LD_LIBRARY_PATH', '')])
+    else:
+        env.pop('LD_LIBRARY_PATH', None)
+    env['LC_ALL'] = 'C'
+
+    started = time.perf_counter()
+    workers = max_workers or min(len(tests), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [submit_in_context(pool, _run_smoke_test, name, files, commands, install_path, env)
+                   for name, (files, commands) in tests.items()]
+        results = [future.result() for future in futures]
+
+    report = {
+        'install_path': install_path,
+        'passed': all(result['passed'] for result in results),
+        'seconds': round(time.perf_counter() - started, 2),
+        'tests': results,
+    }
+    for result in results:
+        if result['passed']:
+            print(f"✅ {result['name']:<18} ({result['seconds']:.2f}s)")
+        else:
+            print(f"❌ {result['name']:<18} {result['command']}")
+            for line in result['detail'].splitlines()[-5:]:
+                print(f"   {line}")
+    failed = sum(1 for result in results if not result['passed'])
+    print(f"[INFO] Smoke tests: {len(results) - failed}/{len(results)} passed in {report['seconds']:.2f}s")
+    return report
+
+# 하위 configure 간 공유하는 autoconf 캐시 (GCC_CONFIGURE_CACHE=1 로 활성화)
+CONFIGURE_CACHE_DIR = os.environ.get('GCC_CONFIGURE_CACHE_DIR',
+                                     os.path.expanduser('~/.cache/rez-gcc/configure'))
+
+# 디렉토리마다 결과가 달라질 수 있어 공유하지 않는 캐시 변수
+CONFIGURE_CACHE_EXCLUDE = re.compile(r'^ac_cv_env_|gmp|mpfr|mpc|isl|^ac_cv_(build|host|target)$')
+
+# 시드는 하위 디렉토리(빌드 트리 기준 상대 경로)별로 나눔 - 같은 컴파일러라도 configure 마다 검사 내용이 다름
+CONFIG_SITE_TEMPLATE = """# rezbuild.py 가 생성한 CONFIG_SITE - 공유 autoconf 캐시 시드
+if test -n "$REZ_GCC_CONFIG_CACHE_ROOT"; then
+  if test "x$cache_file" = "x/dev/null"; then
+    cache_file=./config.cache
+  fi
+  rez_cache_dir=`pwd -P`
+  rez_cache_dir=${rez_cache_dir#"$REZ_GCC_CONFIG_BUILD_DIR"}
+  rez_cache_key=`echo "$rez_cache_dir|$CC|$CFLAGS|$CPPFLAGS|$LDFLAGS|$host_alias|$target_alias" | cksum | cut -d' ' -f1`
+  rez_cache_seed="$REZ_GCC_CONFIG_CACHE_ROOT/$rez_cache_key.cache"
+  if test ! -s "$cache_file" && test -r "$rez_cache_seed"; then
+    cp "$rez_cache_seed" "$cache_file" 2>/dev/null
+  fi
+  echo "$rez_cache_key" > "$cache_file.rezkey" 2>/dev/null
+fi
+"""
+
+def configure_cache_enabled():
+    return current_build_config().getenv('GCC_CONFIGURE_CACHE', '0') == '1'
+
+def _tool_identity(tool, env):
+    """호스트 도구의 경로/크기/mtime/버전 문자열"""
+    path = shutil.which(tool, path=env.get('PATH'))
+    if not path:
+        return None
+    real = os.path.realpath(path)
+    st = os.stat(real)
+    try:
+        version = subprocess.run([real, '--version'], capture_output=True, text=True,
+                                 timeout=30).stdout.splitlines()[:1]
+    except (OSError, subprocess.SubprocessError):
+        version = []
+    return [real, st.st_size, int(st.st_mtime), version]
+
+def get_host_toolchain_key(env):
+    """호스트/sysroot/호스트 컴파일러 조합 키 - 툴체인이 바뀌면 키도 바뀜"""
+    uname = os.uname()
+    return compute_fingerprint(
+        uname.nodename, uname.sysname, uname.machine,
+        env.get('REZ_GLIBC_ROOT', '/'),
+        [_tool_identity(tool, env) for tool in ('cc', 'gcc', 'g++', 'ld', 'as')],
+    )
+
+# 이 프로세스에서 동시에 진행 중인 빌드들이 쓰는 캐시 키 - 서로의 캐시를 지우지 않도록
+_ACTIVE_CONFIGURE_CACHES = set()
+
+def setup_configure_cache(build_dir, env):
+    """공유 configure 캐시 준비 후 build env에 CONFIG_SITE 설정"""
+    key = get_host_toolchain_key(env)
+    cache_root = os.path.join(CONFIGURE_CACHE_DIR, key)
+    os.makedirs(cache_root, exist_ok=True)
+    with _SHARED_STATE_LOCK:
+        _ACTIVE_CONFIGURE_CACHES.add(key)
+
+    # 같은 호스트의 이전 툴체인 캐시는 무효화
+    node = os.uname().nodename
+    for name in os.listdir(CONFIGURE_CACHE_DIR):
+        other = os.path.join(CONFIGURE_CACHE_DIR, name)
+        if name in _ACTIVE_CONFIGURE_CACHES or not os.path.isdir(other):
+            continue
         try:
-            # 시스템 헤더 접근 테스트
-            test_result = subprocess.run(
-                f'echo "#include <stdio.h>\nint main(){{return 0;}}" | {gcc_path} -x c - -o /tmp/gcc_test',
-                shell=True, capture_output=True, text=True, timeout=30
-            )
-            if test_result.returncode == 0:
-                print("✅ GCC can compile with system headers")
-                # 테스트 파일 정리
-                try:
-                    os.remove('/tmp/gcc_test')
-                except:
-                    pass
+            with open(os.path.join(other, 'host.json')) as f:
+                if json.load(f).get('node') == node:
+                    print(f"[CONFIG CACHE] Host toolchain changed, dropping {name[:16]}")
+                    clean_path(other)
+        except (OSError, ValueError):
+            pass
+    with open(os.path.join(cache_root, 'host.json'), 'w') as f:
+        json.dump({'node': node, 'created': time.strftime('%Y-%m-%d %H:%M:%S')}, f)
+
+    os.makedirs(build_dir, exist_ok=True)
+    site_file = os.path.join(build_dir, 'rez-config.site')
+    with open(site_file, 'w') as f:
+        f.write(CONFIG_SITE_TEMPLATE)
+    env['CONFIG_SITE'] = site_file
+    env['REZ_GCC_CONFIG_CACHE_ROOT'] = cache_root
+    env['REZ_GCC_CONFIG_BUILD_DIR'] = os.path.realpath(build_dir)
+    seeds = len([n for n in os.listdir(cache_root) if n.endswith('.cache')])
+    print(f"[CONFIG CACHE] Using {cache_root} ({seeds} directory/compiler seeds)")
+    return cache_root
+
+def _read_autoconf_cache(path):
+    """config.cache 에서 (변수명 → 라인) 읽기"""
+    entries = {}
+    try:
+        with open(path, errors='replace') as f:
+            for line in f:
+                m = re.match(r'(?:test "\$\{(\w+)\+set\}" = set \|\| )?(\w+)=', line)
+                if m:
+                    entries[m.group(2)] = line if line.endswith('\n') else line + '\n'
+    except OSError:
+        pass
+    return entries
+
+def harvest_configure_cache(build_dir, cache_root, max_depth=2):
+    """빌드 트리의 config.cache 결과를 하위 디렉토리/컴파일러별 시드 파일로 병합"""
+    merged = {}
+    stack = [(build_dir, 0)]
+    while stack:
+        path, depth = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False) and depth < max_depth:
+                        stack.append((entry.path, depth + 1))
+                    elif entry.name == 'config.cache.rezkey':
+                        with open(entry.path) as f:
+                            key = f.read().strip()
+                        cache_file = os.path.join(path, 'config.cache')
+                        if key and os.path.exists(cache_file):
+                            merged.setdefault(key, {}).update(
+                                (name, line) for name, line in _read_autoconf_cache(cache_file).items()
+                                if not CONFIGURE_CACHE_EXCLUDE.search(name))
+        except OSError:
+            continue
+
+    added = 0
+    with _SHARED_STATE_LOCK:
+        for key, entries in merged.items():
+            seed_file = os.path.join(cache_root, f"{key}.cache")
+            existing = _read_autoconf_cache(seed_file)
+            new_names = set(entries) - set(existing)
+            if not new_names:
+                continue
+            existing.update((name, entries[name]) for name in new_names)
+            tmp_path = f"{seed_file}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.writelines(existing[name] for name in sorted(existing))
+            os.replace(tmp_path, seed_file)
+            added += len(new_names)
+    if added:
+        print(f"[CONFIG CACHE] Recorded {added} new cache entries from {len(merged)} compiler setups")
+
+# 부트스트랩 단계 (이름, 최상위 make 타겟) - configure는 별도 처리, install은 _install에서 처리
+# stage3-bubble 은 최상위 Makefile 에서 stage2/stage3 비교(compare)까지 수행하므로 별도 단계를 두지 않음
+# (비교 시간과 디스크 증가량은 stage3 에 포함됨)
+BOOTSTRAP_PHASES = [
+    ('stage1', 'stage1-bubble'),
+    ('stage2', 'stage2-bubble'),
+    ('stage3', 'stage3-bubble'),
+    ('target_libs', 'all'),
+]
+# profiledbootstrap: 계측 컴파일러로 학습한 프로파일로 최종 컴파일러를 빌드
+# stage_final 은 profiledbootstrap 타겟이 써 두고 'all' 이 최종 stage 를 고를 때만 읽음 - stageN-bubble 타겟은
+# 이전 bubble 에 대한 의존성만 따라가므로 그 전에 stageprofile/stagefeedback-bubble 을 직접 실행해도 됨.
+# 마지막 profiledbootstrap 은 stage_final 을 쓴 뒤 이미 끝난 stagefeedback-bubble 을 건너뛰고 'all' 만 수행.
+PROFILED_BOOTSTRAP_PHASES = [
+    ('stage1', 'stage1-bubble'),
+    ('stageprofile', 'stageprofile-bubble'),
+    ('stagefeedback', 'stagefeedback-bubble'),
+    ('target_libs', 'profiledbootstrap'),
+]
+
+# 빌드 모드 (GCC_BUILD_MODE) - GCC_MINIMAL_BUILD=1 은 minimal과 동일
+BUILD_MODES = {
+    'full': {
+        'pkgversion': "M83 GCC {version} Toolchain",
+        'languages': 'c,c++,fortran',
+        'configure_opts': [],
+        'phases': BOOTSTRAP_PHASES,
+    },
+    'minimal': {
+        'pkgversion': "M83 GCC {version} Toolchain (Minimal)",
+        'languages': 'c,c++',
+        'configure_opts': [],
+        'phases': BOOTSTRAP_PHASES,
+    },
+    'optimized': {
+        'pkgversion': "M83 GCC {version} Toolchain (PGO+LTO)",
+        'languages': 'c,c++,fortran',
+        'configure_opts': ['--with-build-config="bootstrap-lto bootstrap-O3"'],
+        'phases': PROFILED_BOOTSTRAP_PHASES,
+    },
+}
+
+# 모든 모드의 단계를 포함하는 순서 - 각 모드의 단계는 이 순서의 부분열
+PHASE_ORDER = ['configure', 'stage1', 'stageprofile', 'stagefeedback',
+               'stage2', 'stage3', 'target_libs', 'install']
+
+def get_build_mode():
+    """현재 빌드 설정의 빌드 모드 이름"""
+    mode = current_build_config().mode
+    if mode not in BUILD_MODES:
+        raise BuildError(f"Unknown GCC_BUILD_MODE '{mode}' (expected one of: {', '.join(BUILD_MODES)})",
+                         error_type='configure_failed')
+    return mode
+
+def get_linker():
+    """현재 빌드 설정의 기본 링커 이름"""
+    linker = current_build_config().linker
+    if linker not in LINKERS:
+        raise BuildError(f"Unknown linker '{linker}' (expected one of: {', '.join(LINKERS)})",
+                         error_type='configure_failed')
+    return linker
+
+def find_linker_program(linker):
+    """binutils 패키지(REZ_BINUTILS_ROOT)에서 링커 실행 파일 경로 - 없으면 빌드 환경 PATH 에서 찾음"""
+    program = LINKERS[linker]['program']
+    env = current_build_config().environ()
+    binutils_root = env.get('REZ_BINUTILS_ROOT')
+    if binutils_root and os.path.exists(os.path.join(binutils_root, 'bin', program)):
+        return os.path.join(binutils_root, 'bin', program)
+    return shutil.which(program, path=env.get('PATH'))
+
+def get_linker_options():
+    """기본 링커 configure 옵션 - bfd 는 기존 configure 명령을 그대로 유지 (fingerprint/캐시 키 불변)"""
+    linker = get_linker()
+    if linker == 'bfd':
+        return []
+    path = find_linker_program(linker)
+    if not path:
+        raise BuildError(f"{LINKERS[linker]['program']} not found in REZ_BINUTILS_ROOT or PATH",
+                         error_type='configure_failed')
+    # LTO 플러그인(liblto_plugin)과 -fuse-linker-plugin 기본값은 configure 가 --with-ld 링커의
+    # -plugin 지원을 확인해서 정함 (--enable-lto/--enable-plugin 은 모든 모드에서 기본값)
+    usage = subprocess.run([path, '--help'], capture_output=True, text=True).stdout
+    if '-plugin' not in usage:
+        raise BuildError(f"{path} was built without plugin support, LTO would not work with it",
+                         error_type='configure_failed')
+    print(f"[INFO] Using {linker} as default linker: {path}")
+    return [f"--with-ld={path}"]
+
+def get_configure_cmd(gcc_src_dir, install_path):
+    """현재 환경(빌드 모드, sysroot, 링커)에 맞는 configure 명령 생성"""
+    # sysroot 옵션 가져오기
+    sysroot_opts = get_sysroot_options()
+    sysroot_opts_str = " \\\n          ".join(sysroot_opts)
+    linker_opts_str = "".join(f"{opt} \\\n              " for opt in get_linker_options())
+    
+    mode = get_build_mode()
+    mode_info = BUILD_MODES[mode]
+    pkgversion = mode_info['pkgversion'].format(version=current_build_config().version)
+    linker = get_linker()
+    if linker != 'bfd':
+        # gcc --version 에서 링커 변형 구분 - "(Minimal)" → "(Minimal, gold)"
+        pkgversion = f"{pkgversion[:-1]}, {linker})" if pkgversion.endswith(')') else f"{pkgversion} ({linker})"
+    
+    if mode == 'minimal':
+        print("[INFO] Using minimal build configuration")
+        configure_cmd = f"""
+            {gcc_src_dir}/configure \\
+              --prefix={install_path} \\
+              --enable-languages={mode_info['languages']} \\
+              --disable-multilib \\
+              --enable-shared \\
+              {sysroot_opts_str} \\
+              {linker_opts_str}--with-pkgversion="{pkgversion}"
+        """
+    else:
+        print(f"[INFO] Using {mode} build configuration")
+        mode_opts_str = "".join(f"{opt} \\\n              " for opt in mode_info['configure_opts'])
+        configure_cmd = f"""
+            {gcc_src_dir}/configure \\
+              --prefix={install_path} \\
+              --enable-languages={mode_info['languages']} \\
+              --disable-multilib \\
+              --enable-shared \\
+              --enable-threads=posix \\
+              --enable-lto \\
+              --enable-__cxa_atexit \\
+              --enable-checking=release \\
+              --with-system-zlib \\
+              {sysroot_opts_str} \\
+              --enable-libstdcxx-time=yes \\
+              --enable-gnu-indirect-function \\
+              --enable-gnu-unique-object \\
+              --enable-linker-build-id \\
+              --enable-plugin \\
+              --enable-initfini-array \\
+              --enable-libmpx \\
+              --with-linker-hash-style=gnu \\
+              --with-default-libstdcxx-abi=new \\
+              --with-gcc-major-version-only \\
+              {mode_opts_str}{linker_opts_str}--with-pkgversion="{pkgversion}" \\
+              --with-bugurl="https://github.com/m83/gcc-build"
+        """
+    return configure_cmd
+
+BUILD_MANIFEST = ".build_manifest.json"
+
+def file_sha256(path, chunk_size=4 * 1024 * 1024):
+    """파일 내용의 sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def compute_fingerprint(*parts):
+    """입력 값들로부터 안정적인 fingerprint 계산"""
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+def get_source_fingerprint(gcc_src_dir):
+    """GCC 소스 식별값 - 원본 아카이브 해시, 없으면 BASE-VER/DATESTAMP + GMP 패치 상태"""
+    source_dir = os.path.dirname(gcc_src_dir)
+    name = os.path.basename(gcc_src_dir)
+    for ext in ('.tar.xz', '.tar.gz', '.tar.bz2'):
+        archive = os.path.join(source_dir, name + ext)
+        if os.path.exists(archive):
+            return file_sha256(archive)
+
+    parts = [name]
+    for rel in ('gcc/BASE-VER', 'gcc/DATESTAMP'):
+        path = os.path.join(gcc_src_dir, rel)
+        if os.path.exists(path):
+            with open(path) as f:
+                parts.append(f.read().strip())
+    return compute_fingerprint(*parts)
+
+def get_phase_fingerprints(configure_cmd, gcc_src_dir, install_path):
+    """단계별 fingerprint - 앞 단계 fingerprint를 이어받아 변경 시 이후 단계가 모두 무효화됨"""
+    config = current_build_config()
+    configure_fp = compute_fingerprint(
+        ' '.join(configure_cmd.split()),
+        config.getenv('REZ_GLIBC_ROOT', ''),
+        config.getenv('REZ_BINUTILS_ROOT', ''),
+        get_source_fingerprint(gcc_src_dir),
+        config.getenv('GCC_MINIMAL_BUILD', '0'),
+        get_build_mode(),
+    )
+    fingerprints = {'configure': configure_fp}
+    previous = configure_fp
+    for phase in PHASE_ORDER[1:]:
+        extra = install_path if phase == 'install' else ''
+        previous = compute_fingerprint(previous, phase, extra)
+        fingerprints[phase] = previous
+    return fingerprints
+
+def load_build_manifest(build_dir):
+    """단계 체크포인트 manifest 읽기"""
+    path = os.path.join(build_dir, BUILD_MANIFEST)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+        manifest.setdefault('phases', {})
+        return manifest
+    except (OSError, ValueError):
+        return {'phases': {}}
+
+def save_build_manifest(build_dir, manifest):
+    """manifest 원자적 저장"""
+    os.makedirs(build_dir, exist_ok=True)
+    path = os.path.join(build_dir, BUILD_MANIFEST)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def phase_is_current(manifest, phase, fingerprints):
+    """해당 단계가 같은 입력으로 완료되었는지 확인"""
+    entry = manifest['phases'].get(phase)
+    return bool(entry) and entry.get('fingerprint') == fingerprints[phase]
+
+def mark_phase_done(build_dir, manifest, phase, fingerprint, started):
+    """단계 완료 기록"""
+    manifest['phases'][phase] = {
+        'fingerprint': fingerprint,
+        'completed_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'seconds': round(time.time() - started, 1),
+    }
+    if manifest.get('last_failed') == phase:
+        manifest.pop('last_failed')
+    save_build_manifest(build_dir, manifest)
+
+def invalidate_phases(build_dir, from_phase):
+    """from_phase 및 이후 단계의 체크포인트 삭제"""
+    manifest = load_build_manifest(build_dir)
+    if from_phase not in PHASE_ORDER:
+        return manifest
+    for phase in PHASE_ORDER[PHASE_ORDER.index(from_phase):]:
+        if manifest['phases'].pop(phase, None):
+            print(f"[CHECKPOINT] Invalidated phase: {phase}")
+    save_build_manifest(build_dir, manifest)
+    return manifest
+
+def run_build_phase(build_dir, manifest, phase, fingerprints, cmd, **kwargs):
+    """체크포인트가 유효하면 건너뛰고, 아니면 실행 후 기록"""
+    if phase_is_current(manifest, phase, fingerprints):
+        print(f"[CHECKPOINT] Phase '{phase}' up to date, skipping")
+        return False
+
+    # 이 단계를 다시 수행하면 이후 단계 결과는 더 이상 유효하지 않음
+    for later in PHASE_ORDER[PHASE_ORDER.index(phase):]:
+        manifest['phases'].pop(later, None)
+    save_build_manifest(build_dir, manifest)
+
+    print(f"\n[CHECKPOINT] Running phase '{phase}'")
+    started = time.time()
+    try:
+        with trace_span(phase):
+            if callable(cmd):
+                # 여러 명령으로 이뤄진 단계 (예: 타겟 라이브러리 분산 빌드)
+                cmd()
             else:
-                print(f"⚠️  GCC test failed: {test_result.stderr}")
-        except Exception as e:
-            print(f"⚠️  GCC test error: {e}")
+                run_cmd_with_logging(cmd, cwd=build_dir, trace_label=phase, **kwargs)
+    except BuildError:
+        manifest['last_failed'] = phase
+        save_build_manifest(build_dir, manifest)
+        raise
+    finally:
+        if get_build_trace():
+            get_build_trace().save()
+    mark_phase_done(build_dir, manifest, phase, fingerprints[phase], started)
+    return True
 
-    print("\n[INFO] Build verification complete")
+# 스냅샷에 미리 적용하는 소스 패치 (함수 소스가 스냅샷 키에 포함됨)
+SOURCE_PATCHES = [patch_gmp]
 
-def _build(source_path, build_path, install_path):
+# 이 프로세스에서 이미 준비한 (source, version) - 매트릭스 빌드가 같은 트리를 다시 풀지 않도록
+_PREPARED_SOURCES = set()
+_SOURCE_LOCK = threading.Lock()
+
+def ensure_gcc_source(source_path, version):
+    """./source 의 GCC 소스를 패치된 스냅샷과 맞춤 (없으면 미러에서 받아 준비, gcc_source.py)"""
+    with _SOURCE_LOCK:
+        if (source_path, version) not in _PREPARED_SOURCES:
+            _prepare_gcc_source(source_path, version)
+            _PREPARED_SOURCES.add((source_path, version))
+
+def _prepare_gcc_source(source_path, version):
     source_dir = os.path.join(source_path, "source")
-    gcc_src_dirs = [d for d in glob.glob(os.path.join(source_dir, "gcc-*")) if os.path.isdir(d)]
+    archive = os.path.join(source_dir, f"gcc-{version}.tar.xz")
+    if os.path.isdir(os.path.join(source_dir, f"gcc-{version}")) and not os.path.exists(archive):
+        # 아카이브 없이 직접 풀어 둔 트리는 그대로 사용
+        return
+    import gcc_source
+    try:
+        gcc_source.prepare_source(version, source_dir, patches=SOURCE_PATCHES)
+    except gcc_source.SourceError as e:
+        raise BuildError(str(e), error_type='source_fetch')
+
+def find_gcc_src_dir(source_path, version=None):
+    """./source 아래 빌드할 버전의 GCC 소스 디렉토리 찾기 (여러 버전이 함께 있을 수 있음)"""
+    version = version or current_build_config().version
+    source_dir = os.path.join(source_path, "source")
+    wanted = os.path.join(source_dir, f"gcc-{version}")
+    if os.path.isdir(wanted):
+        return wanted
+    gcc_src_dirs = sorted(d for d in glob.glob(os.path.join(source_dir, "gcc-*")) if os.path.isdir(d))
     if not gcc_src_dirs:
         raise RuntimeError("❌ gcc source directory not found in ./source")
+    if len(gcc_src_dirs) > 1:
+        raise RuntimeError(f"❌ gcc-{version} not found in ./source (found: "
+                           f"{', '.join(os.path.basename(d) for d in gcc_src_dirs)})")
+    return gcc_src_dirs[0]
+
+# 타겟 라이브러리 분산 빌드 (GCC_TARGET_LIB_EXECUTOR=local 또는 module:Class 로 활성화)
+# 부트스트랩이 끝난 뒤 서로 독립적인 타겟 라이브러리를 워커에서 빌드하고 결과만 받아옴
+# (GCC_TARGET_LIB_EXECUTOR, GCC_TARGET_LIB_REMOTE, GCC_TARGET_LIB_WORKERS 는 빌드 설정별로 읽음)
+TARGET_LIB_REMOTE_DEFAULT = 'libstdc++-v3,libgfortran,libgomp,libsanitizer,libquadmath'
+TARGET_LIB_SCRATCH = os.environ.get('GCC_TARGET_LIB_SCRATCH', tempfile.gettempdir())
+# 워커로 보내는 stage 컴파일러 - gcc/ 바로 아래에서 컴파일러 자체의 오브젝트/생성 소스는 제외
+STAGE_COMPILER_SKIP = re.compile(r'\.(o|a|c|cc|h|def|texi|gcda|gcno|txt)$')
+STAGE_COMPILER_KEEP = re.compile(r'^(crt.*\.o|libgcc.*\.(a|so.*)|libgcov\.a)$')
+STAGE_COMPILER_DIRS = ('gcc/include', 'gcc/include-fixed', 'lto-plugin')
+RELOCATE_MAX_BYTES = 16 * 1024 * 1024
+
+def target_lib_executor_name():
+    return current_build_config().getenv('GCC_TARGET_LIB_EXECUTOR', '')
+
+def target_lib_remote():
+    """워커로 보낼 타겟 라이브러리 목록"""
+    return [lib for lib in current_build_config().getenv('GCC_TARGET_LIB_REMOTE', TARGET_LIB_REMOTE_DEFAULT).split(',')
+            if lib]
 
-    gcc_src_dir = gcc_src_dirs[0]
+def target_lib_workers():
+    return int(current_build_config().getenv('GCC_TARGET_LIB_WORKERS', '0'))  # 0이면 실행기 기본값
+
+def read_target_lib_graph(build_dir):
+    """최상위 Makefile 에서 (타겟 하위 디렉토리, 활성화된 타겟 라이브러리, 라이브러리별 의존성) 읽기"""
+    with open(os.path.join(build_dir, 'Makefile'), errors='replace') as f:
+        text = f.read()
+    match = re.search(r'^TARGET_SUBDIR\s*=\s*(\S+)', text, re.MULTILINE)
+    if not match:
+        raise BuildError("TARGET_SUBDIR not found in top-level Makefile", error_type='makefile_error')
+    enabled = set(re.findall(r'^maybe-all-target-([\w+.-]+):\s*all-target-\1\s*$', text, re.MULTILINE))
+    deps = {lib: set() for lib in enabled}
+    for lib, rhs in re.findall(r'^(?:configure|all)-target-([\w+.-]+):(.*)$', text, re.MULTILINE):
+        if lib in deps:
+            deps[lib].update(dep for dep in re.findall(r'(?:maybe-)?all-target-([\w+.-]+)', rhs)
+                             if dep in enabled and dep != lib)
+    return match.group(1), enabled, deps
+
+def _transitive_deps(lib, deps):
+    seen = set()
+    stack = list(deps.get(lib, ()))
+    while stack:
+        dep = stack.pop()
+        if dep not in seen:
+            seen.add(dep)
+            stack.extend(deps.get(dep, ()))
+    return seen
+
+def _target_lib_waves(libs, deps):
+    """의존성 순서대로 동시에 빌드할 수 있는 묶음(wave) 목록"""
+    pending = set(libs)
+    waves = []
+    while pending:
+        wave = sorted(lib for lib in pending if not (deps.get(lib, set()) & pending))
+        if not wave:
+            raise BuildError(f"Circular target library dependencies: {', '.join(sorted(pending))}",
+                             error_type='makefile_error')
+        waves.append(wave)
+        pending -= set(wave)
+    return waves
+
+def _stage_compiler_files(build_dir):
+    """워커로 보낼 stage 컴파일러 파일 목록 (build_dir 기준 상대 경로)"""
+    files = []
+    with os.scandir(os.path.join(build_dir, 'gcc')) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                continue
+            if STAGE_COMPILER_KEEP.match(entry.name) or not STAGE_COMPILER_SKIP.search(entry.name):
+                files.append(f"gcc/{entry.name}")
+    files.extend(d for d in STAGE_COMPILER_DIRS if os.path.isdir(os.path.join(build_dir, d)))
+    return sorted(files)
+
+def _pack_bundle(build_dir, paths, bundle):
+    """build_dir 기준 경로들을 tar 번들로 묶음 (mtime 유지 - 워커의 make 가 최신으로 판단하도록)"""
+    list_file = f"{bundle}.list"
+    with open(list_file, 'w') as f:
+        f.write('\n'.join(paths) + '\n')
+    try:
+        subprocess.run(['tar', '-cf', bundle, '-C', build_dir, '-T', list_file], check=True,
+                       capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        raise BuildError(f"Could not pack {bundle}: {e.stderr.strip()}", error_type='target_lib_executor')
+    finally:
+        os.unlink(list_file)
+    return bundle
+
+def relocate_tree(root, old, new, paths=('.',)):
+    """텍스트 파일 안의 빌드 디렉토리 절대 경로를 바꿈 (mtime 유지 - make 가 다시 빌드하지 않도록)"""
+    old_bytes, new_bytes = old.encode(), new.encode()
+    changed = 0
+    for rel in paths:
+        for dirpath, _, filenames in os.walk(os.path.join(root, rel)):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.lstat(path)
+                    if not stat.S_ISREG(st.st_mode) or st.st_size > RELOCATE_MAX_BYTES:
+                        continue
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                    if old_bytes not in data or b'\0' in data[:8192]:
+                        continue
+                    with open(path, 'wb') as f:
+                        f.write(data.replace(old_bytes, new_bytes))
+                    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+                    changed += 1
+                except OSError:
+                    continue
+    return changed
+
+class TargetLibJob:
+    """워커 하나에 보내는 타겟 라이브러리 하위 빌드 (job.json 명세 + 번들들 → 결과 tar)"""
+    def __init__(self, lib, staging_dir, spec, log_file):
+        self.lib = lib
+        self.staging_dir = staging_dir
+        self.spec_path = os.path.join(staging_dir, f"{lib}.job.json")
+        self.result_path = os.path.join(staging_dir, f"{lib}.result.tar")
+        self.bundles = [os.path.join(staging_dir, name) for name in spec['bundles']]
+        self.log_file = log_file
+        with open(self.spec_path, 'w') as f:
+            json.dump(spec, f, indent=2)
+
+class TargetLibExecutor:
+    """타겟 라이브러리 하위 빌드 실행기의 기본 클래스
+
+    run(job) 에서 job.spec_path 와 job.bundles 를 워커로 보내
+    'rezbuild.py target-lib-worker <job.json> <result.tar>' 를 실행하고
+    결과 tar 를 job.result_path 로 가져오면 됨 (번들 이름은 job.json 기준 상대 경로).
+    """
+    default_workers = 1
+
+    def __init__(self, workers=None):
+        self.workers = workers or self.default_workers
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='target-lib')
+
+    def jobs_per_worker(self, total_jobs, wave_size):
+        """워커 한 곳의 make 병렬도 - None 이면 워커가 자기 CPU 수를 사용"""
+        return None
+
+    def submit(self, job):
+        return submit_in_context(self._pool, self.run, job)
+
+    def run(self, job):
+        raise NotImplementedError
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+class LocalProcessExecutor(TargetLibExecutor):
+    """같은 호스트의 별도 작업 디렉토리를 워커로 쓰는 대체 실행기 - 번들 전송, 경로 재배치, 결과 회수를 원격과 똑같이 거침"""
+    @property
+    def default_workers(self):
+        return len(target_lib_remote())
+
+    def jobs_per_worker(self, total_jobs, wave_size):
+        return max(1, total_jobs // max(1, min(wave_size, self.workers)))
+
+    def run(self, job):
+        root = tempfile.mkdtemp(prefix=f"rez-worker-{job.lib}-", dir=TARGET_LIB_SCRATCH)
+        try:
+            run_cmd_with_logging(
+                f"{shlex.quote(sys.executable)} {shlex.quote(os.path.abspath(__file__))} target-lib-worker "
+                f"{shlex.quote(job.spec_path)} {shlex.quote(job.result_path)} --root {shlex.quote(root)}",
+                log_file=job.log_file, trace_label=f"worker-{job.lib}")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+TARGET_LIB_EXECUTORS = {
+    'local': LocalProcessExecutor,
+}
+
+def get_target_lib_executor(name, workers=None):
+    """이름(local) 또는 'module:Class' 로 실행기 생성"""
+    if name in TARGET_LIB_EXECUTORS:
+        cls = TARGET_LIB_EXECUTORS[name]
+    elif ':' in name:
+        import importlib
+        module_name, _, class_name = name.partition(':')
+        cls = getattr(importlib.import_module(module_name), class_name)
+    else:
+        raise BuildError(f"Unknown target library executor '{name}' "
+                         f"(expected one of: {', '.join(TARGET_LIB_EXECUTORS)} or module:Class)",
+                         error_type='target_lib_executor')
+    return cls(workers or None)
+
+def _merge_target_lib_result(build_dir, rel, result_path):
+    """워커가 돌려준 라이브러리 디렉토리로 로컬 디렉토리를 교체"""
+    target = os.path.join(build_dir, rel)
+    incoming = tempfile.mkdtemp(prefix='.rez-incoming-', dir=os.path.dirname(target))
+    try:
+        subprocess.run(['tar', '-xf', result_path, '-C', incoming], check=True, capture_output=True)
+        previous = f"{target}.rez-previous"
+        os.rename(target, previous)
+        os.rename(os.path.join(incoming, rel), target)
+        shutil.rmtree(previous)
+    finally:
+        shutil.rmtree(incoming, ignore_errors=True)
+
+# 워커로 보내지 않는 변수 - jobserver 파이프 fd 등은 코디네이터 프로세스에서만 유효
+TARGET_LIB_ENV_EXCLUDE = ('MAKEFLAGS', 'MFLAGS', 'MAKELEVEL', 'MAKE_TERMOUT', 'MAKE_TERMERR')
+
+def target_lib_job_env(env):
+    """빌드 단계 env 에서 워커에 적용할 부분 - (설정할 변수, 지울 변수)
+
+    os.environ 과 다른 값만 보냄 (binutils PATH, 빌드 설정의 env 덮어쓰기, 지운 CC/CXX/LD 등).
+    """
+    if env is None:
+        return {}, []
+    changed = {key: value for key, value in env.items()
+               if key not in TARGET_LIB_ENV_EXCLUDE and os.environ.get(key) != value}
+    removed = sorted(key for key in os.environ if key not in env and key not in TARGET_LIB_ENV_EXCLUDE)
+    return changed, removed
+
+def distribute_target_libs(build_dir, gcc_src_dir, make, jobs, log_dir, executor, env=None):
+    """타겟 라이브러리를 의존성 wave 단위로 워커에 보내 빌드하고 나머지는 로컬 make all 로 마무리
+
+    make 는 최상위 타겟 목록을 받아 로컬에서 실행하는 함수, env 는 로컬 make 와 같은 빌드 단계 환경.
+    """
+    job_env, job_unset_env = target_lib_job_env(env)
+    target_subdir, enabled, deps = read_target_lib_graph(build_dir)
+    remote = [lib for lib in target_lib_remote() if lib in enabled]
+    if not remote:
+        print("[TARGET LIBS] No distributable target libraries enabled, building locally")
+        make(['all'])
+        return
+
+    # 원격 라이브러리가 기다리는 나머지 의존성(libgcc 등)은 먼저 로컬에서 빌드
+    local_first = {'libgcc'} & enabled
+    for lib in remote:
+        local_first.update(dep for dep in _transitive_deps(lib, deps) if dep not in remote)
+    make([f"all-target-{lib}" for lib in sorted(local_first)])
+
+    with open(os.path.join(build_dir, 'Makefile'), errors='replace') as f:
+        configure_targets = sorted(set(re.findall(r'^(configure-target-[\w+.-]+):', f.read(), re.MULTILINE)))
+    origins = sorted({os.path.abspath(build_dir), os.path.realpath(build_dir)})
+    staging_dir = tempfile.mkdtemp(prefix='rez-target-libs-', dir=TARGET_LIB_SCRATCH)
+    worker_logs = os.path.join(log_dir, 'target-libs')
+    os.makedirs(worker_logs, exist_ok=True)
+    try:
+        common = ['Makefile', 'config.status'] + _stage_compiler_files(build_dir)
+        common += [f"{target_subdir}/{lib}" for lib in sorted(local_first)]
+        _pack_bundle(build_dir, common, os.path.join(staging_dir, 'common.tar'))
+
+        waves = _target_lib_waves(remote, {lib: deps[lib] & set(remote) for lib in remote})
+        print(f"[TARGET LIBS] {len(remote)} libraries in {len(waves)} waves via {type(executor).__name__}: "
+              + ' → '.join(','.join(wave) for wave in waves))
+        for wave in waves:
+            # configure 는 로컬에서 - 앞 wave 의 결과가 필요한 configure 도 있음 (libsanitizer → libstdc++)
+            make([f"configure-target-{lib}" for lib in wave])
+            futures = {}
+            for lib in wave:
+                shipped = [lib] + sorted(dep for dep in _transitive_deps(lib, deps) if dep not in local_first)
+                bundle = _pack_bundle(build_dir, [f"{target_subdir}/{name}" for name in shipped],
+                                      os.path.join(staging_dir, f"{lib}.tar"))
+                spec = {
+                    'lib': lib,
+                    'origin_build_dir': origins[0],
+                    'origin_aliases': origins,
+                    'gcc_src_dir': gcc_src_dir,
+                    'bundles': ['common.tar', os.path.basename(bundle)],
+                    'result_dir': f"{target_subdir}/{lib}",
+                    # configure 는 끝났으므로 stage_last 등 부트스트랩 쪽 전제 조건은 건드리지 않음
+                    'make_args': [arg for target in configure_targets + ['Makefile', 'config.status']
+                                  for arg in ('-o', target)] + [f"all-target-{lib}"],
+                    'jobs': executor.jobs_per_worker(jobs, len(wave)),
+                    'env': job_env,
+                    'unset_env': job_unset_env,
+                }
+                job = TargetLibJob(lib, staging_dir, spec, os.path.join(worker_logs, f"{lib}.log"))
+                futures[lib] = (job, executor.submit(job))
+
+            failed = None
+            for lib, (job, future) in futures.items():
+                try:
+                    future.result()
+                    _merge_target_lib_result(build_dir, f"{target_subdir}/{lib}", job.result_path)
+                    print(f"[TARGET LIBS] {lib} built remotely and merged")
+                except BuildError as e:
+                    print(f"[TARGET LIBS] {lib} failed on worker: {e}")
+                    failed = failed or BuildError(
+                        f"Target library {lib} failed on worker: {e}", error_type=e.error_type or 'makefile_error',
+                        log_file=job.log_file, error_report=e.error_report,
+                        failed_make={'level': 1, 'target': 'all',
+                                     'directory': os.path.join(build_dir, target_subdir, lib)})
+            if failed:
+                raise failed
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    # 나머지 타겟 라이브러리와 gotools 등 - 원격 결과는 최신이므로 건너뜀
+    make(['all'])
+
+def _distributed_target_libs_cmd(build_dir, gcc_src_dir, make_prefix, jobs, log_dir, **kwargs):
+    """run_build_phase 에 넘길 타겟 라이브러리 분산 빌드 함수"""
+    def make(targets):
+        run_cmd_with_logging(f"{make_prefix} {' '.join(targets)}", cwd=build_dir, timeout=3600,
+                             trace_label='target_libs', **kwargs)
+
+    def run():
+        executor = get_target_lib_executor(target_lib_executor_name(), target_lib_workers())
+        try:
+            distribute_target_libs(build_dir, gcc_src_dir, make, jobs, log_dir, executor, env=kwargs.get('env'))
+        finally:
+            executor.close()
+    return run
+
+def target_lib_worker(argv):
+    """타겟 라이브러리 하위 빌드 워커 - 번들을 풀고 make 를 실행한 뒤 결과 디렉토리를 묶어 돌려줌"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py target-lib-worker', description=target_lib_worker.__doc__)
+    parser.add_argument('job', help="job.json written by the coordinator")
+    parser.add_argument('result', help="tar file to write the built library directory to")
+    parser.add_argument('--root', default=None, help="worker scratch directory (default: a new temp dir)")
+    args = parser.parse_args(argv)
+
+    with open(args.job) as f:
+        spec = json.load(f)
+    root = args.root or tempfile.mkdtemp(prefix=f"rez-worker-{spec['lib']}-", dir=TARGET_LIB_SCRATCH)
+    # 설정된 Makefile/libtool 의 절대 경로를 작업 디렉토리로 재배치하고, 결과는 다시 원래 경로로 되돌림
+    origin = spec['origin_build_dir']
+    work = os.path.join(root, 'build')
+    os.makedirs(work, exist_ok=True)
+    job_dir = os.path.dirname(os.path.abspath(args.job))
+    for bundle in spec['bundles']:
+        subprocess.run(['tar', '-xf', os.path.join(job_dir, bundle), '-C', work], check=True)
+    if work != origin:
+        for alias in spec['origin_aliases']:
+            changed = relocate_tree(work, alias, work)
+            print(f"[WORKER] Relocated {changed} files from {alias} to {work}")
+    if not os.path.isdir(spec['gcc_src_dir']):
+        print(f"[WORKER] GCC source {spec['gcc_src_dir']} is not available on this worker")
+        return 2
+
+    # 코디네이터의 빌드 단계 환경 (binutils PATH, 지운 CC/CXX/LD, 빌드 설정 env) 적용
+    env = os.environ.copy()
+    env.update(spec.get('env', {}))
+    for key in spec.get('unset_env', []) + list(TARGET_LIB_ENV_EXCLUDE):
+        env.pop(key, None)
+
+    jobs = spec.get('jobs') or os.cpu_count() or 1
+    cmd = ['make', f"-j{jobs}"] + spec['make_args']
+    print(f"[WORKER] {' '.join(cmd)} (in {work})", flush=True)
+    returncode = subprocess.call(cmd, cwd=work, env=env)
+    if returncode != 0:
+        return returncode
+    if work != origin:
+        relocate_tree(work, work, origin, [spec['result_dir']])
+    subprocess.run(['tar', '-cf', args.result, '-C', work, spec['result_dir']], check=True)
+    print(f"[WORKER] {spec['lib']} → {args.result}")
+    return 0
+
+def _build(source_path, build_path, install_path, recover=True):
+    gcc_src_dir = find_gcc_src_dir(source_path)
     print(f"[INFO] Using GCC source: {gcc_src_dir}")
     
     # 빌드 환경 설정
@@ -597,119 +3134,649 @@ def _build(source_path, build_path, install_path):
     configure_log = os.path.join(log_dir, "configure.log")
     build_log = os.path.join(log_dir, "build.log")
     
-    # Configure 완료 마커 파일
-    configure_done = os.path.join(build_dir, ".configure_done")
+    configure_cache_root = None
     
     try:
         # GMP 패치 적용
         patch_gmp(gcc_src_dir)
         
-        # 빌드 디렉토리 준비 - configure가 이미 완료되었는지 확인
-        if os.path.exists(configure_done):
-            print("[INFO] Configure already completed, skipping...")
+        configure_cmd = get_configure_cmd(gcc_src_dir, install_path)
+        fingerprints = get_phase_fingerprints(configure_cmd, gcc_src_dir, install_path)
+        manifest = load_build_manifest(build_dir)
+        
+        # 빌드 디렉토리 준비 - 같은 입력으로 configure가 완료되었는지 확인
+        needs_configure = not phase_is_current(manifest, 'configure', fingerprints)
+        if not needs_configure:
+            print("[CHECKPOINT] Configure up to date, skipping...")
         else:
+            if manifest['phases']:
+                print("[CHECKPOINT] Configure inputs changed, reconfiguring from scratch")
             # 빌드 디렉토리 완전히 정리하고 다시 생성
             clean_path(build_dir)
             os.makedirs(build_dir, exist_ok=True)
-            
-            # sysroot 옵션 가져오기
-            sysroot_opts = get_sysroot_options()
-            sysroot_opts_str = " \\\n          ".join(sysroot_opts)
-            
-            # 최소 빌드 모드 확인
-            minimal_build = os.environ.get('GCC_MINIMAL_BUILD', '0') == '1'
-            
-            if minimal_build:
-                print("[INFO] Using minimal build configuration")
-                configure_cmd = f"""
-                    {gcc_src_dir}/configure \\
-                      --prefix={install_path} \\
-                      --enable-languages=c,c++ \\
-                      --disable-multilib \\
-                      --enable-shared \\
-                      {sysroot_opts_str} \\
-                      --with-pkgversion="M83 GCC 11.5.0 Toolchain (Minimal)"
-                """
-            else:
-                configure_cmd = f"""
-                    {gcc_src_dir}/configure \\
-                      --prefix={install_path} \\
-                      --enable-languages=c,c++,fortran \\
-                      --disable-multilib \\
-                      --enable-shared \\
-                      --enable-threads=posix \\
-                      --enable-lto \\
-                      --enable-__cxa_atexit \\
-                      --enable-checking=release \\
-                      --with-system-zlib \\
-                      {sysroot_opts_str} \\
-                      --enable-libstdcxx-time=yes \\
-                      --enable-gnu-indirect-function \\
-                      --enable-gnu-unique-object \\
-                      --enable-linker-build-id \\
-                      --enable-plugin \\
-                      --enable-initfini-array \\
-                      --enable-libmpx \\
-                      --with-linker-hash-style=gnu \\
-                      --with-default-libstdcxx-abi=new \\
-                      --with-gcc-major-version-only \\
-                      --with-pkgversion="M83 GCC 11.5.0 Toolchain" \\
-                      --with-bugurl="https://github.com/m83/gcc-build"
-                """
-
+            manifest = {'phases': {}}
+        
+        # 남은 단계에 필요한 디스크 공간 사전 확인
+        build_phases = BUILD_MODES[get_build_mode()]['phases']
+        pending = [phase for phase, _ in build_phases if not phase_is_current(manifest, phase, fingerprints)]
+        check_disk_space(build_dir, (['configure'] if needs_configure else []) + pending, reclaim_dir=build_dir)
+        
+        # 하위 configure 들은 make 도중에도 실행되므로 build env 전체에 적용
+        if configure_cache_enabled():
+            configure_cache_root = setup_configure_cache(build_dir, build_env)
+        
+        if needs_configure:
             print("\n[INFO] Configure command:")
             print(configure_cmd)
             
             # Configure 실행 (에러 처리 포함)
-            run_cmd_with_logging(configure_cmd, cwd=build_dir, env=build_env, 
-                               log_file=configure_log, timeout=900)  # 15분 타임아웃으로 단축
-            
-            # Configure 완료 마커 생성
-            with open(configure_done, 'w') as f:
-                f.write(f"Configure completed at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            run_build_phase(build_dir, manifest, 'configure', fingerprints, configure_cmd,
+                            env=build_env, log_file=configure_log, timeout=900)  # 15분 타임아웃으로 단축
+            record_disk_footprint('configure', _scan_tree(build_dir))
+            if configure_cache_root:
+                harvest_configure_cache(build_dir, configure_cache_root)
         
         # 빌드 실행 (에러 처리 포함)
-        jobs = os.environ.get('MAKEFLAGS', f'-j{os.cpu_count()}').replace('-j', '')
+        config = current_build_config()
+        jobs = config.jobs
         print(f"\n[INFO] Building with {jobs} parallel jobs...")
         
-        # --no-print-directory로 불필요한 출력 줄이기
-        # configure 재실행 방지를 위해 --disable-option-checking 추가
-        build_cmd = f"make -j{jobs} --no-print-directory"
+        # 메모리 압력에 따라 병렬도를 조정하도록 jobserver를 직접 소유
+        # 이전 빌드에서 기록한 컴파일러 최대 RSS 로 작업당 메모리 추정
+        job_memory = telemetry_job_memory(os.path.join(log_dir, TELEMETRY_FILE_NAME))
+        if job_memory:
+            print(f"[INFO] Per-job memory estimate from telemetry: {job_memory / 1024 ** 3:.2f} GB")
+        jobserver = (MakeJobserver(jobs, job_memory=job_memory, memory_budget=config.memory_budget)
+                     if adaptive_jobs_enabled() else None)
+        config.jobserver = jobserver
+        watchdog = DiskWatchdog([build_dir], build_dir, jobserver)
         
-        run_cmd_with_logging(build_cmd, cwd=build_dir, env=build_env, 
-                           log_file=build_log, timeout=3600)  # 1시간 타임아웃으로 단축
+        # 부트스트랩 단계별로 나눠 실행 - 완료된 단계는 재실행하지 않음
+        try:
+            used = _scan_tree(build_dir) if pending else 0
+            for phase, target in build_phases:
+                reclaims = watchdog.reclaims
+                if jobserver:
+                    build_cmd = f"make {target}"
+                    phase_env, pass_fds = jobserver.make_env(build_env), jobserver.pass_fds
+                else:
+                    build_cmd = f"make -j{jobs} {target}"
+                    phase_env, pass_fds = build_env, ()
+                if phase == 'target_libs' and target == 'all' and target_lib_executor_name():
+                    build_cmd = _distributed_target_libs_cmd(build_dir, gcc_src_dir, build_cmd.rsplit(' ', 1)[0],
+                                                             jobs, log_dir, env=phase_env, pass_fds=pass_fds,
+                                                             log_file=build_log)
+                ran = run_build_phase(build_dir, manifest, phase, fingerprints, build_cmd,
+                                      env=phase_env, pass_fds=pass_fds,
+                                      log_file=build_log, timeout=3600)  # 1시간 타임아웃으로 단축
+                if configure_cache_root:
+                    harvest_configure_cache(build_dir, configure_cache_root)
+                if ran:
+                    # 다음 빌드의 사전 확인에 쓸 단계별 증가량 기록 - 도중에 회수했으면 증가량이 틀리므로 건너뜀
+                    now_used = _scan_tree(build_dir)
+                    if watchdog.reclaims == reclaims:
+                        record_disk_footprint(phase, now_used - used)
+                    else:
+                        print(f"[DISK] Space was reclaimed during {phase}, not recording its footprint")
+                    used = now_used
+        finally:
+            watchdog.close()
+            config.jobserver = None
+            if jobserver:
+                jobserver.close()
         
     except BuildError as e:
+        if configure_cache_root:
+            harvest_configure_cache(build_dir, configure_cache_root)
+        if not recover:
+            raise
         print(f"\n[BUILD ERROR] {e}")
         print(f"[BUILD ERROR] Error type: {e.error_type}")
+        if e.error_report:
+            print(f"[BUILD ERROR] Error context:\n{e.error_report}")
+        if e.log_file:
+            print(f"[BUILD ERROR] For the full failure context run: {sys.argv[0]} triage {e.log_file}")
+        
+        if e.failed_make:
+            print(f"[BUILD ERROR] First failing sub-make: {e.failed_make['directory']} ({e.failed_make['target']})")
         
         # 자동 수정 시도
         if e.error_type and auto_fix_error(e.error_type, build_dir, gcc_src_dir, install_path):
             print("[BUILD ERROR] Attempting smart rebuild after auto-fix...")
-            return smart_rebuild(source_path, build_path, install_path)
         else:
             # 자동 수정 실패 시 스마트 재빌드 시도
             print("[BUILD ERROR] Auto-fix failed, attempting smart rebuild...")
-            return smart_rebuild(source_path, build_path, install_path)
+        return smart_rebuild(source_path, build_path, install_path, error=e)
     
     except Exception as e:
+        if not recover:
+            raise
         print(f"\n[UNEXPECTED ERROR] {e}")
         # 예상치 못한 에러의 경우도 스마트 재빌드 시도
         return smart_rebuild(source_path, build_path, install_path)
 
+# 로컬 스테이징 설치 후 원자적 게시 (GCC_STAGED_INSTALL=0 으로 비활성화)
+INSTALL_STAGING_DIR = os.environ.get('GCC_INSTALL_STAGING_DIR', tempfile.gettempdir())
+PUBLISH_WORKERS = int(os.environ.get('GCC_PUBLISH_WORKERS', '16'))
+PUBLISH_KEEP = int(os.environ.get('GCC_PUBLISH_KEEP', '1'))  # 롤백용으로 남길 이전 릴리스 수
+
+def staged_install_enabled():
+    return current_build_config().getenv('GCC_STAGED_INSTALL', '1') != '0'
+
+def parallel_copy_tree(src, dst, workers=None):
+    """디렉토리를 먼저 만들고 파일은 스레드 풀로 병렬 복사 (심볼릭/하드링크, 권한, mtime 유지)"""
+    workers = workers or PUBLISH_WORKERS
+    directories = []
+    files = []
+    for root, dirs, names in os.walk(src):
+        rel_root = os.path.relpath(root, src)
+        target_root = os.path.normpath(os.path.join(dst, rel_root))
+        os.makedirs(target_root, exist_ok=True)
+        directories.append((root, target_root))
+        for name in dirs:
+            path = os.path.join(root, name)
+            if os.path.islink(path):
+                files.append((path, os.path.join(target_root, name)))
+        files.extend((os.path.join(root, name), os.path.join(target_root, name)) for name in names)
+
+    # 같은 inode 는 한 번만 복사하고 나머지는 하드링크로 재현
+    primaries = []
+    links = []
+    seen = {}
+    for source, target in files:
+        st = os.lstat(source)
+        if st.st_nlink > 1 and not os.path.islink(source):
+            inode = (st.st_dev, st.st_ino)
+            if inode in seen:
+                links.append((seen[inode], target))
+                continue
+            seen[inode] = target
+        primaries.append((source, target))
+
+    def copy_one(item):
+        source, target = item
+        if os.path.islink(source):
+            os.symlink(os.readlink(source), target)
+        else:
+            shutil.copy2(source, target)
+        return os.lstat(target).st_size
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        copied = sum(pool.map(copy_one, primaries))
+    for primary, target in links:
+        os.link(primary, target)
+
+    # 파일 복사가 디렉토리 mtime 을 바꾸므로 마지막에 깊은 곳부터 권한/시간 복원
+    for source_dir, target_dir in reversed(directories):
+        shutil.copystat(source_dir, target_dir)
+    return copied, len(primaries), len(links)
+
+# 설치 트리 중복 파일 통합 (GCC_INSTALL_DEDUP=hardlink|reflink|off)
+FICLONE = 0x40049409  # linux/fs.h
+
+def _reflink(source, target):
+    """source 내용을 target 으로 reflink (같은 블록 공유, inode 는 별도)"""
+    import fcntl
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+    shutil.copystat(source, target)
+
+def install_dedup_mode():
+    return current_build_config().getenv('GCC_INSTALL_DEDUP', 'hardlink')
+
+def dedupe_tree(root, mode=None, workers=None):
+    """내용이 같은 파일을 하드링크(또는 reflink)로 통합하고 절약한 바이트 수 반환"""
+    mode = mode or install_dedup_mode()
+    if mode == 'off':
+        return 0
+    workers = workers or PUBLISH_WORKERS
+
+    # 크기/권한/소유자가 같은 파일만 후보 - 하드링크는 메타데이터를 공유하므로
+    by_shape = {}
+    seen_inodes = set()
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            st = os.lstat(path)
+            if not stat.S_ISREG(st.st_mode) or st.st_size == 0 or (st.st_dev, st.st_ino) in seen_inodes:
+                continue
+            seen_inodes.add((st.st_dev, st.st_ino))
+            by_shape.setdefault((st.st_size, st.st_mode, st.st_uid, st.st_gid), []).append(path)
+    candidates = [path for paths in by_shape.values() if len(paths) > 1 for path in paths]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = dict(zip(candidates, pool.map(file_sha256, candidates)))
+
+    groups = {}
+    for path in candidates:
+        st = os.lstat(path)
+        groups.setdefault((st.st_size, st.st_mode, st.st_uid, st.st_gid, digests[path]), []).append(path)
+
+    saved = 0
+    linked = 0
+    for (size, *_), paths in groups.items():
+        if len(paths) < 2:
+            continue
+        primary = min(paths)
+        for path in paths:
+            if path == primary:
+                continue
+            tmp = f"{path}.dedup-{os.getpid()}"
+            try:
+                if mode == 'reflink':
+                    try:
+                        _reflink(primary, tmp)
+                    except OSError:
+                        if os.path.exists(tmp):
+                            os.unlink(tmp)
+                        os.link(primary, tmp)
+                else:
+                    os.link(primary, tmp)
+                os.replace(tmp, path)
+            except OSError as e:
+                print(f"[WARNING] Could not dedupe {path}: {e}")
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                continue
+            saved += size
+            linked += 1
+    print(f"[DEDUP] {linked} duplicate files collapsed ({mode}), {saved / 1024 ** 2:.1f} MB saved")
+    return saved
+
+# 설치된 ELF 의 디버그 정보 분리 (GCC_INSTALL_STRIP=1 로 활성화)
+def strip_enabled():
+    return current_build_config().getenv('GCC_INSTALL_STRIP', '0') == '1'
+
+def get_debug_info_dir(install_path):
+    """분리한 디버그 정보를 둘 경로 - gdb 의 debug-file-directory 로 지정
+
+    기본값은 설치 트리 안이라 릴리스와 함께 스테이징/게시됨.
+    """
+    return current_build_config().getenv('GCC_DEBUG_INFO_DIR', os.path.join(install_path.rstrip('/'), 'debug'))
+
+def publish_debug_info(staged_debug, debug_dir):
+    """설치 트리 밖의 디버그 디렉토리에 스테이징한 .build-id 파일 추가 - 파일별 임시 파일 + rename
+
+    build-id 경로는 내용마다 다르므로 기존 파일은 그대로 두고 새 파일만 추가 (이전 릴리스도 계속 사용 가능).
+    """
+    added = 0
+    for dirpath, _, names in os.walk(staged_debug):
+        target_dir = os.path.join(debug_dir, os.path.relpath(dirpath, staged_debug))
+        os.makedirs(target_dir, exist_ok=True)
+        for name in names:
+            target = os.path.join(target_dir, name)
+            if os.path.exists(target):
+                continue
+            tmp = f"{target}.tmp-{os.getpid()}"
+            shutil.copy2(os.path.join(dirpath, name), tmp)
+            os.replace(tmp, target)
+            added += 1
+    print(f"[STRIP] Published {added} debug files to {debug_dir}")
+
+def _elf_type(path):
+    """ELF 파일이면 e_type (2=EXEC, 3=DYN) 반환, 아니면 None"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(18)
+    except OSError:
+        return None
+    if len(header) < 18 or header[:4] != b'\x7fELF':
+        return None
+    return int.from_bytes(header[16:18], 'little' if header[5] == 1 else 'big')
+
+def read_build_id(path):
+    result = subprocess.run(['readelf', '-n', '--wide', path], capture_output=True, text=True)
+    match = re.search(r'Build ID:\s*([0-9a-f]+)', result.stdout)
+    return match.group(1) if match else None
+
+def _strip_one(path, debug_dir):
+    """디버그 정보를 .build-id 트리로 옮기고 원본은 strip - (원래 크기, strip 후 크기)"""
+    build_id = read_build_id(path)
+    if not build_id or len(build_id) < 3:
+        return None
+    debug_file = os.path.join(debug_dir, '.build-id', build_id[:2], f"{build_id[2:]}.debug")
+    os.makedirs(os.path.dirname(debug_file), exist_ok=True)
+    before = os.path.getsize(path)
+    st = os.stat(path)
+    subprocess.run(['objcopy', '--only-keep-debug', '--compress-debug-sections', path, debug_file],
+                   check=True, capture_output=True)
+    strip_flag = '--strip-unneeded' if _elf_type(path) == 3 and '.so' in os.path.basename(path) else '--strip-all'
+    subprocess.run(['objcopy', strip_flag, '--remove-section=.comment',
+                    f'--add-gnu-debuglink={debug_file}', path],
+                   check=True, capture_output=True)
+    os.chmod(path, stat.S_IMODE(st.st_mode))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return before, os.path.getsize(path)
+
+def strip_install(root, debug_dir, workers=None):
+    """설치 트리의 실행 파일/공유 라이브러리를 병렬로 strip 하고 디버그 정보를 분리"""
+    workers = workers or os.cpu_count() or 1
+    inodes = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            if os.path.islink(path) or _elf_type(path) not in (2, 3):
+                continue
+            st = os.lstat(path)
+            inodes.setdefault((st.st_dev, st.st_ino), []).append(path)
+
+    print(f"[STRIP] Splitting debug info from {len(inodes)} ELF files into {debug_dir}")
+    started = time.time()
+    groups = [sorted(paths) for paths in inodes.values()]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_strip_one, paths[0], debug_dir): paths for paths in groups}
+    before = after = skipped = 0
+    for future, paths in futures.items():
+        try:
+            sizes = future.result()
+        except subprocess.CalledProcessError as e:
+            print(f"[WARNING] strip failed for {paths[0]}: {e.stderr.decode(errors='replace').strip()}")
+            continue
+        if sizes is None:
+            skipped += 1
+            continue
+        before += sizes[0]
+        after += sizes[1]
+        # objcopy 가 새 파일로 교체했다면 make install 이 만든 하드링크를 다시 연결
+        for path in paths[1:]:
+            if os.path.samefile(paths[0], path):
+                continue
+            tmp = f"{path}.strip-{os.getpid()}"
+            os.link(paths[0], tmp)
+            os.replace(tmp, path)
+    if skipped:
+        print(f"[WARNING] {skipped} ELF files have no build-id, left unstripped")
+    print(f"[STRIP] {before / 1024 ** 2:.1f} MB → {after / 1024 ** 2:.1f} MB in {time.time() - started:.1f}s")
+    return before - after
+
+# 설치 트리에 $ORIGIN 기준 RUNPATH 설정 (GCC_INSTALL_RUNPATH=1 로 활성화, patchelf 필요)
+# package.py 의 commands() 가 LD_LIBRARY_PATH 를 설정하지 않아도 되도록 함
+RUNPATH_LIB_DIRS = ('lib64', 'lib')
+RUNPATH_MARKER = '.rez_runpath'
+# LD_LIBRARY_PATH 없이 확인할 스모크 테스트 - 이 gcc 의 런타임 라이브러리를 쓰는 것들
+RUNPATH_SMOKE_TESTS = ('c++17', 'c++20', 'fortran', 'openmp')
+
+def runpath_enabled():
+    return current_build_config().getenv('GCC_INSTALL_RUNPATH', '0') == '1'
+
+def read_dynamic_section(path):
+    """readelf -d 에서 (NEEDED 목록, 현재 RUNPATH/RPATH) 읽기"""
+    result = subprocess.run(['readelf', '-d', '--wide', path], capture_output=True, text=True)
+    needed = re.findall(r'\(NEEDED\)\s+Shared library: \[([^\]]+)\]', result.stdout)
+    match = re.search(r'\((?:RUNPATH|RPATH)\)\s+Library (?:runpath|rpath): \[([^\]]*)\]', result.stdout)
+    return needed, match.group(1) if match else None
+
+def _set_runpath_one(path, root, sonames):
+    """path 가 필요로 하는 라이브러리가 있는 설치 디렉토리만 $ORIGIN 상대 경로로 지정 - 바뀌었으면 새 RUNPATH 반환"""
+    needed, current = read_dynamic_section(path)
+    dirs = []
+    for lib_dir in RUNPATH_LIB_DIRS:
+        if any(name in sonames[lib_dir] for name in needed):
+            rel = os.path.relpath(os.path.join(root, lib_dir), os.path.dirname(path))
+            dirs.append('$ORIGIN' if rel == '.' else f'$ORIGIN/{rel}')
+    runpath = ':'.join(dirs)
+    if not runpath or runpath == current:
+        return None
+    st = os.stat(path)
+    subprocess.run(['patchelf', '--set-rpath', runpath, path], check=True, capture_output=True)
+    os.chmod(path, stat.S_IMODE(st.st_mode))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    return runpath
+
+def write_runpath_specs(root, install_path):
+    """이 gcc 로 링크한 프로그램이 LD_LIBRARY_PATH 없이 같은 gcc 의 libstdc++/libgcc_s 를 찾도록 specs 에 -rpath 추가"""
+    rpaths = ' '.join(f"-rpath {os.path.join(install_path, d)}" for d in RUNPATH_LIB_DIRS
+                      if os.path.isdir(os.path.join(root, d)))
+    written = []
+    for spec_dir in glob.glob(os.path.join(root, 'lib', 'gcc', '*', '*')):
+        if not os.path.isdir(spec_dir):
+            continue
+        # '+' 로 시작하면 기본 link spec 뒤에 덧붙임 - 정적 링크에는 넣지 않음
+        with open(os.path.join(spec_dir, 'specs'), 'w') as f:
+            f.write(f"*link:\n+ %{{!static:%{{!static-pie:{rpaths}}}}}\n\n")
+        written.append(spec_dir)
+    return written
+
+def _runpath_sonames(root):
+    """설치 트리의 라이브러리 디렉토리별 파일 이름 목록"""
+    return {lib_dir: set(os.listdir(os.path.join(root, lib_dir))) if os.path.isdir(os.path.join(root, lib_dir))
+            else set() for lib_dir in RUNPATH_LIB_DIRS}
+
+def _dynamic_elf_groups(root):
+    """실행 파일과 공유 라이브러리를 inode 별로 묶은 경로 목록 (오브젝트/정적 라이브러리는 ELF REL 이라 제외됨)"""
+    inodes = {}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            # 분리된 디버그 정보 파일(.debug)은 동적 섹션이 비어 있음
+            if os.path.islink(path) or name.endswith('.debug') or _elf_type(path) not in (2, 3):
+                continue
+            st = os.lstat(path)
+            inodes.setdefault((st.st_dev, st.st_ino), []).append(path)
+    return [sorted(paths) for paths in inodes.values()]
+
+def set_install_runpath(root, install_path, workers=None):
+    """설치 트리의 ELF 에 $ORIGIN 상대 RUNPATH 를 설정하고 specs 에 -rpath 추가 - 적용 여부 반환"""
+    if not shutil.which('patchelf'):
+        print("[WARNING] patchelf not found, installing without RUNPATH (package.py keeps LD_LIBRARY_PATH)")
+        return False
+    sonames = _runpath_sonames(root)
+    started = time.time()
+    groups = _dynamic_elf_groups(root)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        futures = {pool.submit(_set_runpath_one, paths[0], root, sonames): paths for paths in groups}
+    patched = 0
+    for future, paths in futures.items():
+        try:
+            runpath = future.result()
+        except subprocess.CalledProcessError as e:
+            raise BuildError(f"patchelf failed for {paths[0]}: {e.stderr.decode(errors='replace').strip()}",
+                             error_type='runpath_failed')
+        if runpath:
+            patched += 1
+            # 하드링크는 같은 파일이므로 디렉토리 깊이가 다르면 한쪽 RUNPATH 가 틀림
+            if len({os.path.dirname(path) for path in paths}) > 1:
+                print(f"[WARNING] {paths[0]} is hardlinked across directories, RUNPATH {runpath} may not fit all of them")
+
+    specs = write_runpath_specs(root, install_path)
+    with open(os.path.join(root, RUNPATH_MARKER), 'w') as f:
+        json.dump({'lib_dirs': [d for d in RUNPATH_LIB_DIRS if sonames[d]], 'patched': patched}, f)
+    print(f"[RUNPATH] {patched}/{len(groups)} ELF files patched, -rpath added to {len(specs)} specs "
+          f"in {time.time() - started:.1f}s")
+    return True
+
+def check_install_runpath(root):
+    """게시 전 확인 - 설치 트리 안의 라이브러리를 쓰는 ELF 가 $ORIGIN RUNPATH 만으로 모두 찾을 수 있는지"""
+    sonames = _runpath_sonames(root)
+    bundled = set().union(*sonames.values())
+    missing = []
+    for paths in _dynamic_elf_groups(root):
+        for path in paths:
+            needed, runpath = read_dynamic_section(path)
+            wanted = [name for name in needed if name in bundled]
+            if not wanted:
+                continue
+            origin = os.path.dirname(path)
+            dirs = [os.path.normpath(d.replace('$ORIGIN', origin)) for d in (runpath or '').split(':') if d]
+            for name in wanted:
+                if not any(os.path.exists(os.path.join(d, name)) for d in dirs):
+                    missing.append(f"{os.path.relpath(path, root)}: {name} (RUNPATH {runpath or '-'})")
+    if missing:
+        for line in missing[:10]:
+            print(f"❌ {line}")
+        raise BuildError(f"{len(missing)} bundled library reference(s) not reachable through RUNPATH in {root}",
+                         error_type='verify_failed')
+    print("✅ RUNPATH resolves all bundled libraries")
+
+def rollback_publish(install_path, previous, release):
+    """게시 후 확인에 실패하면 install_path 링크를 이전 릴리스로 되돌리고 새 릴리스 삭제"""
+    install_path = install_path.rstrip('/')
+    parent, name = os.path.split(install_path)
+    if not previous or not os.path.isdir(os.path.join(parent, previous)):
+        print(f"[WARNING] No previous release of {install_path} to roll back to")
+        return False
+    tmp_link = os.path.join(parent, f".{name}.link-{os.getpid()}")
+    os.symlink(previous, tmp_link)
+    os.replace(tmp_link, install_path)
+    clean_path(release)
+    print(f"↩️  Rolled back {install_path} → {previous}")
+    return True
+
+def verify_runpath_install(install_path):
+    """게시된 설치본에서 LD_LIBRARY_PATH 없이 런타임 라이브러리를 쓰는 스모크 테스트 실행"""
+    print("\n[INFO] Testing RUNPATH install without LD_LIBRARY_PATH...")
+    tests = select_smoke_tests(RUNPATH_SMOKE_TESTS)
+    report = run_smoke_tests(install_path, tests=tests, library_path=False)
+    if not report['passed']:
+        raise BuildError(f"RUNPATH install at {install_path} does not work without LD_LIBRARY_PATH",
+                         error_type='verify_failed')
+    return report
+
+def _release_dirs(install_path):
+    """install_path 옆에 게시된 릴리스 디렉토리 목록 (오래된 순)"""
+    parent, name = os.path.split(install_path.rstrip('/'))
+    # copystat 이 mtime 을 스테이징 트리 값으로 되돌리므로 ctime 기준으로 정렬
+    return sorted(glob.glob(os.path.join(parent, f".{name}.*")), key=lambda path: os.lstat(path).st_ctime)
+
+def publish_install(staged_root, install_path):
+    """스테이징 트리를 install_path 옆에 복사한 뒤 심볼릭 링크 교체로 원자적 게시"""
+    install_path = install_path.rstrip('/')
+    parent, name = os.path.split(install_path)
+    os.makedirs(parent, exist_ok=True)
+    release = tempfile.mkdtemp(prefix=f".{name}.{time.strftime('%Y%m%d%H%M%S')}-", dir=parent)
+    os.chmod(release, 0o755)
+
+    print(f"[PUBLISH] Copying {staged_root} → {release}")
+    started = time.time()
+    try:
+        copied, file_count, link_count = parallel_copy_tree(staged_root, release)
+    except OSError:
+        clean_path(release)
+        raise
+    print(f"[PUBLISH] Copied {file_count} files ({copied / 1024 ** 2:.1f} MB, {link_count} hardlinks) "
+          f"in {time.time() - started:.1f}s")
+
+    # 예전 방식으로 설치된 실제 디렉토리는 한 번만 옆으로 옮기고 이후로는 링크 교체
+    if os.path.isdir(install_path) and not os.path.islink(install_path):
+        legacy = os.path.join(parent, f".{name}.legacy-{os.getpid()}")
+        os.rename(install_path, legacy)
+    tmp_link = os.path.join(parent, f".{name}.link-{os.getpid()}")
+    os.symlink(os.path.basename(release), tmp_link)
+    os.replace(tmp_link, install_path)
+    print(f"✅ Published {install_path} → {os.path.basename(release)}")
+
+    # 방금 게시한 것과 롤백용 이전 릴리스를 제외하고 정리
+    old_releases = [path for path in _release_dirs(install_path) if path != release]
+    for path in old_releases[:max(len(old_releases) - PUBLISH_KEEP, 0)]:
+        clean_path(path)
+    return release
+
 def _install(build_path, install_path):
     build_dir = os.path.join(build_path, "gcc-build")
     if not os.path.exists(build_dir):
         raise RuntimeError("❌ Build directory not found. Run build step first.")
 
-    clean_path(install_path)
-    os.makedirs(install_path, exist_ok=True)
+    # install 체크포인트 - 마지막 빌드 단계 fingerprint에 설치 경로를 이어 붙인 값
+    manifest = load_build_manifest(build_dir)
+    last_build = manifest['phases'].get('target_libs')
+    install_fp = compute_fingerprint(last_build['fingerprint'], 'install', install_path) if last_build else None
+    if (install_fp and manifest['phases'].get('install', {}).get('fingerprint') == install_fp
+            and os.path.exists(os.path.join(install_path, 'bin', 'gcc'))):
+        print(f"[CHECKPOINT] Install up to date at {install_path}, skipping")
+        verify_build(install_path)
+        return
+
+    # 스테이징 모드에서는 로컬 디스크에 DESTDIR 설치 후 검증하고 게시
+    started = time.time()
+    staging_dir = None
+    prefix_root = install_path
+    destdir = ""
+    if staged_install_enabled():
+        os.makedirs(INSTALL_STAGING_DIR, exist_ok=True)
+        staging_dir = tempfile.mkdtemp(prefix='gcc-install-', dir=INSTALL_STAGING_DIR)
+        prefix_root = os.path.join(staging_dir, install_path.lstrip('/'))
+        destdir = f" DESTDIR={staging_dir}"
+        print(f"[INFO] Staging install in {staging_dir}")
+    else:
+        clean_path(install_path)
+    os.makedirs(prefix_root, exist_ok=True)
+
+    # 스테이징 디렉토리와 게시 위치 모두 설치 트리 크기만큼 필요
+    check_disk_space(prefix_root, ['install'])
+    if staging_dir:
+        check_disk_space(os.path.dirname(install_path.rstrip('/')), ['install'])
 
+    try:
+        with trace_span('install'):
+            _make_install(build_dir, prefix_root, destdir)
+        record_disk_footprint('install', _scan_tree(prefix_root))
+        debug_dir = staged_debug = get_debug_info_dir(install_path)
+        if strip_enabled():
+            # 디버그 정보도 스테이징 - 설치 트리 안이면 같이 게시되고, 밖이면 게시 직전에 추가
+            rel = os.path.relpath(debug_dir, install_path)
+            if not rel.startswith('..'):
+                staged_debug = os.path.join(prefix_root, rel)
+            elif staging_dir:
+                staged_debug = os.path.join(staging_dir, 'debug')
+            # strip 은 파일을 새로 쓰므로 하드링크 통합보다 먼저 실행
+            with trace_span('strip'):
+                strip_install(prefix_root, staged_debug)
+        if runpath_enabled():
+            # patchelf 도 파일을 새로 쓰고, 하드링크된 파일은 같은 RUNPATH 를 가져야 하므로 통합 전에 실행
+            with trace_span('runpath'):
+                set_install_runpath(prefix_root, install_path)
+        with trace_span('dedupe'):
+            dedupe_tree(prefix_root)
+        with trace_span('verify'):
+            report = verify_build(prefix_root)
+        if staging_dir:
+            # 검증에 실패한 트리는 게시하지 않음 - 기존 릴리스가 그대로 유지됨
+            if report and not report['passed'] and current_build_config().getenv('GCC_PUBLISH_FORCE', '0') != '1':
+                raise BuildError(f"Staged install failed verification, not publishing {install_path}",
+                                 error_type='verify_failed')
+        if benchmark_enabled():
+            # 게시 전에 스테이징된 컴파일러를 현재 배포본과 비교 - strict 모드면 회귀 시 게시하지 않음
+            with trace_span('benchmark'):
+                bench = benchmark_install(install_path, os.path.join(build_path, "logs", "benchmark.json"),
+                                          root=prefix_root)
+            if bench.get('regressions') and current_build_config().getenv('GCC_BENCH_STRICT', '0') == '1':
+                raise BuildError(f"{len(bench['regressions'])} benchmark regression(s) against "
+                                 f"{bench['baseline']['root']}, not publishing {install_path}",
+                                 error_type='benchmark_regression')
+        if os.path.exists(os.path.join(prefix_root, RUNPATH_MARKER)):
+            with trace_span('check-runpath'):
+                check_install_runpath(prefix_root)
+        previous = release = None
+        if staging_dir:
+            previous = os.readlink(install_path) if os.path.islink(install_path) else None
+            with trace_span('publish'):
+                if staged_debug != debug_dir and not staged_debug.startswith(prefix_root + os.sep):
+                    publish_debug_info(staged_debug, debug_dir)
+                release = publish_install(prefix_root, install_path)
+        # specs 의 -rpath 는 최종 설치 경로를 가리키므로 실제 실행 확인은 게시된 뒤에 - 실패하면 이전 릴리스로 복구
+        if os.path.exists(os.path.join(install_path, RUNPATH_MARKER)):
+            with trace_span('verify-runpath'):
+                try:
+                    verify_runpath_install(install_path)
+                except BuildError:
+                    if release:
+                        rollback_publish(install_path, previous, release)
+                    raise
+    finally:
+        if staging_dir:
+            clean_path(staging_dir)
+
+    print(f"✅ Installed to: {install_path}")
+    if install_fp:
+        mark_phase_done(build_dir, manifest, 'install', install_fp, started)
+
+def _make_install(build_dir, prefix_root, destdir=""):
+    """make install 및 누락된 헤더/내부 라이브러리 보완 (prefix_root 는 실제 파일이 놓이는 경로)"""
     print("[INFO] Running make install...")
-    run_cmd("make install", cwd=build_dir)
+    run_cmd(f"make install{destdir}", cwd=build_dir)
     
     # C++ 헤더 확인 (버전에 관계없이)
-    cpp_include_path = os.path.join(install_path, "include/c++")
+    cpp_include_path = os.path.join(prefix_root, "include/c++")
     cpp_headers_found = False
     if os.path.exists(cpp_include_path):
         version_dirs = os.listdir(cpp_include_path)
@@ -719,7 +3786,7 @@ def _install(build_path, install_path):
         print("[INFO] C++ headers missing, trying libstdc++-v3 install...")
         try:
             # libstdc++-v3 설치 시도
-            run_cmd("make -C x86_64-pc-linux-gnu/libstdc++-v3 install-data", cwd=build_dir)
+            run_cmd(f"make -C x86_64-pc-linux-gnu/libstdc++-v3 install-data{destdir}", cwd=build_dir)
         except Exception as e:
             print(f"[WARNING] libstdc++-v3 install failed: {e}")
             try:
@@ -734,7 +3801,7 @@ def _install(build_path, install_path):
                 print(f"[WARNING] Manual header copy also failed: {e2}")
     
     # GCC 내부 라이브러리 확인 (버전에 관계없이)
-    gcc_lib_base = os.path.join(install_path, "lib/gcc/x86_64-pc-linux-gnu")
+    gcc_lib_base = os.path.join(prefix_root, "lib/gcc/x86_64-pc-linux-gnu")
     gcc_libs_found = False
     if os.path.exists(gcc_lib_base):
         version_dirs = os.listdir(gcc_lib_base)
@@ -747,30 +3814,1459 @@ def _install(build_path, install_path):
             available_targets = subprocess.run("make -qp | grep '^install-'", 
                                              shell=True, capture_output=True, text=True, cwd=build_dir)
             if "install-headers" in available_targets.stdout:
-                run_cmd("make install-headers", cwd=build_dir)
+                run_cmd(f"make install-headers{destdir}", cwd=build_dir)
             else:
                 print("[INFO] No additional install targets available")
         except Exception as e:
             print(f"[WARNING] Additional install attempts failed: {e}")
-    
-    print(f"✅ Installed to: {install_path}")
-    
-    # 빌드 검증
-    verify_build(install_path)
 
-def build(source_path, build_path, install_path, targets):
-    version = os.environ.get("REZ_BUILD_PROJECT_VERSION", "11.5.0")
+# 설치 결과 캐시 설정 (GCC_INSTALL_CACHE=0 으로 비활성화)
+INSTALL_CACHE_DIR = os.environ.get('GCC_INSTALL_CACHE_DIR',
+                                   os.path.expanduser('~/.cache/rez-gcc/install'))
+INSTALL_CACHE_MAX_BYTES = _parse_size(os.environ.get('GCC_INSTALL_CACHE_MAX', '20G'))
+
+def install_cache_enabled():
+    return current_build_config().getenv('GCC_INSTALL_CACHE', '1') != '0'
+
+def get_install_cache_key(gcc_src_dir, install_path):
+    """설치 결과를 결정하는 입력들의 content hash"""
+    configure_cmd = get_configure_cmd(gcc_src_dir, install_path)
+    gmp_patch_file = os.path.join(gcc_src_dir, "gmp/printf/repl-vsnprintf.c")
+    gmp_patch_hash = file_sha256(gmp_patch_file) if os.path.exists(gmp_patch_file) else ''
+    return compute_fingerprint(
+        'install-cache-v1',
+        get_source_fingerprint(gcc_src_dir),
+        ' '.join(configure_cmd.split()),
+        current_build_config().getenv('REZ_BINUTILS_ROOT', ''),
+        current_build_config().getenv('REZ_GLIBC_ROOT', ''),
+        gmp_patch_hash,
+        # strip/통합 방식/RUNPATH 설치는 결과 트리가 다름 - 기본 설정의 기존 캐시 키는 그대로 유지
+        *(['strip'] if strip_enabled() else []),
+        *([f'dedup-{install_dedup_mode()}'] if install_dedup_mode() != 'hardlink' else []),
+        *(['runpath'] if runpath_enabled() else []),
+    )
+
+def _tree_size(path):
+    """트리의 실제 디스크 사용량 - 하드링크된 파일은 한 번만 계산"""
+    total = 0
+    seen = set()
+    for root, dirs, files in os.walk(path):
+        for name in files:
+            try:
+                st = os.lstat(os.path.join(root, name))
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) not in seen:
+                seen.add((st.st_dev, st.st_ino))
+                total += st.st_size
+    return total
+
+def _copy_tree(src, dst):
+    """권한/심볼릭 링크/하드링크를 유지하며 트리 복사 (가능하면 reflink)"""
+    os.makedirs(dst, exist_ok=True)
+    subprocess.run(['cp', '-a', '--reflink=auto', f"{src}/.", dst], check=True)
+
+def _read_cache_meta(entry_dir):
+    try:
+        with open(os.path.join(entry_dir, 'meta.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_cache_meta(entry_dir, meta):
+    tmp_path = os.path.join(entry_dir, 'meta.json.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(entry_dir, 'meta.json'))
+
+def restore_install_cache(key, install_path):
+    """캐시 hit이면 설치 트리를 복원하고 True 반환"""
+    entry_dir = os.path.join(INSTALL_CACHE_DIR, key)
+    meta = _read_cache_meta(entry_dir)
+    tree = os.path.join(entry_dir, 'tree')
+    if not meta or not os.path.isdir(tree):
+        print(f"[CACHE] Install cache miss: {key[:16]}")
+        return False
+
+    print(f"[CACHE] Install cache hit: {key[:16]} ({meta['size'] / 1024 ** 3:.2f} GB)")
+    started = time.time()
+    if staged_install_enabled():
+        publish_install(tree, install_path)
+    else:
+        clean_path(install_path)
+        _copy_tree(tree, install_path)
+    meta['last_used'] = time.time()
+    _write_cache_meta(entry_dir, meta)
+    print(f"[CACHE] Restored {install_path} in {time.time() - started:.1f}s")
+    return True
+
+def store_install_cache(key, install_path):
+    """설치 트리를 캐시에 저장하고 LRU 정리"""
+    entry_dir = os.path.join(INSTALL_CACHE_DIR, key)
+    if _read_cache_meta(entry_dir):
+        return
+    size = _tree_size(install_path)
+    if size > INSTALL_CACHE_MAX_BYTES:
+        print(f"[CACHE] Install tree ({size} bytes) exceeds cache cap, not caching")
+        return
+
+    os.makedirs(INSTALL_CACHE_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{key[:16]}-", dir=INSTALL_CACHE_DIR)
+    try:
+        _copy_tree(install_path, os.path.join(tmp_dir, 'tree'))
+        now = time.time()
+        _write_cache_meta(tmp_dir, {
+            'key': key,
+            'install_path': install_path,
+            'size': size,
+            'created': now,
+            'last_used': now,
+        })
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # 다른 빌드가 같은 키를 먼저 저장함
+            clean_path(tmp_dir)
+            return
+        print(f"[CACHE] Stored install tree as {key[:16]}")
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"[WARNING] Failed to store install cache: {e}")
+        clean_path(tmp_dir)
+        return
+    evict_install_cache(keep=key)
+
+def evict_install_cache(max_bytes=None, keep=None):
+    """최근 사용 시각 기준 LRU로 용량 상한까지 정리"""
+    max_bytes = INSTALL_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(INSTALL_CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(INSTALL_CACHE_DIR):
+        entry_dir = os.path.join(INSTALL_CACHE_DIR, name)
+        meta = _read_cache_meta(entry_dir)
+        if meta:
+            entries.append((meta.get('last_used', 0), meta.get('size', 0), name, entry_dir))
+    total = sum(e[1] for e in entries)
+    for last_used, size, name, entry_dir in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        print(f"[CACHE] Evicting {name[:16]} ({size / 1024 ** 3:.2f} GB)")
+        clean_path(entry_dir)
+        total -= size
+
+def _generate_synthetic_log(path, size_bytes, seed=0):
+    """GCC 부트스트랩 출력 형태의 합성 로그 생성 (끝부분에 실제 실패 패턴 포함)"""
+    import random
+    rng = random.Random(seed)
+    build_dir = "/build/gcc-11.5.0/gcc-build"
+    modules = ['gcc', 'libiberty', 'libcpp', 'libdecnumber', 'lto-plugin', 'gmp', 'mpfr', 'mpc',
+               'x86_64-pc-linux-gnu/libstdc++-v3', 'x86_64-pc-linux-gnu/libgfortran',
+               'x86_64-pc-linux-gnu/libgomp', 'x86_64-pc-linux-gnu/libsanitizer']
+    sources = ['tree-ssa-loop', 'gimple-fold', 'cp/pt', 'cp/semantics', 'fortran/resolve',
+               'ipa-cp', 'lra-constraints', 'insn-recog', 'dwarf2out', 'c-family/c-common']
+    templates = [
+        lambda: (f"libtool: compile:  {build_dir}/./prev-gcc/xg++ -B{build_dir}/./prev-gcc/ "
+                 f"-B/core/Linux/APPZ/packages/gcc/11.5.0/platform_linux/x86_64-pc-linux-gnu/bin/ "
+                 f"-nostdinc++ -fno-PIE -c -g -O2 -fchecking=1 -DIN_GCC -fno-exceptions -fno-rtti "
+                 f"-W -Wall -Wno-narrowing -Wwrite-strings -Wcast-qual -DHAVE_CONFIG_H -I. -I../../gcc "
+                 f"../../gcc/{rng.choice(sources)}.cc -o {rng.choice(sources).split('/')[-1]}.o"),
+        lambda: f"make[{rng.randint(1, 5)}]: Entering directory '{build_dir}/{rng.choice(modules)}'",
+        lambda: f"make[{rng.randint(1, 5)}]: Leaving directory '{build_dir}/{rng.choice(modules)}'",
+        lambda: f"checking for {rng.choice(['strnlen', 'mmap', 'getpagesize', 'sys/wait.h'])}... {rng.choice(['yes', 'yes', 'no'])}",
+        lambda: (f"../../gcc/{rng.choice(sources)}.cc:{rng.randint(10, 9000)}:{rng.randint(1, 80)}: "
+                 f"warning: unused variable 'tmp{rng.randint(0, 99)}' [-Wunused-variable]"),
+        lambda: f"/bin/bash ../../gcc/../move-if-change tmp-{rng.choice(sources).split('/')[-1]}.h {rng.choice(sources).split('/')[-1]}.h",
+        lambda: f"echo timestamp > s-{rng.choice(sources).split('/')[-1]}",
+    ]
+    weights = [60, 8, 8, 10, 6, 4, 4]
+    block_lines = [rng.choices(templates, weights)[0]() for _ in range(20000)]
+    block = ('\n'.join(block_lines) + '\n').encode()
+    failure = (
+        "../../gcc/cp/pt.cc:1234:5: error: 'foo' was not declared in this scope\n"
+        "make[3]: *** [Makefile:1143: cp/pt.o] Error 1\n"
+        "make[2]: *** [Makefile:4756: all-stage2-gcc] Error 2\n"
+    ).encode()
+
+    written = 0
+    with open(path, 'wb', buffering=8 * 1024 * 1024) as f:
+        while written + len(block) + len(failure) < size_bytes:
+            f.write(block)
+            written += len(block)
+        f.write(failure)
+        written += len(failure)
+    return written
+
+def _bench_classify_file(path, mode, chunk_bytes=64 * 1024 * 1024):
+    """합성 로그 하나를 지정 방식으로 분류하고 처리량 측정"""
+    classifier = BuildLogClassifier()
+    size = os.path.getsize(path)
+    start = time.perf_counter()
+    if mode == 'chunked':
+        with open(path, 'rb') as f:
+            remainder = b''
+            while True:
+                chunk = f.read(chunk_bytes)
+                if not chunk:
+                    break
+                chunk = remainder + chunk
+                cut = chunk.rfind(b'\n') + 1
+                remainder = chunk[cut:]
+                classifier.feed_text(chunk[:cut].decode('utf-8', 'replace'))
+            if remainder:
+                classifier.feed_text(remainder.decode('utf-8', 'replace') + '\n')
+    elif mode == 'streaming':
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                classifier.feed(line)
+    elif mode == 'legacy':
+        # 기존 방식: 패턴마다 전체 로그를 다시 스캔 (크기가 크면 매우 느림)
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            log_text = f.read()
+        legacy_type = None
+        for error_type, patterns in ERROR_PATTERNS.items():
+            for pattern in patterns:
+                if re.search(pattern, log_text, re.IGNORECASE | re.MULTILINE) and legacy_type is None:
+                    legacy_type = error_type
+        classifier.line_count = log_text.count('\n')
+        del log_text
+    else:
+        raise ValueError(f"unknown benchmark mode: {mode}")
+    elapsed = time.perf_counter() - start
+
+    matches = classifier.matches()
+    if mode == 'legacy':
+        matches = [{'error_type': legacy_type}] if legacy_type else []
+    return {
+        'mode': mode,
+        'bytes': size,
+        'seconds': round(elapsed, 3),
+        'mb_per_sec': round(size / (1024 * 1024) / elapsed, 1) if elapsed else None,
+        'lines': classifier.line_count,
+        'error_type': matches[0]['error_type'] if matches else None,
+        'categories': [m['error_type'] for m in matches],
+    }
+
+def bench_classify(argv):
+    """합성 GCC 빌드 로그(1~5 GB)로 에러 분류 처리량 벤치마크"""
+    import argparse
+    import resource
+    parser = argparse.ArgumentParser(prog='rezbuild.py bench-classify',
+                                     description=bench_classify.__doc__)
+    parser.add_argument('--sizes', default='1G,5G', help="comma separated log sizes (default: 1G,5G)")
+    parser.add_argument('--modes', default='chunked,streaming', help="chunked,streaming,legacy")
+    parser.add_argument('--workdir', default=None, help="directory for generated logs (default: temp dir)")
+    parser.add_argument('--keep', action='store_true', help="keep generated logs for reuse")
+    parser.add_argument('--json', dest='json_path', default=None, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='gcc-log-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    try:
+        for size_str in args.sizes.split(','):
+            size = _parse_size(size_str)
+            log_path = os.path.join(workdir, f"synthetic-build-{size_str.strip()}.log")
+            if not os.path.exists(log_path) or os.path.getsize(log_path) > size:
+                print(f"[BENCH] Generating {size_str} synthetic log: {log_path}")
+                _generate_synthetic_log(log_path, size)
+            for mode in args.modes.split(','):
+                result = _bench_classify_file(log_path, mode.strip())
+                result['size'] = size_str.strip()
+                results.append(result)
+                print(f"[BENCH] {result['size']:>6} {result['mode']:<10} "
+                      f"{result['seconds']:>9.2f}s {result['mb_per_sec']:>8} MB/s → {result['error_type']}")
+            if not args.keep:
+                os.remove(log_path)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'python': sys.version.split()[0],
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'results': results,
+    }
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"[BENCH] Results written to {args.json_path}")
+    print(f"[BENCH] Peak RSS: {report['peak_rss_mb']} MB")
+    return 0
+
+def _generate_cxx_workload(path, scale=40):
+    """템플릿/STL 비중이 큰 C++ 번역 단위 생성 (컴파일러 처리량 측정용)"""
+    parts = [
+        "#include <map>\n#include <vector>\n#include <string>\n#include <algorithm>\n"
+        "#include <memory>\n#include <tuple>\n#include <functional>\n#include <sstream>\n\n"
+        "template <int N> struct Fib { static constexpr long value = Fib<N - 1>::value + Fib<N - 2>::value; };\n"
+        "template <> struct Fib<1> { static constexpr long value = 1; };\n"
+        "template <> struct Fib<0> { static constexpr long value = 0; };\n\n"
+        "template <typename T, int Depth> struct Nest { using type = std::vector<typename Nest<T, Depth - 1>::type>; };\n"
+        "template <typename T> struct Nest<T, 0> { using type = T; };\n\n"
+    ]
+    for i in range(scale):
+        parts.append(f"""
+template <typename K, typename V>
+struct Registry{i} {{
+    std::map<K, std::vector<V>> items;
+    void add(const K& k, V v) {{ items[k].push_back(std::move(v)); }}
+    template <typename F> auto transform(F f) const {{
+        std::vector<decltype(f(std::declval<V>()))> out;
+        for (auto& kv : items) std::transform(kv.second.begin(), kv.second.end(), std::back_inserter(out), f);
+        std::sort(out.begin(), out.end());
+        return out;
+    }}
+}};
+
+long work{i}(int n) {{
+    Registry{i}<std::string, std::tuple<int, double, std::string>> reg;
+    for (int j = 0; j < n; ++j) {{
+        std::ostringstream key; key << "k" << (j % 7);
+        reg.add(key.str(), std::make_tuple(j, j * 0.5, key.str()));
+    }}
+    auto v = reg.transform([](const std::tuple<int, double, std::string>& t) {{ return std::get<0>(t) * 2 + (long)std::get<1>(t); }});
+    typename Nest<std::shared_ptr<std::function<long(long)>>, {i % 4 + 1}>::type nested;
+    (void)nested;
+    return v.empty() ? Fib<{20 + i % 10}>::value : v.back();
+}}
+""")
+    parts.append("int main() { long s = 0;\n")
+    parts.extend(f"    s += work{i}({i + 3});\n" for i in range(scale))
+    parts.append("    return (int)(s & 1); }\n")
+    with open(path, 'w') as f:
+        f.write(''.join(parts))
+
+def time_compile(cmd, cwd=None, env=None):
+    """컴파일 명령 1회 실행 - wall/user/sys 시간과 최대 RSS (하위 cc1* 포함)"""
+    # stderr 는 임시 파일로 - 파이프는 진단 출력이 파이프 버퍼(~64KB)를 넘으면 wait4 와 교착됨
+    with tempfile.TemporaryFile() as stderr_file:
+        started = time.perf_counter()
+        process = subprocess.Popen(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        _, status, usage = os.wait4(process.pid, 0)
+        wall = time.perf_counter() - started
+        process.returncode = os.waitstatus_to_exitcode(status) if hasattr(os, 'waitstatus_to_exitcode') else status >> 8
+        stderr_file.seek(0)
+        stderr = stderr_file.read().decode('utf-8', 'replace')
+    if process.returncode != 0:
+        print(f"[BENCH] Command failed: {' '.join(cmd)}\n{stderr[-2000:]}")
+    return {
+        'wall': wall,
+        'user': usage.ru_utime,
+        'sys': usage.ru_stime,
+        'peak_rss': usage.ru_maxrss * 1024,
+        'returncode': process.returncode,
+    }
+
+def compare_compile_throughput(baseline_root, candidate_root, runs=3, scale=40, opt='-O2'):
+    """두 설치 트리의 g++ 로 같은 C++ 번역 단위를 컴파일해 처리량 비교"""
+    results = {}
+    with tempfile.TemporaryDirectory(prefix='gcc-throughput-') as tmp:
+        source = os.path.join(tmp, 'workload.cc')
+        _generate_cxx_workload(source, scale)
+        for label, root in (('baseline', baseline_root), ('candidate', candidate_root)):
+            gxx = os.path.join(root, 'bin', 'g++')
+            cmd = [gxx, '-std=c++17', opt, '-c', source, '-o', os.path.join(tmp, f'{label}.o')]
+            time_compile(cmd)  # 페이지 캐시 워밍업
+            samples = [time_compile(cmd) for _ in range(runs)]
+            if any(sample['returncode'] != 0 for sample in samples):
+                results[label] = None
+                continue
+            cpu = sorted(sample['user'] + sample['sys'] for sample in samples)[len(samples) // 2]
+            wall = sorted(sample['wall'] for sample in samples)[len(samples) // 2]
+            results[label] = {'root': root, 'cpu_seconds': round(cpu, 3), 'wall_seconds': round(wall, 3)}
+            print(f"[BENCH] {label:<9} {gxx}: {cpu:.2f}s cpu, {wall:.2f}s wall (median of {runs})")
+
+    if results.get('baseline') and results.get('candidate'):
+        speedup = results['baseline']['cpu_seconds'] / results['candidate']['cpu_seconds']
+        results['speedup'] = round(speedup, 3)
+        print(f"[BENCH] Candidate compiles {(speedup - 1) * 100:+.1f}% faster than baseline")
+    return results
+
+def compare_compilers(argv):
+    """두 gcc 설치 트리의 C++ 컴파일 처리량 비교 (예: full vs optimized 빌드)"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py compare-compilers',
+                                     description=compare_compilers.__doc__)
+    parser.add_argument('--baseline', required=True, help="baseline gcc install root")
+    parser.add_argument('--candidate', required=True, help="candidate gcc install root")
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--scale', type=int, default=40, help="workload size (template instantiations)")
+    parser.add_argument('--opt', default='-O2')
+    parser.add_argument('--json', dest='json_path', default=None, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    results = compare_compile_throughput(args.baseline, args.candidate, args.runs, args.scale, args.opt)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0 if results.get('candidate') else 1
+
+# 설치 후 컴파일러 벤치마크 (GCC_BENCHMARK=1 로 활성화)
+BENCH_OPT_LEVELS = os.environ.get('GCC_BENCH_OPT_LEVELS', '-O0,-O2,-O3').split(',')
+BENCH_RUNS = int(os.environ.get('GCC_BENCH_RUNS', '3'))
+BENCH_REGRESSION_THRESHOLD = float(os.environ.get('GCC_BENCH_REGRESSION', '0.10'))  # 10% 이상 느려지면 회귀
+
+def benchmark_enabled():
+    return current_build_config().getenv('GCC_BENCHMARK', '0') == '1'
+
+def _generate_c_workload(path, functions=400):
+    """최적화 패스 부담이 큰 대형 C 파일 생성"""
+    parts = ["#include <stdlib.h>\n#include <string.h>\n\n"
+             "struct node { int key; double value; struct node *next; };\n\n"]
+    for i in range(functions):
+        parts.append(f"""
+static double kernel{i}(const double *a, double *b, int n) {{
+    double acc = {i}.0;
+    for (int j = 0; j < n; ++j) {{
+        b[j] = a[j] * {i % 13 + 1}.5 + (j & {i % 7 + 1}) - acc * 0.001;
+        if (b[j] > 1e6) acc -= b[j] / (j + 1); else acc += b[j];
+        switch ((j + {i}) % 5) {{
+        case 0: acc *= 1.0001; break;
+        case 1: acc -= a[(j * 3) % n]; break;
+        case 2: b[j] = b[(j + 1) % n] + a[j]; break;
+        default: acc += (double)(j ^ {i});
+        }}
+    }}
+    return acc;
+}}
+
+struct node *list{i}(int n) {{
+    struct node *head = NULL;
+    for (int j = 0; j < n; ++j) {{
+        struct node *item = malloc(sizeof *item);
+        item->key = j * {i + 1};
+        item->value = kernel{i}((const double *)&item->key, &item->value, 1);
+        item->next = head;
+        head = item;
+    }}
+    return head;
+}}
+""")
+    parts.append("int main(int argc, char **argv) {\n    double a[64] = {0}, b[64];\n    double s = 0;\n")
+    parts.extend(f"    s += kernel{i}(a, b, 64 + argc); list{i}(argc);\n" for i in range(functions))
+    parts.append("    return (int)s & 1;\n}\n")
+    with open(path, 'w') as f:
+        f.write(''.join(parts))
+
+def _generate_fortran_workload(path, subroutines=120):
+    """모듈/배열 연산 위주의 Fortran 소스 생성"""
+    parts = ["module bench_kernels\n  implicit none\ncontains\n"]
+    for i in range(subroutines):
+        parts.append(f"""
+  subroutine kernel{i}(a, b, n)
+    integer, intent(in) :: n
+    real(8), intent(in) :: a(n, n)
+    real(8), intent(inout) :: b(n, n)
+    integer :: j, k
+    do k = 1, n
+      do j = 1, n
+        b(j, k) = b(j, k) + a(k, j) * {i % 11 + 1}.0d0 - sum(a(:, k)) / n
+      end do
+    end do
+    b = matmul(a, b) + transpose(b) * 0.5d0
+  end subroutine kernel{i}
+""")
+    parts.append("end module bench_kernels\n\nprogram bench\n  use bench_kernels\n  implicit none\n"
+                 "  real(8) :: a(32, 32), b(32, 32)\n  a = 1.0d0\n  b = 0.0d0\n")
+    parts.extend(f"  call kernel{i}(a, b, 32)\n" for i in range(subroutines))
+    parts.append("  print *, sum(b)\nend program bench\n")
+    with open(path, 'w') as f:
+        f.write(''.join(parts))
+
+def _generate_openmp_workload(path, loops=200):
+    """OpenMP 병렬 루프/리덕션/태스크가 섞인 C 소스 생성"""
+    parts = ["#include <omp.h>\n#include <stdio.h>\n\n"]
+    for i in range(loops):
+        parts.append(f"""
+double region{i}(double *v, int n) {{
+    double total = 0;
+    #pragma omp parallel for reduction(+:total) schedule(dynamic, 16)
+    for (int j = 0; j < n; ++j) {{
+        v[j] = v[j] * {i % 9 + 1}.25 + j;
+        total += v[j];
+    }}
+    #pragma omp parallel
+    #pragma omp single
+    for (int j = 0; j < 8; ++j) {{
+        #pragma omp task firstprivate(j)
+        v[j] += omp_get_thread_num() + {i};
+    }}
+    return total;
+}}
+""")
+    parts.append("int main(void) {\n    static double v[4096];\n    double s = 0;\n")
+    parts.extend(f"    s += region{i}(v, 4096);\n" for i in range(loops))
+    parts.append('    printf("%f\\n", s);\n    return 0;\n}\n')
+    with open(path, 'w') as f:
+        f.write(''.join(parts))
+
+def _generate_lto_workload(directory, units=8, scale=10):
+    """여러 C++ 번역 단위로 나눈 LTO 링크용 워크로드 생성 - 소스 경로 목록 반환"""
+    sources = []
+    for unit in range(units):
+        path = os.path.join(directory, f'lto_unit{unit}.cc')
+        _generate_cxx_workload(path, scale)
+        with open(path) as f:
+            content = f.read()
+        # 각 단위의 심볼을 구분하고 main 은 첫 단위에만 남김
+        content = re.sub(r'\b(work|Registry)(\d+)\b', rf'\g<1>{unit}_\2', content)
+        if unit:
+            content = content.replace('int main()', f'int unit{unit}_main()')
+        else:
+            content = ''.join(f'int unit{u}_main();\n' for u in range(1, units)) + content
+            content = content.replace('    return (int)(s & 1); }',
+                                      ''.join(f'    s += unit{u}_main();\n' for u in range(1, units)) +
+                                      '    return (int)(s & 1); }')
+        with open(path, 'w') as f:
+            f.write(content)
+        sources.append(path)
+    return sources
+
+def get_benchmark_corpus(workdir):
+    """벤치마크 코퍼스 생성 - {case: {'driver', 'steps'(opt -> 명령 인자 목록)}}"""
+    cxx_src = os.path.join(workdir, 'templates.cc')
+    c_src = os.path.join(workdir, 'large.c')
+    f_src = os.path.join(workdir, 'kernels.f90')
+    omp_src = os.path.join(workdir, 'openmp.c')
+    _generate_cxx_workload(cxx_src, 40)
+    _generate_c_workload(c_src)
+    _generate_fortran_workload(f_src)
+    _generate_openmp_workload(omp_src)
+    lto_srcs = _generate_lto_workload(workdir)
+
+    def out(name):
+        return os.path.join(workdir, name)
+
+    lto_objs = [src[:-3] + '.o' for src in lto_srcs]
+    return {
+        'cxx-templates': {'language': 'c++', 'driver': 'g++', 'steps': [
+            ['-std=c++17', '-c', cxx_src, '-o', out('templates.o')]]},
+        'c-large': {'language': 'c', 'driver': 'gcc', 'steps': [
+            ['-c', c_src, '-o', out('large.o')]]},
+        'fortran': {'language': 'fortran', 'driver': 'gfortran', 'steps': [
+            [f_src, '-o', out('kernels'), '-J', workdir]]},
+        'openmp': {'language': 'c', 'driver': 'gcc', 'steps': [
+            ['-fopenmp', omp_src, '-o', out('openmp')]]},
+        'lto-link': {'language': 'c++', 'driver': 'g++', 'steps': [
+            ['-std=c++17', '-flto', '-c', src, '-o', obj] for src, obj in zip(lto_srcs, lto_objs)
+        ] + [['-flto=auto', *lto_objs, '-o', out('lto_program')]]},
+    }
+
+def run_compiler_benchmark(install_root, opt_levels=None, runs=None, workdir=None):
+    """설치된 gcc 로 코퍼스를 컴파일해 케이스/최적화 레벨별 wall·user 시간과 최대 RSS 측정"""
+    opt_levels = opt_levels or BENCH_OPT_LEVELS
+    runs = runs or BENCH_RUNS
+    bin_dir = os.path.join(install_root, 'bin')
+    env = current_build_config().environ()
+    env['LD_LIBRARY_PATH'] = os.pathsep.join(
+        [os.path.join(install_root, 'lib64'), os.path.join(install_root, 'lib'), env.get('LD_LIBRARY_PATH', '')])
+
+    report = {'root': install_root, 'runs': runs, 'created': time.time(), 'cases': {}}
+    tmp = tempfile.mkdtemp(prefix='gcc-bench-', dir=workdir)
+    try:
+        corpus = get_benchmark_corpus(tmp)
+        for case, spec in corpus.items():
+            driver = os.path.join(bin_dir, spec['driver'])
+            case_results = report['cases'].setdefault(case, {'language': spec['language']})
+            if not os.path.exists(driver):
+                print(f"[BENCH] {case}: {driver} not found, skipping")
+                continue
+            for opt in opt_levels:
+                samples = []
+                for attempt in range(runs + 1):
+                    total = {'wall': 0.0, 'user': 0.0, 'peak_rss': 0, 'returncode': 0}
+                    for step in spec['steps']:
+                        sample = time_compile([driver, opt, *step], cwd=tmp, env=env)
+                        total['wall'] += sample['wall']
+                        total['user'] += sample['user']
+                        total['peak_rss'] = max(total['peak_rss'], sample['peak_rss'])
+                        if sample['returncode'] != 0:
+                            total['returncode'] = sample['returncode']
+                            break
+                    if total['returncode'] != 0:
+                        samples = None
+                        break
+                    if attempt:  # 첫 실행은 페이지 캐시 워밍업
+                        samples.append(total)
+                if not samples:
+                    case_results[opt] = None
+                    continue
+                mid = len(samples) // 2
+                case_results[opt] = {
+                    'wall': round(sorted(s['wall'] for s in samples)[mid], 3),
+                    'user': round(sorted(s['user'] for s in samples)[mid], 3),
+                    'peak_rss': max(s['peak_rss'] for s in samples),
+                }
+                result = case_results[opt]
+                print(f"[BENCH] {case:<14} {opt:<4} wall {result['wall']:7.2f}s  user {result['user']:7.2f}s  "
+                      f"rss {result['peak_rss'] / 1024 ** 2:7.1f} MB")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return report
+
+def compare_benchmarks(candidate, baseline, threshold=None):
+    """기준 결과 대비 user 시간/최대 RSS 가 threshold 이상 증가한 항목 목록"""
+    threshold = BENCH_REGRESSION_THRESHOLD if threshold is None else threshold
+    regressions = []
+    for case, results in candidate['cases'].items():
+        base_results = baseline['cases'].get(case, {})
+        for opt, result in results.items():
+            base = base_results.get(opt)
+            if opt == 'language' or not result or not base:
+                continue
+            for metric in ('user', 'peak_rss'):
+                if not base[metric]:
+                    continue
+                change = result[metric] / base[metric] - 1
+                if change > threshold:
+                    regressions.append({'case': case, 'opt': opt, 'metric': metric,
+                                        'baseline': base[metric], 'candidate': result[metric],
+                                        'change': round(change, 3)})
+    for item in regressions:
+        print(f"⚠️  Regression: {item['case']} {item['opt']} {item['metric']} "
+              f"{item['change'] * 100:+.1f}% ({item['baseline']} → {item['candidate']})")
+    if not regressions:
+        print(f"✅ No benchmark regressions above {threshold * 100:.0f}%")
+    return regressions
+
+def find_deployed_gcc_root(install_path, include_current=False):
+    """비교 기준이 될 배포된 gcc 경로 (GCC_BASELINE_ROOT 우선, 없으면 설치 경로 옆의 최신 버전)
+
+    include_current=True 면 install_path 에 이미 게시된 릴리스도 후보 (게시 전 스테이징 트리와 비교할 때).
+    """
+    baseline = current_build_config().getenv('GCC_BASELINE_ROOT')
+    if baseline:
+        return baseline
+    package_root, _, variant = split_install_path(install_path)
+    current = os.path.realpath(install_path)
+
+    def version_key(path):
+        version = os.path.relpath(path, package_root).split(os.sep)[0]
+        return [int(p) if p.isdigit() else 0 for p in re.split(r'[.\-]', version)]
+
+    candidates = [path for path in glob.glob(os.path.join(package_root, '*', variant))
+                  if (include_current or os.path.realpath(path) != current)
+                  and os.path.exists(os.path.join(path, 'bin', 'gcc'))]
+    return max(candidates, key=version_key) if candidates else None
+
+def benchmark_install(install_path, output_path, root=None):
+    """게시 전 벤치마크 실행, 배포된 gcc 와 비교해 결과를 JSON 으로 기록
+
+    root 는 측정할 트리 (스테이징 경로, 없으면 install_path) - 이 경우 install_path 에
+    현재 게시된 릴리스도 비교 대상이 됨.
+    """
+    root = root or install_path
+    print("\n[INFO] Benchmarking installed compiler...")
+    report = run_compiler_benchmark(root)
+    baseline_root = find_deployed_gcc_root(install_path, include_current=root != install_path)
+    if baseline_root:
+        print(f"\n[INFO] Benchmarking deployed compiler {baseline_root}...")
+        report['baseline'] = run_compiler_benchmark(baseline_root)
+        report['regressions'] = compare_benchmarks(report, report['baseline'])
+    else:
+        print("[BENCH] No deployed gcc found for comparison")
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[BENCH] Results written to {output_path}")
+    return report
+
+def benchmark_compilers(argv):
+    """설치된 gcc 의 컴파일 처리량 벤치마크 (언어/최적화 레벨별)"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py benchmark', description=benchmark_compilers.__doc__)
+    parser.add_argument('root', help="gcc install root to benchmark")
+    parser.add_argument('--baseline', default=None, help="gcc install root or JSON report to compare against")
+    parser.add_argument('--opt-levels', default=','.join(BENCH_OPT_LEVELS))
+    parser.add_argument('--runs', type=int, default=BENCH_RUNS)
+    parser.add_argument('--threshold', type=float, default=BENCH_REGRESSION_THRESHOLD)
+    parser.add_argument('--json', dest='json_path', default=None, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    opt_levels = args.opt_levels.split(',')
+    report = run_compiler_benchmark(args.root, opt_levels, args.runs)
+    if args.baseline:
+        if args.baseline.endswith('.json'):
+            with open(args.baseline) as f:
+                report['baseline'] = json.load(f)
+        else:
+            report['baseline'] = run_compiler_benchmark(args.baseline, opt_levels, args.runs)
+        report['regressions'] = compare_benchmarks(report, report['baseline'], args.threshold)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if report.get('regressions') else 0
+
+# 프로세스 시작 지연 벤치마크 - gcc 라이브러리를 LD_LIBRARY_PATH 에 넣었을 때와 비교
+EXEC_LATENCY_RUNS = int(os.environ.get('GCC_EXEC_LATENCY_RUNS', '200'))
+EXEC_LATENCY_CXX_SOURCE = """#include <string>
+int main() { std::string s("ok"); return s.size() == 2 ? 0 : 1; }
+"""
+
+def measure_exec_latency(cmd, env, runs):
+    """cmd 를 runs 번 실행한 시간(ms) 통계와 동적 링커의 라이브러리 탐색 횟수 (LD_DEBUG=libs 기준)"""
+    subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # 페이지 캐시 예열
+    times = []
+    failures = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append((time.perf_counter() - started) * 1000)
+        failures += result.returncode != 0
+    probe = subprocess.run(cmd, env=dict(env, LD_DEBUG='libs'), stdout=subprocess.DEVNULL,
+                           stderr=subprocess.PIPE, text=True, errors='replace')
+    times.sort()
+    return {
+        'median_ms': round(times[len(times) // 2], 3),
+        'mean_ms': round(sum(times) / len(times), 3),
+        'p90_ms': round(times[int(len(times) * 0.9)], 3),
+        'probes': probe.stderr.count('trying file='),
+        'failures': failures,
+    }
+
+def run_exec_latency_benchmark(gcc_root, commands=None, runs=None):
+    """명령별로 LD_LIBRARY_PATH 에 gcc 라이브러리를 넣은 경우(기존 package.py)와 뺀 경우(RUNPATH)의 시작 지연 비교"""
+    runs = runs or EXEC_LATENCY_RUNS
+    base_env = current_build_config().environ()
+    base_env.pop('LD_LIBRARY_PATH', None)
+    ld_env = dict(base_env, LD_LIBRARY_PATH=os.pathsep.join(
+        os.path.join(gcc_root, d) for d in RUNPATH_LIB_DIRS))
+
+    with tempfile.TemporaryDirectory(prefix='gcc-exec-latency-') as tmp:
+        if commands is None:
+            commands = [['/bin/true'], [sys.executable, '-c', 'pass']]
+            # 이 gcc 로 링크한 C++ 프로그램 - RUNPATH 설치면 LD_LIBRARY_PATH 없이도 이 gcc 의 libstdc++ 사용
+            gxx = os.path.join(gcc_root, 'bin', 'g++')
+            if os.path.exists(gxx):
+                source = os.path.join(tmp, 'hello.cc')
+                with open(source, 'w') as f:
+                    f.write(EXEC_LATENCY_CXX_SOURCE)
+                binary = os.path.join(tmp, 'hello')
+                result = subprocess.run([gxx, '-O2', source, '-o', binary], env=ld_env, capture_output=True, text=True)
+                if result.returncode == 0:
+                    commands.append([binary])
+                else:
+                    print(f"[WARNING] Could not build C++ latency probe: {result.stderr.strip()[-200:]}")
+
+        results = []
+        for cmd in commands:
+            label = ' '.join(os.path.basename(arg) if i == 0 else arg for i, arg in enumerate(cmd))
+            entry = {'command': label,
+                     'runpath': measure_exec_latency(cmd, base_env, runs),
+                     'ld_library_path': measure_exec_latency(cmd, ld_env, runs)}
+            entry['change'] = round(entry['ld_library_path']['median_ms'] / entry['runpath']['median_ms'] - 1, 4)
+            results.append(entry)
+
+    print(f"\n[EXEC LATENCY] {gcc_root} ({runs} runs, median ms)")
+    print(f"  {'command':<32} {'no LD_LIBRARY_PATH':>20} {'LD_LIBRARY_PATH':>18} {'change':>8}")
+    for entry in results:
+        fresh, legacy = entry['runpath'], entry['ld_library_path']
+        print(f"  {entry['command'][:32]:<32} {fresh['median_ms']:>10.3f} ({fresh['probes']:>3} probes) "
+              f"{legacy['median_ms']:>8.3f} ({legacy['probes']:>3} probes) {entry['change'] * 100:>+7.1f}%"
+              + ("  ⚠️ failed without LD_LIBRARY_PATH" if fresh['failures'] else ""))
+    return {'gcc_root': gcc_root, 'runs': runs, 'results': results}
+
+def exec_latency(argv):
+    """LD_LIBRARY_PATH 유무에 따른 프로세스 시작 지연 비교 (RUNPATH 설치 효과 측정)"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py exec-latency', description=exec_latency.__doc__)
+    parser.add_argument('root', help="gcc install root whose lib64/lib would go on LD_LIBRARY_PATH")
+    parser.add_argument('--runs', type=int, default=EXEC_LATENCY_RUNS)
+    parser.add_argument('--json', dest='json_path', default=None, help="write results as JSON")
+    parser.epilog = "a command after -- is measured instead of the defaults, e.g. -- mayapy -c pass"
+    command = None
+    if '--' in argv:
+        command = argv[argv.index('--') + 1:] or None
+        argv = argv[:argv.index('--')]
+    args = parser.parse_args(argv)
+
+    report = run_exec_latency_benchmark(args.root, [command] if command else None, args.runs)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 1 if any(entry['runpath']['failures'] for entry in report['results']) else 0
+
+# 링크 시간 벤치마크 - 같은 오브젝트 파일들을 링커별로 링크해 비교 (-fuse-ld)
+LINK_BENCH_LINKERS = os.environ.get('GCC_LINK_BENCH_LINKERS', 'bfd,gold').split(',')
+LINK_BENCH_UNITS = int(os.environ.get('GCC_LINK_BENCH_UNITS', '48'))
+LINK_BENCH_RUNS = int(os.environ.get('GCC_LINK_BENCH_RUNS', '5'))
+
+LINK_BENCH_HEADER = """#pragma once
+#include <algorithm>
+#include <functional>
+#include <map>
+#include <memory>
+#include <sstream>
+#include <string>
+#include <tuple>
+#include <vector>
+
+template <typename K, typename V>
+struct Registry {
+    std::map<K, std::vector<V>> items;
+    void add(const K& k, V v) { items[k].push_back(std::move(v)); }
+    template <typename F> auto transform(F f) const {
+        std::vector<decltype(f(std::declval<V>()))> out;
+        for (auto& kv : items) std::transform(kv.second.begin(), kv.second.end(), std::back_inserter(out), f);
+        std::sort(out.begin(), out.end());
+        return out;
+    }
+};
+"""
+
+def _generate_link_workload(workdir, units, scale=8):
+    """번역 단위 units 개 생성 - 공통 헤더의 템플릿이 모든 단위에서 중복 인스턴스화되어 링커가 COMDAT 정리를 많이 함"""
+    with open(os.path.join(workdir, 'common.h'), 'w') as f:
+        f.write(LINK_BENCH_HEADER)
+    sources = []
+    for unit in range(units):
+        parts = ['#include "common.h"\n\n', f'namespace unit{unit} {{\n']
+        for i in range(scale):
+            parts.append(f"""
+struct Item{i} {{ int id; double weight; std::string tag; bool operator<(const Item{i}& o) const {{ return id < o.id; }} }};
+
+long work{i}(int n) {{
+    Registry<std::string, std::tuple<int, double, std::string>> reg;
+    Registry<int, Item{i}> items;
+    for (int j = 0; j < n; ++j) {{
+        std::ostringstream key; key << "k" << (j % 7);
+        reg.add(key.str(), std::make_tuple(j, j * 0.5, key.str()));
+        items.add(j % 3, Item{i}{{j, j * 1.5, key.str()}});
+    }}
+    auto v = reg.transform([](const std::tuple<int, double, std::string>& t) {{ return std::get<0>(t) * 2 + (long)std::get<1>(t); }});
+    auto w = items.transform([](const Item{i}& item) {{ return std::make_shared<std::function<long()>>([item] {{ return (long)item.id; }}); }});
+    return (v.empty() ? {i} : v.back()) + (long)w.size();
+}}
+""")
+        parts.append(f"}}  // namespace unit{unit}\n\nlong unit_entry{unit}(int n) {{\n    long s = 0;\n")
+        parts.extend(f"    s += unit{unit}::work{i}(n + {i});\n" for i in range(scale))
+        parts.append("    return s;\n}\n")
+        path = os.path.join(workdir, f'unit{unit}.cc')
+        with open(path, 'w') as f:
+            f.write(''.join(parts))
+        sources.append(path)
+
+    main = os.path.join(workdir, 'main.cc')
+    with open(main, 'w') as f:
+        f.write(''.join(f"long unit_entry{unit}(int n);\n" for unit in range(units)))
+        f.write("int main() {\n    long s = 0;\n")
+        f.write(''.join(f"    s += unit_entry{unit}({unit % 5 + 1});\n" for unit in range(units)))
+        f.write("    return s > 0 ? 0 : 1;\n}\n")
+    return sources + [main]
+
+def detect_linker(path):
+    """링크 결과물의 식별 섹션으로 실제 사용된 링커 추정 (식별 섹션이 없으면 bfd)"""
+    sections = subprocess.run(['readelf', '-S', '--wide', path], capture_output=True, text=True).stdout
+    return next((linker for linker, note in LINKER_NOTE_SECTIONS.items() if note in sections), 'bfd')
+
+def _gcc_env(gcc_root):
+    env = current_build_config().environ()
+    env['PATH'] = os.pathsep.join([os.path.join(gcc_root, 'bin'), env.get('PATH', '')])
+    env['LD_LIBRARY_PATH'] = os.pathsep.join(
+        [os.path.join(gcc_root, 'lib64'), os.path.join(gcc_root, 'lib'), env.get('LD_LIBRARY_PATH', '')])
+    return env
 
-    if "install" in targets:
-        install_path = f"/core/Linux/APPZ/packages/gcc/{version}/platform_linux"
+def run_link_benchmark(gcc_root=None, linkers=None, units=None, runs=None, lto=False, debug=True, workdir=None):
+    """같은 오브젝트 파일 집합을 링커별로 runs 번 링크해 wall/CPU 시간과 최대 RSS 중앙값 비교
+
+    linkers 항목은 'gold' (gcc_root 의 g++ 에 -fuse-ld=gold) 또는 'gold=ROOT' (ROOT 의 g++ 기본 링커).
+    --with-ld 로 빌드한 gcc 는 -fuse-ld=bfd 를 무시하므로 링커 변형끼리는 ROOT 형식으로 비교.
+    """
+    linkers = linkers or LINK_BENCH_LINKERS
+    units = units or LINK_BENCH_UNITS
+    runs = runs or LINK_BENCH_RUNS
+    env = _gcc_env(gcc_root) if gcc_root else os.environ.copy()
+    gxx = os.path.join(gcc_root, 'bin', 'g++') if gcc_root else shutil.which('g++')
+    flags = ['-std=c++17', '-O2'] + (['-g'] if debug else []) + (['-flto'] if lto else [])
+
+    report = {'gxx': gxx, 'units': units, 'runs': runs, 'lto': lto, 'debug': debug, 'linkers': {}}
+    with tempfile.TemporaryDirectory(prefix='gcc-link-bench-', dir=workdir) as tmp:
+        sources = _generate_link_workload(tmp, units)
+        print(f"[LINK BENCH] Compiling {len(sources)} translation units with {gxx} {' '.join(flags)}...")
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+            compiled = list(pool.map(lambda src: subprocess.run([gxx] + flags + ['-c', src, '-o', src[:-3] + '.o'],
+                                                                 cwd=tmp, env=env, capture_output=True, text=True),
+                                     sources))
+        failed = [result for result in compiled if result.returncode != 0]
+        if failed:
+            raise BuildError(f"Link benchmark workload failed to compile: {failed[0].stderr.strip()[-500:]}",
+                             error_type='benchmark_failed')
+        objects = [src[:-3] + '.o' for src in sources]
+        report['object_bytes'] = sum(os.path.getsize(obj) for obj in objects)
+
+        for spec in linkers:
+            linker, _, root = spec.partition('=')
+            if root:
+                link_env = _gcc_env(root)
+                cmd = [os.path.join(root, 'bin', 'g++')] + flags
+            else:
+                link_env = env
+                cmd = [gxx] + flags + [f'-fuse-ld={linker}']
+            output = os.path.join(tmp, f'app-{linker}')
+            cmd += objects + ['-o', output]
+            if time_compile(cmd, cwd=tmp, env=link_env)['returncode'] != 0:  # 페이지 캐시 워밍업 + 지원 여부 확인
+                report['linkers'][linker] = None
+                continue
+            if detect_linker(output) != linker:
+                report['linkers'][linker] = None
+                print(f"[LINK BENCH] {linker}: output was linked by {detect_linker(output)} ({' '.join(cmd[:2])})")
+                continue
+            samples = [time_compile(cmd, cwd=tmp, env=link_env) for _ in range(runs)]
+            if subprocess.run([output], env=link_env).returncode != 0:
+                report['linkers'][linker] = None
+                print(f"[LINK BENCH] {linker}: linked program does not run")
+                continue
+            median = lambda values: sorted(values)[len(values) // 2]
+            report['linkers'][linker] = {
+                'wall_seconds': round(median([sample['wall'] for sample in samples]), 3),
+                'cpu_seconds': round(median([sample['user'] + sample['sys'] for sample in samples]), 3),
+                'peak_rss': median([sample['peak_rss'] for sample in samples]),
+                'output_bytes': os.path.getsize(output),
+                'root': root or gcc_root,
+            }
+
+    print(f"\n[LINK BENCH] {units} units, {report['object_bytes'] / 1024 ** 2:.1f} MB objects"
+          f"{', LTO' if lto else ''}{', -g' if debug else ''} (median of {runs})")
+    names = [spec.partition('=')[0] for spec in linkers]
+    base = report['linkers'].get(names[0])
+    for linker in names:
+        result = report['linkers'][linker]
+        if not result:
+            print(f"  {linker:<6} unavailable or failed")
+            continue
+        speedup = f"{base['wall_seconds'] / result['wall_seconds']:.2f}x vs {names[0]}" if base else ''
+        print(f"  {linker:<6} {result['wall_seconds']:>7.3f}s wall {result['cpu_seconds']:>7.3f}s cpu "
+              f"{result['peak_rss'] / 1024 ** 2:>7.1f} MB rss  {speedup}")
+    return report
+
+def link_benchmark(argv):
+    """링커별 (-fuse-ld=bfd/gold) 대형 C++ 프로그램 링크 시간 비교"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py link-bench', description=link_benchmark.__doc__)
+    parser.add_argument('--root', help="gcc install root (default: g++ on PATH)")
+    parser.add_argument('--linkers', default=','.join(LINK_BENCH_LINKERS),
+                        help="comma separated NAME or NAME=ROOT (ROOT's default linker), first is the baseline")
+    parser.add_argument('--units', type=int, default=LINK_BENCH_UNITS, help="translation units to link")
+    parser.add_argument('--runs', type=int, default=LINK_BENCH_RUNS)
+    parser.add_argument('--lto', action='store_true', help="compile and link with -flto (uses the linker plugin)")
+    parser.add_argument('--no-debug', dest='debug', action='store_false', help="compile without -g")
+    parser.add_argument('--json', dest='json_path', default=None, help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_link_benchmark(args.root, args.linkers.split(','), args.units, args.runs, args.lto, args.debug)
+    except BuildError as e:
+        print(f"❌ {e}")
+        return 2
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0 if all(report['linkers'].values()) else 1
+
+def summarize_trace(path):
+    """Chrome trace 파일에서 (분류, 이름) 별 총 소요 시간(초)"""
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+    totals = {}
+    for event in events:
+        if event.get('ph') == 'X' and event.get('cat') in ('phase', 'make'):
+            key = (event['cat'], event['name'])
+            totals[key] = totals.get(key, 0) + event['dur'] / 1e6
+    return totals
+
+def trace_diff(argv):
+    """두 빌드 타임라인(build_trace.json)의 단계/모듈별 소요 시간 비교"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py trace-diff', description=trace_diff.__doc__)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--top', type=int, default=30, help="show the N largest changes")
+    args = parser.parse_args(argv)
+
+    before = summarize_trace(args.before)
+    after = summarize_trace(args.after)
+    rows = [(key, before.get(key, 0), after.get(key, 0)) for key in set(before) | set(after)]
+    rows.sort(key=lambda row: abs(row[2] - row[1]), reverse=True)
+    print(f"{'kind':<6} {'name':<44} {'before':>10} {'after':>10} {'delta':>10}")
+    for (cat, name), old, new in rows[:args.top]:
+        print(f"{cat:<6} {name[:44]:<44} {old:>9.1f}s {new:>9.1f}s {new - old:>+9.1f}s")
+    return 0
+
+def telemetry_report(argv):
+    """컴파일러 자원 사용량 기록(compiler_telemetry.tsv)에서 가장 무거운 번역 단위 출력"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py telemetry', description=telemetry_report.__doc__)
+    parser.add_argument('table', help="path to logs/compiler_telemetry.tsv")
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--sort', choices=('rss', 'cpu', 'wall'), default='rss')
+    parser.add_argument('--phase', default=None, help="only show this build phase")
+    args = parser.parse_args(argv)
+
+    rows = load_telemetry(args.table)
+    if args.phase:
+        rows = [row for row in rows if row['phase'] == args.phase]
+    sort_key = {'rss': 'peak_rss_kb', 'cpu': 'cpu_s', 'wall': 'wall_s'}[args.sort]
+    print_telemetry_report(rows, args.top, sort_key)
+    job_memory = telemetry_job_memory(args.table)
+    if job_memory:
+        print(f"\n{len(rows)} invocations, p90 peak RSS {job_memory / 1024 ** 2:.0f} MB")
+    return 0
+
+# 빌드 실패 로그 분석 (mmap + 오프셋 인덱스)
+# 'rror:' 하나로 error:/Error:/collect2: error: 를 모두 찾음
+TRIAGE_NEEDLES = (b'rror:', b'*** ', b'ing directory ')
+TRIAGE_ERROR_RE = re.compile(rb'(?:^|[\s:])(?:fatal )?[eE]rror:')
+TRIAGE_MAKE_ERROR_RE = re.compile(rb'make(?:\[\d+\])?: \*\*\* .*Error \d+')
+TRIAGE_DIRECTORY_RE = re.compile(rb"make(?:\[(\d+)\])?: (Entering|Leaving) directory [`'](.*)'")
+TRIAGE_INDEX_VERSION = 2
+
+def classify_log_line(line):
+    """로그 한 줄(bytes)이 인덱스 대상이면 (kind, make level, directory) 반환"""
+    if b'ing directory ' in line:
+        match = TRIAGE_DIRECTORY_RE.search(line)
+        if match:
+            return ('enter' if match.group(2) == b'Entering' else 'leave',
+                    int(match.group(1) or 0), match.group(3).decode(errors='replace'))
+    if b'*** ' in line and TRIAGE_MAKE_ERROR_RE.search(line):
+        return None if b'(ignored)' in line else ('make_error', 0, '')
+    if b'rror:' in line and TRIAGE_ERROR_RE.search(line):
+        return ('error', 0, '')
+    return None
+
+def _line_bounds(data, offset):
+    start = data.rfind(b'\n', 0, offset) + 1
+    end = data.find(b'\n', offset)
+    return start, len(data) if end < 0 else end
+
+def index_build_log(data):
+    """mmap 된 로그 전체에서 인덱스 생성 - ([(offset, kind, level, line_no, dir)], 전체 줄 수)"""
+    events = {}
+    for needle in TRIAGE_NEEDLES:
+        pos = data.find(needle)
+        while pos >= 0:
+            start, end = _line_bounds(data, pos)
+            if start not in events:
+                event = classify_log_line(data[start:end])
+                if event:
+                    events[start] = event
+            pos = data.find(needle, end)
+
+    # 줄 번호는 이벤트 사이 구간의 개행 수를 더해 한 번의 순회로 계산
+    indexed = []
+    line_no = 1
+    previous = 0
+    for offset in sorted(events):
+        line_no += data[previous:offset].count(b'\n')
+        previous = offset
+        kind, level, directory = events[offset]
+        indexed.append((offset, kind, level, line_no, directory))
+    total_lines = line_no - 1 + data[previous:].count(b'\n')
+    return indexed, total_lines
+
+def _index_signature(log_path, total_lines):
+    st = os.stat(log_path)
+    return f"#rezbuild-log-index {TRIAGE_INDEX_VERSION} {st.st_size} {st.st_mtime_ns} {total_lines}\n"
+
+def read_log_index(log_path):
+    """로그와 맞는 사이드카 인덱스(<log>.idx)를 읽음 - (events, 전체 줄 수) 또는 None
+
+    압축 로그는 원본(.gz/.zst) 경로 기준 - 풀어 둔 임시 파일이 아니라 원본 옆에 인덱스를 둠.
+    """
+    try:
+        with open(f"{log_path}.idx") as f:
+            header = f.readline()
+            total_lines = int(header.split()[-1])
+            if header != _index_signature(log_path, total_lines):
+                return None
+            events = []
+            for line in f:
+                offset, kind, level, line_no, directory = line.rstrip('\n').split('\t', 4)
+                events.append((int(offset), kind, int(level), int(line_no), directory))
+            return events, total_lines
+    except (OSError, ValueError, IndexError):
+        return None
+
+def write_log_index(log_path, events, total_lines):
+    index_path = f"{log_path}.idx"
+    tmp = f"{index_path}.{os.getpid()}"
+    try:
+        with open(tmp, 'w') as f:
+            f.write(_index_signature(log_path, total_lines))
+            for event in events:
+                f.write('\t'.join(str(value) for value in event) + '\n')
+        os.replace(tmp, index_path)
+    except OSError as e:
+        print(f"[TRIAGE] Could not write index {index_path}: {e}")
+
+class LogIndexBuilder:
+    """로그를 쓰는 동안 인덱스를 함께 만들어 triage 가 로그를 다시 읽지 않게 함 (평문 로그만)"""
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.offset = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        self.events = []
+        self.lines = 0
+        self.valid = True
+        if self.offset:
+            # 같은 로그에 이어 쓰는 경우 기존 인덱스가 맞아야 이어서 기록 가능
+            existing = read_log_index(log_path)
+            if existing is None:
+                self.valid = False
+            else:
+                self.events, self.lines = existing
+
+    def feed(self, line):
+        if not self.valid:
+            return
+        data = line.encode('utf-8', 'replace')
+        self.lines += 1
+        if b'rror:' in data or b'*** ' in data or b'ing directory ' in data:
+            event = classify_log_line(data)
+            if event:
+                kind, level, directory = event
+                self.events.append((self.offset, kind, level, self.lines, directory))
+        self.offset += len(data)
+
+    def close(self):
+        """로그 파일이 닫힌 뒤 호출 - 크기가 예상과 다르면 인덱스를 남기지 않음"""
+        if self.valid and os.path.exists(self.log_path) and os.path.getsize(self.log_path) == self.offset:
+            write_log_index(self.log_path, self.events, self.lines)
+
+def load_log_index(log_path, data):
+    """사이드카 인덱스가 로그와 맞으면 재사용, 아니면 새로 만들어 저장 - (events, 재사용 여부)
+
+    data 는 로그의 (압축을 푼) 내용, log_path 는 인덱스를 둘 원본 로그 경로.
+    """
+    existing = read_log_index(log_path)
+    if existing is not None:
+        # 빌드 중 만든 인덱스는 오프셋이 실제 줄을 가리키는지 표본으로 확인
+        sample = next((event for event in existing[0] if event[1] != 'enter'), None)
+        if sample is None or (classify_log_line(data[slice(*_line_bounds(data, sample[0]))]) or ('',))[0] == sample[1]:
+            return existing[0], True
+    events, total_lines = index_build_log(data)
+    write_log_index(log_path, events, total_lines)
+    return events, False
+
+def _decompressed_log(path):
+    """압축된 로그는 임시 파일로 풀어서 경로 반환 (mmap 은 평문 파일만 가능)"""
+    if path.endswith('.gz'):
+        import gzip
+        opener = gzip.open
+    elif path.endswith('.zst'):
+        import zstandard
+        opener = lambda p, mode: zstandard.ZstdDecompressor().stream_reader(open(p, 'rb'))
+    else:
+        return path
+    fd, tmp = tempfile.mkstemp(prefix='rezbuild-triage-', suffix='.log')
+    with opener(path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 16 * 1024 * 1024)
+    return tmp
+
+def triage_build_log(log_path, before=12, after=6, original_path=None):
+    """첫 번째 원인 에러와 그 시점의 make 디렉토리 스택, 주변 로그를 담은 결과 반환
+
+    original_path 는 log_path 가 압축 로그를 풀어 둔 임시 파일일 때의 원본 경로 (인덱스 위치).
+    """
+    original_path = original_path or log_path
+    with open(log_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return {'log': original_path, 'cached_index': False, 'cause': None, 'errors': 0, 'make_errors': 0}
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            events, cached = load_log_index(original_path, data)
+            errors = [event for event in events if event[1] == 'error']
+            make_errors = [event for event in events if event[1] == 'make_error']
+            # 첫 make 실패 전에 나온 컴파일러/링커 에러가 원인 - 없으면 make 실패 자체
+            first_fail = make_errors[0][0] if make_errors else None
+            causes = [event for event in errors if first_fail is None or event[0] < first_fail]
+            cause = (causes or errors or make_errors or [None])[0]
+            if cause is None:
+                return {'log': original_path, 'cached_index': cached, 'cause': None,
+                        'errors': 0, 'make_errors': 0}
+
+            # 원인 시점까지 디렉토리 이동을 재생해 make 스택 복원
+            stack = []
+            for offset, kind, level, _, directory in events:
+                if offset >= cause[0]:
+                    break
+                if kind == 'enter':
+                    stack.append((level, directory))
+                elif kind == 'leave':
+                    for i in range(len(stack) - 1, -1, -1):
+                        if stack[i] == (level, directory):
+                            del stack[i]
+                            break
+
+            start, end = _line_bounds(data, cause[0])
+            context_start = start
+            for _ in range(before):
+                if context_start == 0:
+                    break
+                context_start = data.rfind(b'\n', 0, context_start - 1) + 1
+            context_end = end
+            for _ in range(after):
+                next_end = data.find(b'\n', context_end + 1)
+                if next_end < 0:
+                    context_end = len(data)
+                    break
+                context_end = next_end
+            return {
+                'log': original_path,
+                'cached_index': cached,
+                'offset': cause[0],
+                'line_no': cause[3],
+                'cause': data[start:end].decode(errors='replace'),
+                'directory_stack': [directory for _, directory in sorted(set(stack))],
+                'context': data[context_start:context_end].decode(errors='replace'),
+                'errors': len(errors),
+                'make_errors': len(make_errors),
+            }
+
+def triage(argv):
+    """빌드 로그에서 첫 번째 원인 에러를 찾아 make 디렉토리 스택과 주변 로그 출력"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py triage', description=triage.__doc__)
+    parser.add_argument('log', help="build log (plain, .gz or .zst)")
+    parser.add_argument('-B', '--before', type=int, default=12, help="context lines before the error")
+    parser.add_argument('-A', '--after', type=int, default=6, help="context lines after the error")
+    parser.add_argument('--json', action='store_true', help="print the result as JSON")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    log_path = _decompressed_log(args.log)
+    try:
+        result = triage_build_log(log_path, args.before, args.after, original_path=args.log)
+    finally:
+        if log_path != args.log:
+            os.unlink(log_path)
+    elapsed = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0 if result['cause'] is None else 1
+    if result['cause'] is None:
+        print(f"✅ No errors found in {args.log} ({elapsed:.2f}s)")
+        return 0
+    print(f"❌ First failure in {args.log} (line {result['line_no']}, offset {result['offset']}):")
+    print(f"   {result['cause'].strip()}")
+    if result['directory_stack']:
+        print("\n[TRIAGE] make directory stack:")
+        for directory in result['directory_stack']:
+            print(f"   {directory}")
+    print("\n[TRIAGE] Context:")
+    for line in result['context'].splitlines():
+        print(f"   {line}")
+    print(f"\n[TRIAGE] {result['errors']} error lines, {result['make_errors']} make failures "
+          f"({'cached index' if result['cached_index'] else 'index built'}, {elapsed:.2f}s)")
+    return 1
+
+# 여러 버전/모드를 한 번에 빌드하는 매트릭스 설정
+MATRIX_MEMORY_FRACTION = float(os.environ.get('GCC_MATRIX_MEMORY_FRACTION', '0.9'))  # 빌드들에 나눠 줄 메모리 비율
+
+def parse_matrix_entry(entry):
+    """'VERSION[:MODE[:PACKAGE[:LINKER]]]' 문자열 또는 dict 를 매트릭스 항목 dict 로 변환"""
+    if isinstance(entry, str):
+        parts = entry.split(':')
+        entry = {'version': parts[0]}
+        if len(parts) > 1 and parts[1]:
+            entry['mode'] = parts[1]
+        if len(parts) > 2 and parts[2]:
+            entry['package'] = parts[2]
+        if len(parts) > 3 and parts[3]:
+            entry['linker'] = parts[3]
+    if not entry.get('version'):
+        raise BuildError(f"Matrix entry without version: {entry}", error_type='configure_failed')
+    entry.setdefault('mode', 'full')
+    if entry['mode'] not in BUILD_MODES:
+        raise BuildError(f"Unknown build mode '{entry['mode']}' in matrix entry {entry['version']}",
+                         error_type='configure_failed')
+    entry.setdefault('linker', 'bfd')
+    if entry['linker'] not in LINKERS:
+        raise BuildError(f"Unknown linker '{entry['linker']}' in matrix entry {entry['version']}",
+                         error_type='configure_failed')
+    return entry
+
+def plan_build_matrix(entries, source_path, build_root, install=False, max_parallel=None, total_jobs=None,
+                      total_memory=None):
+    """매트릭스 항목별 BuildConfig 생성 - 동시에 도는 빌드끼리 코어와 메모리를 나눠 가짐"""
+    entries = [parse_matrix_entry(entry) for entry in entries]
+    parallel = max(1, min(len(entries), max_parallel or len(entries)))
+    total_jobs = total_jobs or os.cpu_count() or 1
+    if total_memory is None and os.path.exists('/proc/meminfo'):
+        total_memory = int(read_meminfo().get('MemTotal', 0) * MATRIX_MEMORY_FRACTION)
+
+    configs = []
+    for entry in entries:
+        config = BuildConfig(
+            source_path=source_path,
+            install_path=entry.get('install_path') or default_install_path(entry['version'], entry['linker']),
+            version=entry['version'],
+            mode=entry['mode'],
+            linker=entry['linker'],
+            jobs=entry.get('jobs') or max(1, total_jobs // parallel),
+            memory_budget=total_memory // parallel if total_memory else None,
+            package_file=entry.get('package', 'package.py'),
+            env=entry.get('env'),
+        )
+        config.build_path = os.path.join(build_root, config.name)
+        configs.append(config)
+
+    names = [config.name for config in configs]
+    if len(set(names)) != len(names):
+        raise BuildError(f"Duplicate matrix entries: {', '.join(sorted(n for n in names if names.count(n) > 1))}",
+                         error_type='configure_failed')
+    if install:
+        paths = [config.install_path for config in configs]
+        clashes = sorted({path for path in paths if paths.count(path) > 1})
+        if clashes:
+            raise BuildError(f"Matrix entries would install into the same path: {', '.join(clashes)} "
+                             "(set install_path per entry)", error_type='configure_failed')
+    return configs, parallel
+
+def build_matrix(configs, targets, parallel):
+    """여러 BuildConfig 를 동시에 빌드하고 항목별 결과 반환 - 소스는 버전마다 한 번만 준비해 공유"""
+    # 같은 버전은 같은 ./source/gcc-<버전> 트리를 공유하므로 빌드 전에 순서대로 준비
+    prepared = set()
+    for config in configs:
+        if (config.source_path, config.version) not in prepared:
+            with use_build_config(config):
+                ensure_gcc_source(config.source_path, config.version)
+            prepared.add((config.source_path, config.version))
+
+    def run(config):
+        started = time.time()
+        print(f"[MATRIX] {config.name}: -j{config.jobs}"
+              + (f", {config.memory_budget / 1024 ** 3:.1f} GB" if config.memory_budget else "")
+              + f" → {config.build_path}")
+        try:
+            build(config.source_path, config.build_path, config.install_path, targets, config=config)
+            result = {'name': config.name, 'ok': True}
+        except Exception as e:
+            result = {'name': config.name, 'ok': False, 'error': str(e)}
+        result['seconds'] = round(time.time() - started, 1)
+        print(f"[MATRIX] {config.name}: {'done' if result['ok'] else 'FAILED'} in {result['seconds']:.0f}s")
+        return result
+
+    with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix='matrix') as pool:
+        return list(pool.map(run, configs))
+
+def matrix(argv):
+    """여러 GCC 버전/빌드 모드를 코어와 메모리를 나눠 동시에 빌드"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='rezbuild.py matrix', description=matrix.__doc__)
+    parser.add_argument('entries', nargs='*', help="VERSION[:MODE[:PACKAGE[:LINKER]]], "
+                                                   "e.g. 11.5.0:optimized 11.5.0:full:_package.py 11.5.0:full::gold")
+    parser.add_argument('--file', help="JSON list of entries (version, mode, package, linker, env, install_path, jobs)")
+    parser.add_argument('--source-path', default=os.environ.get('REZ_BUILD_SOURCE_PATH',
+                                                                os.path.dirname(os.path.abspath(__file__))))
+    parser.add_argument('--build-root', default=os.path.join(os.environ.get('REZ_BUILD_PATH', 'build'), 'matrix'))
+    parser.add_argument('--install', action='store_true', help="install each entry after building")
+    parser.add_argument('--parallel', type=int, help="builds to run at once (default: all entries)")
+    parser.add_argument('--jobs', type=int, help="total make jobs shared by the running builds (default: CPU count)")
+    parser.add_argument('--memory', type=_parse_size, help="total memory shared by the running builds, e.g. 96G")
+    args = parser.parse_args(argv)
+
+    entries = list(args.entries)
+    if args.file:
+        with open(args.file) as f:
+            entries.extend(json.load(f))
+    if not entries:
+        parser.error("no matrix entries given")
+
+    try:
+        configs, parallel = plan_build_matrix(entries, os.path.abspath(args.source_path),
+                                              os.path.abspath(args.build_root), args.install,
+                                              args.parallel, args.jobs, args.memory)
+    except BuildError as e:
+        print(f"❌ {e}")
+        return 2
+    started = time.time()
+    results = build_matrix(configs, ['install'] if args.install else [], parallel)
+
+    print(f"\n[MATRIX] {len(results)} builds in {time.time() - started:.0f}s ({parallel} at a time)")
+    for result in results:
+        status = '✅' if result['ok'] else '❌'
+        print(f"  {status} {result['name']:<24} {result['seconds']:>8.0f}s  {result.get('error', '')}")
+    return 0 if all(result['ok'] for result in results) else 1
+
+# rezbuild.py <command> ... 형태로 실행되는 보조 명령
+CLI_COMMANDS = {
+    'bench-classify': bench_classify,
+    'compare-compilers': compare_compilers,
+    'benchmark': benchmark_compilers,
+    'trace-diff': trace_diff,
+    'telemetry': telemetry_report,
+    'triage': triage,
+    'matrix': matrix,
+    'target-lib-worker': target_lib_worker,
+    'exec-latency': exec_latency,
+    'link-bench': link_benchmark,
+}
+
+def build(source_path, build_path, install_path, targets, config=None):
+    if config is None:
+        config = BuildConfig(source_path, build_path, install_path)
+        if "install" in targets:
+            config.install_path = default_install_path(config.version, config.linker)
+
+    with use_build_config(config):
+        # 빌드 타임라인 - 실패해도 남도록 단계마다 저장 (GCC_BUILD_TRACE=0 으로 비활성화)
+        trace = None
+        if current_build_config().getenv('GCC_BUILD_TRACE', '1') != '0':
+            trace = start_build_trace(os.path.join(config.build_path, "logs", "build_trace.json"))
+        try:
+            with trace_span('total'):
+                _build_and_install(config.source_path, config.build_path, config.install_path, targets, config.version)
+        finally:
+            if trace:
+                trace.save()
+                print(f"[TRACE] Build timeline written to {trace.path}")
+
+def _build_and_install(source_path, build_path, install_path, targets, version):
+    with trace_span('source'):
+        ensure_gcc_source(source_path, version)
+
+    cache_key = None
+    if "install" in (targets or []) and install_cache_enabled():
+        gcc_src_dir = find_gcc_src_dir(source_path, version)
+        patch_gmp(gcc_src_dir)
+        cache_key = get_install_cache_key(gcc_src_dir, install_path)
+        if restore_install_cache(cache_key, install_path):
+            copy_package_py(source_path, install_path)
+            verify_build(install_path)
+            return
 
     _build(source_path, build_path, install_path)
 
     if "install" in (targets or []):
         _install(build_path, install_path)
         copy_package_py(source_path, install_path)
+        if cache_key:
+            # smart_rebuild 가 빌드 모드 등을 바꿨을 수 있으므로 실제로 빌드된 설정으로 키를 다시 계산
+            store_install_cache(get_install_cache_key(find_gcc_src_dir(source_path, version), install_path),
+                                install_path)
+
+        # 최적화 빌드는 기준 컴파일러 대비 처리량 비교 결과를 남김
+        baseline_root = current_build_config().getenv('GCC_BASELINE_ROOT')
+        if get_build_mode() == 'optimized' and baseline_root:
+            results = compare_compile_throughput(baseline_root, install_path)
+            with open(os.path.join(build_path, "logs", "throughput_comparison.json"), 'w') as f:
+                json.dump(results, f, indent=2)
+
+        # 링커 변형은 같은 버전의 bfd 설치본(있으면)과 링크 시간 비교
+        linker = current_build_config().linker
+        if benchmark_enabled() and linker != 'bfd':
+            # --with-ld 로 빌드한 gcc 는 -fuse-ld=bfd 를 무시하므로 bfd 설치본이 없으면 비교하지 않음
+            bfd_root = os.path.join(split_install_path(install_path)[1], linker_variant_subpath('bfd'))
+            if os.path.exists(os.path.join(bfd_root, 'bin', 'g++')):
+                link_report = run_link_benchmark(install_path, [f"bfd={bfd_root}", f"{linker}={install_path}"])
+                with open(os.path.join(build_path, "logs", "link_benchmark.json"), 'w') as f:
+                    json.dump(link_report, f, indent=2)
+            else:
+                print(f"[LINK BENCH] No bfd install at {bfd_root}, skipping {linker} link-time comparison")
 
 if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        sys.exit(CLI_COMMANDS[sys.argv[1]](sys.argv[2:]))
     build(
         source_path=os.environ["REZ_BUILD_SOURCE_PATH"],
         build_path=os.environ["REZ_BUILD_PATH"],